@@ -1,39 +1,406 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
-from app.models.schemas import DraftRequest, DraftResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from app.models.schemas import (
+    DraftRequest, ColumnarDraftRequest, DraftResponse, DraftSessionCreate, DraftSessionInfo, PickEvent,
+    BatchDraftRequest, BatchDraftResponse, ContextRecommendations,
+    SimulationRequest, SimulationResponse, CandidateValue
+)
 from app.models.ml_model import ScoutAIModel
+from app.models.columnar import MSGPACK_MEDIA_TYPES, PlayerTable, decode_draft_request
+from app.models.draft_session import DraftSessionStore
+from app.models.recommendation_cache import RecommendationCache, draft_state_key, etag, etag_matches
+from app.models.draft_simulation import build_setup, run_simulations
+from app.models.training_jobs import TrainingJobManager, TrainingJobConflict
+from app.models.artifacts import ArtifactError
+from app.utils.executors import PoolOverloaded, thread_pool, process_pool
+from app.utils.news_client import NewsClient, NewsUnavailable
+from app.utils import metrics
+from app import config
+import asyncio
 import logging
-import os
-import requests
+from typing import Dict, Optional, Union
 
 router = APIRouter()
 
 # Initialize the ML model
-ml_model = ScoutAIModel()
+ml_model = ScoutAIModel(
+    model_dir=config.MODEL_DIR,
+    keep_versions=config.MODEL_KEEP_VERSIONS,
+    compiled_max_rows=config.COMPILED_MAX_ROWS,
+    adp_spread_path=config.ADP_SPREAD_PATH,
+    explanation_cache_size=config.EXPLANATION_CACHE_MAX_ENTRIES,
+    exact_explanations=config.EXPLANATION_EXACT,
+    team_context_dir=config.TEAM_CONTEXT_DIR,
+    schedule_dir=config.SCHEDULE_DIR
+)
+
+# Server-side draft sessions
+draft_sessions = DraftSessionStore(
+    ttl_seconds=config.SESSION_TTL_SECONDS,
+    max_sessions=config.SESSION_MAX_COUNT,
+    max_bytes=config.SESSION_MAX_BYTES
+)
+
+# /suggest results for repeated draft states (the extension re-polls between picks)
+recommendation_cache = RecommendationCache(
+    ttl_seconds=config.RECOMMENDATION_CACHE_TTL_SECONDS,
+    max_entries=config.RECOMMENDATION_CACHE_MAX_ENTRIES
+)
+
+# Inference runs on a bounded thread pool and training in a separate process,
+# so neither blocks the event loop
+inference_pool = thread_pool("inference", config.INFERENCE_WORKERS, config.INFERENCE_QUEUE_LIMIT)
+training_pool = process_pool("training", config.TRAINING_WORKERS, config.TRAINING_QUEUE_LIMIT)
+# Draft simulations are CPU-heavy NumPy work, spread over their own processes
+simulation_pool = process_pool("simulation", config.SIMULATION_WORKERS, config.SIMULATION_QUEUE_LIMIT)
+
+metrics.POOL_PENDING.set_function(lambda: {
+    (pool.name,): pool.stats()['pending'] for pool in (inference_pool, training_pool, simulation_pool)
+})
+
+# One training job at a time; finished models are hot-swapped into ml_model
+training_jobs = TrainingJobManager(ml_model, training_pool)
+
+# Pooled, cached client for the player news API
+news_client = NewsClient(
+    base_url=config.NEWS_API_BASE_URL,
+    api_key=config.NEWS_API_KEY,
+    timeout_seconds=config.NEWS_TIMEOUT_SECONDS,
+    ttl_seconds=config.NEWS_CACHE_TTL_SECONDS,
+    max_entries=config.NEWS_CACHE_MAX_ENTRIES,
+    max_connections=config.NEWS_MAX_CONNECTIONS
+)
+
+def _prefetch_news(recommendations):
+    """Start fetching news for recommended players so sidebar clicks hit the cache"""
+    if config.NEWS_PREFETCH:
+        news_client.prefetch(rec.player.name for rec in recommendations)
+
+def _overloaded(e: PoolOverloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def _json_response(content: BaseModel, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize a response model with pydantic-core's JSON encoder
+    
+    Returning a Response skips FastAPI's re-validation of the model and its
+    slower jsonable_encoder + json.dumps path; response_model still
+    documents the schema.
+    """
+    metrics.handler_finished()
+    return Response(content.model_dump_json(), media_type="application/json", headers=headers)
+
+def _draft_response(request: Union[DraftRequest, ColumnarDraftRequest], recommendations) -> DraftResponse:
+    return DraftResponse(
+        recommendations=recommendations,
+        roster_analysis=ml_model.analyze_roster(request.user_roster, recommendations, request.league_settings)
+    )
+
+async def _suggest(request: Union[DraftRequest, ColumnarDraftRequest], players, if_none_match: Optional[str]):
+    """Recommendations for /suggest and /suggest-columnar, with the shared cache and ETags"""
+    try:
+        # Until startup has looked for a model the version is unknown, so skip the cache
+        key = None
+        headers = {}
+        if ml_model.load_attempted:
+            version = ml_model.get_version()
+            recommendation_cache.check_version(version)
+            key = draft_state_key(request, version)
+            if etag_matches(if_none_match, key):
+                recommendation_cache.record_not_modified()
+                return Response(status_code=304, headers={"ETag": etag(key)})
+            headers["ETag"] = etag(key)
+            recommendations = recommendation_cache.get(key)
+            if recommendations is not None:
+                return _json_response(_draft_response(request, recommendations), headers)
+        
+        # Get recommendations from ML model
+        recommendations = await inference_pool.run(
+            ml_model.get_recommendations,
+            current_pick=request.current_pick,
+            current_round=request.current_round,
+            user_roster=request.user_roster,
+            available_players=players,
+            league_settings=request.league_settings
+        )
+        if key is not None:
+            recommendation_cache.put(key, recommendations)
+        _prefetch_news(recommendations)
+        
+        return _json_response(_draft_response(request, recommendations), headers)
+    
+    except PoolOverloaded as e:
+        metrics.ERRORS.labels('overloaded').inc()
+        raise _overloaded(e)
+    except Exception as e:
+        metrics.ERRORS.labels('recommendation').inc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating recommendations: {str(e)}"
+        )
+    finally:
+        metrics.handler_finished()
 
 @router.post("/suggest", response_model=DraftResponse)
-async def get_draft_suggestions(request: DraftRequest):
+async def get_draft_suggestions(request: DraftRequest, if_none_match: Optional[str] = Header(None)):
     """
     Generate draft recommendations based on current draft state.
     
     This endpoint analyzes the current draft situation and provides
     intelligent player recommendations with confidence scores.
+    
+    Responses carry an ETag for the draft state and model version. A client
+    that sends it back in If-None-Match gets 304 Not Modified while nothing
+    has changed, and repeated states are served from a cache.
+    """
+    metrics.handler_started()
+    metrics.POOL_SIZE.labels('suggest').observe(len(request.available_players))
+    return await _suggest(request, request.available_players, if_none_match)
+
+def _inline_schema(model) -> Dict:
+    """JSON schema of a model with its nested definitions inlined, for openapi_extra"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(definitions[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+    return resolve(schema)
+
+# The body is decoded by the handler, so describe it for the docs here
+_COLUMNAR_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        media_type: {"schema": _inline_schema(ColumnarDraftRequest)}
+        for media_type in ("application/json", MSGPACK_MEDIA_TYPES[0])
+    }
+}
+
+@router.post("/suggest-columnar", response_model=DraftResponse, openapi_extra={"requestBody": _COLUMNAR_REQUEST_BODY})
+async def get_columnar_draft_suggestions(http_request: Request, if_none_match: Optional[str] = Header(None)):
+    """
+    Generate draft recommendations from a player pool sent as columns.
+    
+    Same as /suggest, but available_players is an object of parallel arrays
+    (names, positions, teams, adp, projected_points, bye_week), sent as JSON
+    or as msgpack with Content-Type: application/msgpack. Large pools decode
+    several times faster than the per-player list. ETags are shared with
+    /suggest for the same draft state.
     """
     try:
-        # Get recommendations from ML model
-        recommendations = ml_model.get_recommendations(
+        request = decode_draft_request(await http_request.body(), http_request.headers.get("content-type"))
+    except ValidationError as e:
+        # Same error locations as a body validated by FastAPI
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error decoding request body: {str(e) or type(e).__name__}")
+    metrics.handler_started()
+    metrics.POOL_SIZE.labels('suggest_columnar').observe(len(request.available_players))
+    return await _suggest(request, PlayerTable(request.available_players), if_none_match)
+
+@router.post("/suggest-batch", response_model=BatchDraftResponse)
+async def get_batch_draft_suggestions(request: BatchDraftRequest):
+    """
+    Generate recommendations for many draft contexts (e.g. every team in a
+    league) against one shared player pool.
+    
+    The pool is featurized once and all contexts are scored in one model call.
+    """
+    metrics.handler_started()
+    metrics.POOL_SIZE.labels('suggest_batch').observe(len(request.available_players))
+    if len(request.contexts) > config.BATCH_MAX_CONTEXTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {config.BATCH_MAX_CONTEXTS} contexts per batch request"
+        )
+    try:
+        results = await inference_pool.run(
+            ml_model.get_batch_recommendations,
+            contexts=request.contexts,
+            available_players=request.available_players,
+            top_k=request.top_k,
+            league_settings=request.league_settings
+        )
+        return _json_response(BatchDraftResponse(results=[
+            ContextRecommendations(context_id=context.context_id, recommendations=recommendations)
+            for context, recommendations in zip(request.contexts, results)
+        ]))
+    
+    except PoolOverloaded as e:
+        metrics.ERRORS.labels('overloaded').inc()
+        raise _overloaded(e)
+    except Exception as e:
+        metrics.ERRORS.labels('recommendation').inc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating recommendations: {str(e)}"
+        )
+    finally:
+        metrics.handler_finished()
+
+@router.post("/simulate", response_model=SimulationResponse)
+async def simulate_draft(request: SimulationRequest):
+    """
+    Value the model's top candidates for the current pick by simulating the
+    rest of the draft.
+    
+    Opponents pick from noisy ADP boards under roster rules and the user's
+    later picks follow the model. Candidates are ranked by the points the
+    user's picks add to the starting lineup. Simulation stops at
+    num_simulations or the time budget, whichever comes first.
+    """
+    try:
+        setup = await inference_pool.run(
+            build_setup,
+            ml_model,
             current_pick=request.current_pick,
             current_round=request.current_round,
             user_roster=request.user_roster,
-            available_players=request.available_players
+            available_players=request.available_players,
+            num_teams=request.num_teams,
+            num_rounds=request.num_rounds,
+            num_candidates=request.num_candidates,
+            max_rounds_ahead=request.max_rounds_ahead
         )
-        
-        return DraftResponse(recommendations=recommendations)
+        result = await run_simulations(
+            simulation_pool,
+            setup,
+            num_simulations=min(request.num_simulations, config.SIMULATION_MAX_RUNS),
+            time_budget_seconds=min(request.time_budget_seconds, config.SIMULATION_MAX_SECONDS),
+            chunk_size=config.SIMULATION_CHUNK_SIZE,
+            seed=request.seed
+        )
+    except PoolOverloaded as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error simulating draft: {str(e)}"
+        )
+    
+    candidates = [
+        CandidateValue(
+            player=request.available_players[player_idx],
+            confidence_score=float(score),
+            expected_lineup_points=float(mean),
+            std_error=float(std_error),
+            best_pick_probability=float(best)
+        )
+        for player_idx, score, mean, std_error, best in zip(
+            result.candidates, setup.candidate_scores, result.mean, result.std_error, result.best_probability
+        )
+    ]
+    candidates.sort(key=lambda c: c.expected_lineup_points, reverse=True)
+    return SimulationResponse(
+        candidates=candidates,
+        simulations=result.simulations,
+        elapsed_seconds=result.elapsed_seconds,
+        budget_exhausted=result.budget_exhausted
+    )
+
+def _get_session(session_id: str):
+    session = draft_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Draft session {session_id} not found or expired")
+    return session
+
+@router.post("/sessions", response_model=DraftSessionInfo, status_code=201)
+async def create_draft_session(request: DraftSessionCreate):
+    """
+    Start a draft session with the full player pool.
+    
+    The pool is featurized once and kept on the server; later picks are
+    sent as small events to /sessions/{session_id}/picks.
+    """
+    try:
+        # Featurizing the pool is inference work, so it runs on the pool like scoring
+        session = await inference_pool.run(
+            draft_sessions.create,
+            ml_model,
+            available_players=request.available_players,
+            user_roster=request.user_roster,
+            current_pick=request.current_pick,
+            current_round=request.current_round,
+            league_settings=request.league_settings
+        )
+    except PoolOverloaded as e:
+        metrics.ERRORS.labels('overloaded').inc()
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return session.info()
+
+@router.get("/sessions/{session_id}", response_model=DraftSessionInfo)
+async def get_draft_session(session_id: str):
+    """Get the current state of a draft session"""
+    return _get_session(session_id).info()
+
+@router.post("/sessions/{session_id}/picks", response_model=DraftSessionInfo)
+async def record_pick(session_id: str, pick: PickEvent):
+    """Record a pick: remove the player from the pool and update the user's roster if needed"""
+    session = _get_session(session_id)
+    
+    # A suggest holds the session lock while it scores, so wait for it on the pool, not the event loop
+    def apply_pick():
+        with session.lock:
+            session.apply_pick(
+                pick.player_name,
+                drafted_by_user=pick.drafted_by_user,
+                position=pick.position,
+                current_pick=pick.current_pick,
+                current_round=pick.current_round
+            )
+            return session.info()
+    
+    try:
+        return await inference_pool.run(apply_pick)
+    except PoolOverloaded as e:
+        metrics.ERRORS.labels('overloaded').inc()
+        raise _overloaded(e)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Player {pick.player_name} is not in the session pool")
+
+@router.get("/sessions/{session_id}/suggest", response_model=DraftResponse)
+async def get_session_suggestions(session_id: str):
+    """Generate draft recommendations for the current state of a draft session"""
+    metrics.handler_started()
+    session = _get_session(session_id)
+    metrics.POOL_SIZE.labels('session_suggest').observe(len(session.players))
+    
+    def suggest():
+        with session.lock:
+            recommendations = session.get_recommendations()
+            return recommendations, ml_model.analyze_roster(session.user_roster, recommendations, session.league_settings)
     
+    try:
+        recommendations, roster_analysis = await inference_pool.run(suggest)
+        _prefetch_news(recommendations)
+        return _json_response(DraftResponse(recommendations=recommendations, roster_analysis=roster_analysis))
+    except PoolOverloaded as e:
+        metrics.ERRORS.labels('overloaded').inc()
+        raise _overloaded(e)
     except Exception as e:
+        metrics.ERRORS.labels('recommendation').inc()
         raise HTTPException(
             status_code=500,
             detail=f"Error generating recommendations: {str(e)}"
         )
+    finally:
+        metrics.handler_finished()
+
+@router.delete("/sessions/{session_id}")
+async def delete_draft_session(session_id: str):
+    """End a draft session and free its player pool"""
+    if not draft_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Draft session {session_id} not found or expired")
+    return {"message": "Draft session deleted"}
 
 @router.get("/status")
 async def get_model_status():
@@ -41,65 +408,95 @@ async def get_model_status():
     return {
         "model_loaded": ml_model.is_loaded(),
         "model_version": ml_model.get_version(),
-        "model_info": ml_model.get_model_info()
+        "model_info": ml_model.get_model_info(),
+        "draft_sessions": draft_sessions.stats(),
+        "explanations": ml_model.explainer.stats(),
+        "pools": {
+            "inference": inference_pool.stats(),
+            "training": training_pool.stats(),
+            "simulation": simulation_pool.stats()
+        },
+        "recommendation_cache": recommendation_cache.stats(),
+        "player_news": news_client.stats()
     }
 
-@router.post("/train")
-async def train_model(background_tasks: BackgroundTasks, num_samples: int = 20000):
+def _start_training_job(num_samples: int, streaming: bool):
+    try:
+        return training_jobs.submit(num_samples, streaming=streaming, data_dir=config.TRAINING_DATA_DIR)
+    except TrainingJobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PoolOverloaded as e:
+        raise _overloaded(e)
+
+@router.post("/train", status_code=202)
+async def train_model(num_samples: int = 20000, streaming: bool = False):
     """
     Train the ML model with synthetic data.
     
-    This endpoint triggers model training in the background.
-    You can check the training status via the /status endpoint.
+    This endpoint starts a training job in a background worker process and
+    returns its job ID. Poll /train/jobs/{job_id} for progress; the new model
+    is swapped in when the job succeeds. With streaming=true the job trains
+    out of core, from SCOUTAI_TRAINING_DATA_DIR when it is set.
     """
-    try:
-        # Start training in background
-        background_tasks.add_task(ml_model.train_model, num_samples=num_samples)
-        
-        return {
-            "message": "Model training started in background",
-            "num_samples": num_samples,
-            "status": "training"
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error starting model training: {str(e)}"
-        )
+    job = _start_training_job(num_samples, streaming)
+    return {
+        "message": "Model training started in background",
+        "num_samples": num_samples,
+        "streaming": streaming,
+        "status": job.status,
+        "job_id": job.job_id
+    }
+
+@router.get("/train/jobs")
+async def list_training_jobs():
+    """List recent training jobs, newest first"""
+    return {"jobs": [job.to_dict() for job in training_jobs.list()]}
+
+@router.get("/train/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Get status, progress and metrics of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job.to_dict()
+
+@router.delete("/train/jobs/{job_id}")
+async def cancel_training_job(job_id: str):
+    """Cancel a queued or running training job"""
+    job = training_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job.to_dict()
 
 @router.post("/train-sync")
-async def train_model_sync(num_samples: int = 20000):
+async def train_model_sync(num_samples: int = 20000, streaming: bool = False):
     """
     Train the ML model synchronously (this may take a while).
     
-    This endpoint trains the model and returns the results.
+    This runs a regular training job and waits for it to finish.
     """
-    try:
-        # Generate training data
-        training_data = ml_model.generate_training_data(num_samples=num_samples)
-        
-        # Train model
-        results = ml_model.train_model(data=training_data, test_size=0.2)
-        
-        return {
-            "message": "Model training completed",
-            "results": results,
-            "model_info": ml_model.get_model_info()
-        }
-    except Exception as e:
+    job = _start_training_job(num_samples, streaming)
+    await asyncio.wrap_future(job.completed)
+    
+    if job.status != "succeeded":
         raise HTTPException(
             status_code=500,
-            detail=f"Error training model: {str(e)}"
+            detail=f"Error training model: {job.error or job.status}"
         )
+    return {
+        "message": "Model training completed",
+        "job_id": job.job_id,
+        "results": job.metrics,
+        "model_info": ml_model.get_model_info()
+    }
 
 @router.delete("/model")
 async def delete_model():
     """Delete the current trained model"""
     try:
-        if os.path.exists(ml_model.model_path):
-            os.remove(ml_model.model_path)
-            ml_model.is_model_loaded = False
-            return {"message": "Model deleted successfully"}
+        version = ml_model.delete_current_version()
+        if version is not None:
+            return {"message": "Model deleted successfully", "version": version}
         else:
             return {"message": "No model found to delete"}
     except Exception as e:
@@ -108,6 +505,29 @@ async def delete_model():
             detail=f"Error deleting model: {str(e)}"
         )
 
+@router.get("/model/versions")
+async def list_model_versions():
+    """List saved model versions, newest first"""
+    return {"versions": ml_model.list_versions()}
+
+@router.post("/model/versions/{version}/activate")
+async def activate_model_version(version: str):
+    """Serve a previously saved model version (instant rollback)"""
+    try:
+        snapshot = await asyncio.to_thread(ml_model.activate_version, version)
+    except ArtifactError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error activating model version: {str(e)}"
+        )
+    return {
+        "message": "Model version activated",
+        "version": snapshot.version,
+        "load_seconds": snapshot.load_seconds
+    }
+
 @router.get("/model-info")
 async def get_model_info():
     """Get detailed information about the current model"""
@@ -123,29 +543,13 @@ async def get_model_info():
 async def get_player_news(player: str = Query(..., description="Player name")):
     """
     Fetch recent news articles about a specific player using Bing News Search API.
+    
+    Results are cached per player, and concurrent requests for the same
+    player share one upstream call.
     """
-    api_key = os.environ.get("BING_NEWS_API_KEY")
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Bing News API key not set in environment variables.")
-    endpoint = "https://api.bing.microsoft.com/v7.0/news/search"
-    headers = {"Ocp-Apim-Subscription-Key": api_key}
-    params = {
-        "q": player,
-        "mkt": "en-US",
-        "count": 5,
-        "sortBy": "Date"
-    }
-    response = requests.get(endpoint, headers=headers, params=params)
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail="Failed to fetch news articles.")
-    data = response.json()
-    articles = []
-    for item in data.get("value", []):
-        articles.append({
-            "title": item.get("name"),
-            "url": item.get("url"),
-            "source": item.get("provider", [{}])[0].get("name", "Unknown"),
-            "publishedAt": item.get("datePublished"),
-            "snippet": item.get("description")
-        })
-    return {"articles": articles} 
\ No newline at end of file
+    try:
+        articles = await news_client.get_articles(player)
+    except NewsUnavailable as e:
+        metrics.ERRORS.labels('news').inc()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"articles": articles}
\ No newline at end of file
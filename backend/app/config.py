@@ -0,0 +1,69 @@
+"""Runtime settings for the ScoutAI API, read from environment variables"""
+
+import os
+
+# Draft sessions
+SESSION_TTL_SECONDS = float(os.environ.get("SCOUTAI_SESSION_TTL_SECONDS", 2 * 60 * 60))
+SESSION_MAX_COUNT = int(os.environ.get("SCOUTAI_SESSION_MAX_COUNT", 1000))
+SESSION_MAX_BYTES = int(os.environ.get("SCOUTAI_SESSION_MAX_BYTES", 256 * 1024 * 1024))
+
+# Worker pools: inference runs on threads, training in separate processes.
+# Requests beyond workers + queue limit are rejected with 503.
+INFERENCE_WORKERS = int(os.environ.get("SCOUTAI_INFERENCE_WORKERS", os.cpu_count() or 1))
+INFERENCE_QUEUE_LIMIT = int(os.environ.get("SCOUTAI_INFERENCE_QUEUE_LIMIT", 64))
+TRAINING_WORKERS = int(os.environ.get("SCOUTAI_TRAINING_WORKERS", 1))
+TRAINING_QUEUE_LIMIT = int(os.environ.get("SCOUTAI_TRAINING_QUEUE_LIMIT", 0))
+
+# Draft simulation (/simulate) runs chunks of simulated drafts on its own process pool.
+# Requested simulation counts and time budgets are capped at these limits.
+SIMULATION_WORKERS = int(os.environ.get("SCOUTAI_SIMULATION_WORKERS", os.cpu_count() or 1))
+SIMULATION_QUEUE_LIMIT = int(os.environ.get("SCOUTAI_SIMULATION_QUEUE_LIMIT", os.cpu_count() or 1))
+SIMULATION_CHUNK_SIZE = int(os.environ.get("SCOUTAI_SIMULATION_CHUNK_SIZE", 100))
+SIMULATION_MAX_RUNS = int(os.environ.get("SCOUTAI_SIMULATION_MAX_RUNS", 20000))
+SIMULATION_MAX_SECONDS = float(os.environ.get("SCOUTAI_SIMULATION_MAX_SECONDS", 10))
+
+# /suggest results cached per canonical draft state and model version (0 disables)
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.environ.get("SCOUTAI_RECOMMENDATION_CACHE_TTL_SECONDS", 5 * 60))
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get("SCOUTAI_RECOMMENDATION_CACHE_MAX_ENTRIES", 1024))
+
+# Largest number of draft contexts accepted by /suggest-batch
+BATCH_MAX_CONTEXTS = int(os.environ.get("SCOUTAI_BATCH_MAX_CONTEXTS", 256))
+
+# Parquet store of training rows (feature columns plus target_score) read by
+# streaming training jobs; unset, they stream synthetic data instead
+TRAINING_DATA_DIR = os.environ.get("SCOUTAI_TRAINING_DATA_DIR")
+
+# Model artifacts
+MODEL_DIR = os.environ.get("SCOUTAI_MODEL_DIR", "models/artifacts")
+MODEL_KEEP_VERSIONS = int(os.environ.get("SCOUTAI_MODEL_KEEP_VERSIONS", 5))
+# Largest batch scored by the NumPy-compiled model; bigger batches go to XGBoost (0 disables it)
+COMPILED_MAX_ROWS = int(os.environ.get("SCOUTAI_COMPILED_MAX_ROWS", 32))
+
+# Recommendation explanations come from the model's per-feature contributions,
+# cached per (model version, feature row). Exact TreeSHAP values cost about
+# 1.7 ms per explained row; the default approximation is ~40x cheaper.
+EXPLANATION_CACHE_MAX_ENTRIES = int(os.environ.get("SCOUTAI_EXPLANATION_CACHE_MAX_ENTRIES", 4096))
+EXPLANATION_EXACT = os.environ.get("SCOUTAI_EXPLANATION_EXACT", "0") not in ("0", "false", "False")
+
+# Optional JSON file of per-season ADP spreads used for next-pick availability,
+# e.g. {"2023": {"fraction": 0.15, "floor": 2.0}}
+ADP_SPREAD_PATH = os.environ.get("SCOUTAI_ADP_SPREAD_PATH")
+
+# Team-context store from build_team_context.py (memory-mapped, shared by all
+# workers). Setting it adds team offense/defense features, so models must be
+# retrained with it set; unset, the base feature set is used.
+TEAM_CONTEXT_DIR = os.environ.get("SCOUTAI_TEAM_CONTEXT_DIR")
+
+# Strength-of-schedule and bye-week tables from build_schedule_tables.py. Adds
+# schedule and bye-conflict features, so models must be retrained with it set.
+SCHEDULE_DIR = os.environ.get("SCOUTAI_SCHEDULE_DIR")
+
+# Player news (Bing News Search API)
+NEWS_API_BASE_URL = os.environ.get("SCOUTAI_NEWS_API_BASE_URL", "https://api.bing.microsoft.com/v7.0")
+NEWS_API_KEY = os.environ.get("BING_NEWS_API_KEY")
+NEWS_TIMEOUT_SECONDS = float(os.environ.get("SCOUTAI_NEWS_TIMEOUT_SECONDS", 5))
+NEWS_CACHE_TTL_SECONDS = float(os.environ.get("SCOUTAI_NEWS_CACHE_TTL_SECONDS", 15 * 60))
+NEWS_CACHE_MAX_ENTRIES = int(os.environ.get("SCOUTAI_NEWS_CACHE_MAX_ENTRIES", 1000))
+NEWS_MAX_CONNECTIONS = int(os.environ.get("SCOUTAI_NEWS_MAX_CONNECTIONS", 10))
+# Fetch news for recommended players in the background so sidebar clicks hit the cache
+NEWS_PREFETCH = os.environ.get("SCOUTAI_NEWS_PREFETCH", "1") not in ("0", "false", "False")
@@ -1,12 +1,31 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from fastapi.responses import JSONResponse, Response
+from app.api.routes import (
+    router, ml_model, news_client, inference_pool, training_pool, simulation_pool, training_jobs
+)
+from app.utils.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the model in the background so the server starts accepting requests immediately"""
+    app.state.model_warm_up = asyncio.create_task(asyncio.to_thread(ml_model.warm_up))
+    yield
+    # Stop the worker pools and close the news client
+    inference_pool.shutdown()
+    training_pool.shutdown()
+    simulation_pool.shutdown()
+    training_jobs.shutdown()
+    await news_client.aclose()
 
 # Create FastAPI app instance
 app = FastAPI(
     title="ScoutAI Fantasy Football API",
     description="Intelligent fantasy football draft recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for Chrome extension
@@ -18,6 +37,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency per route, exported on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
@@ -31,6 +53,18 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "ScoutAI API"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 503 until startup has finished looking for a saved model"""
+    if not ml_model.load_attempted:
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {"status": "ready", "model_loaded": ml_model.is_model_loaded}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
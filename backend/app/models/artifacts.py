@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.tree_ensemble import CompiledEnsemble
+
+logger = logging.getLogger(__name__)
+
+# Bump when the directory layout or manifest fields change incompatibly
+ARTIFACT_FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+BOOSTER_FILE = "booster.ubj"
+SCALER_FILE = "scaler.npy"
+COMPILED_FILE = "compiled.npz"
+CURRENT_FILE = "CURRENT"
+
+class ArtifactError(Exception):
+    """Raised when a model artifact is missing, corrupt or incompatible"""
+
+class ArrayScaler:
+    """StandardScaler replacement backed by raw mean/scale arrays
+
+    Applies the same float64 operations as StandardScaler.transform, so
+    scaled values are bit-identical.
+    """
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @classmethod
+    def from_scaler(cls, scaler) -> "ArrayScaler":
+        return cls(np.asarray(scaler.mean_, dtype=np.float64), np.asarray(scaler.scale_, dtype=np.float64))
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean_
+        X /= self.scale_
+        return X
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ArtifactStore:
+    """Versioned model artifact directories under one root
+
+    Each version lives in ``<root>/<version>/`` and holds the booster in
+    XGBoost's UBJSON format, the scaler mean and scale as a (2, n_features)
+    float64 array, the NumPy-compiled tree ensemble (when available), and a
+    manifest with the feature order, versions and file checksums.
+    ``<root>/CURRENT`` names the version being served.
+    """
+
+    def __init__(self, root: str, keep_versions: int = 5):
+        self.root = root
+        self.keep_versions = keep_versions
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def save(
+        self,
+        version: str,
+        model,
+        scaler,
+        feature_columns: List[str],
+        extra: Optional[Dict[str, Any]] = None,
+        compiled: Optional[CompiledEnsemble] = None
+    ) -> str:
+        """Write a new artifact version and return its directory"""
+        import xgboost as xgb
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = os.path.join(self.root, f".tmp-{version}-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        model.save_model(os.path.join(tmp_dir, BOOSTER_FILE))
+        array_scaler = ArrayScaler.from_scaler(scaler)
+        np.save(os.path.join(tmp_dir, SCALER_FILE), np.stack([array_scaler.mean_, array_scaler.scale_]))
+        files = [BOOSTER_FILE, SCALER_FILE]
+        if compiled is not None:
+            compiled.save(os.path.join(tmp_dir, COMPILED_FILE))
+            files.append(COMPILED_FILE)
+
+        manifest = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'version': version,
+            'feature_columns': list(feature_columns),
+            'xgboost_version': xgb.__version__,
+            'created_at': time.time(),
+            'checksums': {
+                name: _sha256(os.path.join(tmp_dir, name)) for name in files
+            }
+        }
+        manifest.update(extra or {})
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Rename into place so readers never see a half-written version
+        final_dir = self.path(version)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.rename(tmp_dir, final_dir)
+        return final_dir
+
+    def read_manifest(self, version: str) -> Dict[str, Any]:
+        manifest_path = os.path.join(self.path(version), MANIFEST_FILE)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ArtifactError(f"Cannot read manifest for model version {version}: {e}")
+        if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            raise ArtifactError(f"Model version {version} has unsupported format {manifest.get('format_version')}")
+        return manifest
+
+    def load(self, version: str, verify: bool = True):
+        """Load (ArrayScaler, manifest) for a version, verifying file checksums
+
+        The XGBoost model is loaded separately with load_model(), so serving
+        from the compiled ensemble never imports xgboost.
+        """
+        manifest = self.read_manifest(version)
+        version_dir = self.path(version)
+        if verify:
+            for name, expected in manifest['checksums'].items():
+                if _sha256(os.path.join(version_dir, name)) != expected:
+                    raise ArtifactError(f"Checksum mismatch for {name} in model version {version}")
+
+        mean, scale = np.load(os.path.join(version_dir, SCALER_FILE))
+        return ArrayScaler(mean, scale), manifest
+
+    def load_model(self, version: str):
+        """Load the XGBoost model of a version"""
+        import xgboost as xgb
+
+        model = xgb.XGBRegressor()
+        model.load_model(os.path.join(self.path(version), BOOSTER_FILE))
+        return model
+
+    def load_compiled(self, version: str) -> Optional[CompiledEnsemble]:
+        """Load the compiled ensemble for a version (None for versions saved without one)"""
+        if COMPILED_FILE not in self.read_manifest(version)['checksums']:
+            return None
+        return CompiledEnsemble.load(os.path.join(self.path(version), COMPILED_FILE))
+
+    def versions(self) -> List[str]:
+        """Saved versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            if name.startswith('.') or not os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE)):
+                continue
+            found.append((os.path.getmtime(os.path.join(self.root, name, MANIFEST_FILE)), name))
+        return [name for _, name in sorted(found)]
+
+    def current(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return version or None
+
+    def set_current(self, version: Optional[str]):
+        """Point CURRENT at a version (None clears it)"""
+        current_path = os.path.join(self.root, CURRENT_FILE)
+        if version is None:
+            if os.path.exists(current_path):
+                os.remove(current_path)
+            return
+        if not os.path.isdir(self.path(version)):
+            raise ArtifactError(f"Model version {version} not found")
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{current_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, current_path)
+
+    def delete(self, version: str):
+        shutil.rmtree(self.path(version), ignore_errors=True)
+
+    def prune(self):
+        """Delete the oldest versions beyond keep_versions, never the current one"""
+        current = self.current()
+        versions = [v for v in self.versions() if v != current]
+        excess = len(versions) - (self.keep_versions - (1 if current else 0))
+        for version in versions[:max(0, excess)]:
+            logger.info(f"Pruning old model version {version}")
+            self.delete(version)
@@ -0,0 +1,129 @@
+"""
+Probability that a player is still on the board at the user's next pick
+
+A player's actual draft slot is modelled as normal around their ADP, with a
+standard deviation that grows with ADP (late picks are less predictable).
+build_adp_spreads.py fits the spread parameters per season from past draft
+results and writes them to a JSON file, which is cached after the first
+read. Probabilities for the whole pool are computed in one vectorized pass.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPREAD_FILE = 'data/processed/adp_spreads.json'
+DEFAULT_NUM_TEAMS = 12
+# Recommendations at least this likely to be available next pick can wait a round
+CAN_WAIT_PROBABILITY = 0.7
+
+@dataclass(frozen=True)
+class AdpSpread:
+    """Standard deviation of a player's draft slot: fraction * ADP + floor"""
+    fraction: float
+    floor: float
+
+    def sd(self, adp: np.ndarray) -> np.ndarray:
+        return self.fraction * adp + self.floor
+
+DEFAULT_ADP_SPREAD = AdpSpread(fraction=0.15, floor=2.0)
+# Seasons with fewer picks keep the default; the floor keeps first-round spreads from collapsing
+MIN_SPREAD_PICKS = 100
+MIN_SPREAD_FLOOR = 0.5
+
+def fit_adp_spreads(picks: "pd.DataFrame", min_picks: int = MIN_SPREAD_PICKS) -> Dict[int, AdpSpread]:
+    """Per-season spreads from draft results with season, adp and overall_pick columns
+
+    For a normal slot, E|pick - ADP| = sd * sqrt(2 / pi), so the scaled
+    absolute errors are regressed on ADP by least squares to get the
+    fraction and floor.
+    """
+    picks = picks[['season', 'adp', 'overall_pick']].dropna()
+    spreads = {}
+    for season, rows in picks.groupby('season'):
+        if len(rows) < min_picks:
+            continue
+        adp = rows['adp'].to_numpy(dtype=np.float64)
+        scaled_error = np.abs(rows['overall_pick'].to_numpy(dtype=np.float64) - adp) * np.sqrt(np.pi / 2)
+        design = np.column_stack([adp, np.ones_like(adp)])
+        (fraction, floor), *_ = np.linalg.lstsq(design, scaled_error, rcond=None)
+        spreads[int(season)] = AdpSpread(round(max(float(fraction), 0.0), 4), round(max(float(floor), MIN_SPREAD_FLOOR), 4))
+    return spreads
+
+def save_adp_spreads(path: str, spreads: Dict[int, AdpSpread]):
+    """Write spreads in the format load_adp_spreads reads, replaced atomically"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    raw = {str(season): {'fraction': s.fraction, 'floor': s.floor} for season, s in sorted(spreads.items())}
+    with open(path + '.tmp', 'w') as f:
+        json.dump(raw, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+@lru_cache(maxsize=None)
+def load_adp_spreads(path: Optional[str]) -> Dict[int, AdpSpread]:
+    """Per-season spreads from a JSON file like {"2023": {"fraction": 0.14, "floor": 2.5}}"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+        return {int(season): AdpSpread(float(v['fraction']), float(v['floor'])) for season, v in raw.items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring ADP spread file {path}: {e}")
+        return {}
+
+def adp_spread(season: Optional[int] = None, path: Optional[str] = None) -> AdpSpread:
+    """Spread for a season, falling back to the default"""
+    if season is None:
+        return DEFAULT_ADP_SPREAD
+    return load_adp_spreads(path).get(int(season), DEFAULT_ADP_SPREAD)
+
+def league_params(league_settings: Optional[Dict]) -> Tuple[int, Optional[int]]:
+    """(num_teams, season) from request league settings"""
+    league_settings = league_settings or {}
+    num_teams = int(league_settings.get('num_teams') or DEFAULT_NUM_TEAMS)
+    season = league_settings.get('season')
+    return num_teams, int(season) if season is not None else None
+
+def _normal_sf(z: np.ndarray) -> np.ndarray:
+    """P(Z > z) for a standard normal, with small relative error far into the tails"""
+    # erfc from Numerical Recipes (erfcc), fractional error below 1.2e-7 everywhere
+    x = np.abs(z) / np.sqrt(2)
+    t = 1.0 / (1.0 + 0.5 * x)
+    poly = -1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (-0.18628806 + t * (
+        0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(-x * x + poly)
+    return 0.5 * np.where(z >= 0, erfc, 2.0 - erfc)
+
+def availability_at_next_pick(
+    adp: np.ndarray,
+    adp_sd: np.ndarray,
+    current_pick,
+    current_round,
+    num_teams: int
+) -> np.ndarray:
+    """P(player lasts to the user's next snake pick | player is still available now)
+
+    ``current_pick`` is the pick within the round; it and ``current_round``
+    may be arrays of shape (contexts, 1) to get one row per context. Players
+    without an ADP, and contexts whose pick is beyond ``num_teams``, get NaN.
+    """
+    current_pick = np.asarray(current_pick, dtype=np.float64)
+    current_round = np.asarray(current_round, dtype=np.float64)
+    overall = (current_round - 1) * num_teams + current_pick
+    # The snake comes back after the rest of this round and the same number of picks in the next
+    next_overall = overall + 2 * (num_teams - current_pick) + 1
+
+    # The player has not gone in picks before this one; will they survive until the next one?
+    available_now = _normal_sf((overall - 0.5 - adp) / adp_sd)
+    available_next = _normal_sf((next_overall - 0.5 - adp) / adp_sd)
+    # available_next <= available_now, so clamping a denormal denominator cannot push the ratio past 1
+    probability = np.minimum(1.0, available_next / np.maximum(available_now, np.finfo(np.float64).tiny))
+    probability = np.where(available_now > 0, probability, 0.0)
+    return np.where((current_pick <= num_teams) & np.isfinite(adp), probability, np.nan)
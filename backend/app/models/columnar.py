@@ -0,0 +1,72 @@
+"""
+Columnar player pools for /suggest-columnar
+
+The request body is a ColumnarDraftRequest encoded as JSON or msgpack. It
+is decoded with orjson or msgpack, validated as a handful of lists, and
+held as a PlayerTable whose NumPy columns go straight into the feature
+matrix. Player objects are only built for the players that end up
+recommended.
+"""
+
+from typing import Iterator, List, Optional
+
+import msgpack
+import numpy as np
+import orjson
+
+from app.models.schemas import ColumnarDraftRequest, Player, PlayerColumns, Position
+
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+# Same order as ml_model.POSITIONS
+POSITION_INDEX = {position.value: i for i, position in enumerate(Position)}
+
+def decode_draft_request(body: bytes, content_type: Optional[str] = None) -> ColumnarDraftRequest:
+    """Decode and validate a columnar request body
+
+    Raises pydantic.ValidationError for a well-formed body that fails
+    validation, and ValueError for one that cannot be decoded.
+    """
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type in MSGPACK_MEDIA_TYPES:
+        data = msgpack.unpackb(body)
+    else:
+        data = orjson.loads(body)
+    return ColumnarDraftRequest.model_validate(data)
+
+def _float_column(values: Optional[List[Optional[float]]], n: int) -> np.ndarray:
+    """Float64 array with NaN for missing values (and for every row if the column was omitted)"""
+    if values is None:
+        return np.full(n, np.nan)
+    # NumPy converts None to NaN for float arrays
+    return np.array(values, dtype=np.float64)
+
+class PlayerTable:
+    """Validated player pool as arrays; indexes like the List[Player] it replaces"""
+
+    def __init__(self, columns: PlayerColumns):
+        n = len(columns)
+        self.columns = columns
+        self.position_idx = np.fromiter((POSITION_INDEX[p] for p in columns.positions), dtype=np.intp, count=n)
+        self.adp = _float_column(columns.adp, n)
+        self.projected_points = _float_column(columns.projected_points, n)
+        self.bye_week = _float_column(columns.bye_week, n)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getitem__(self, i: int) -> Player:
+        columns = self.columns
+        # Values were validated with the columns, so skip validating them again
+        return Player.model_construct(
+            name=columns.names[i],
+            position=Position(columns.positions[i]),
+            team=columns.teams[i],
+            adp=columns.adp[i] if columns.adp is not None else None,
+            projected_points=columns.projected_points[i] if columns.projected_points is not None else None,
+            bye_week=columns.bye_week[i] if columns.bye_week is not None else None
+        )
+
+    def __iter__(self) -> Iterator[Player]:
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,173 @@
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from app.models.schemas import Player, Roster, Recommendation, Position
+
+logger = logging.getLogger(__name__)
+
+# Rough per-player cost of the Player objects and name index kept next to the feature matrix
+_PLAYER_OVERHEAD_BYTES = 1024
+
+class DraftSession:
+    """Server-side draft state holding the featurized player pool"""
+    
+    def __init__(
+        self,
+        session_id: str,
+        model,
+        available_players: List[Player],
+        user_roster: Roster,
+        current_pick: int,
+        current_round: int,
+        league_settings: Optional[Dict] = None
+    ):
+        self.session_id = session_id
+        self.model = model
+        self.players = list(available_players)
+        self.user_roster = user_roster.model_copy(deep=True)
+        self.current_pick = current_pick
+        self.current_round = current_round
+        self.league_settings = dict(league_settings or {})
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        
+        # Player columns are computed once; only the draft-context columns change per pick
+        self.features, self.bye_weeks = model._player_features_and_byes(self.players, self.league_settings)
+        self.adp = model._player_adp(self.players)
+        self._refresh_context()
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this session"""
+        return self.features.nbytes + self.adp.nbytes + self.bye_weeks.nbytes + _PLAYER_OVERHEAD_BYTES * len(self.players)
+    
+    def _refresh_context(self):
+        self.model._apply_draft_context(
+            self.features, self.user_roster, self.current_round, self.current_pick, self.bye_weeks
+        )
+    
+    def _find_player(self, player_name: str) -> Optional[int]:
+        for i, player in enumerate(self.players):
+            if player.name == player_name:
+                return i
+        return None
+    
+    def apply_pick(
+        self,
+        player_name: str,
+        drafted_by_user: bool = False,
+        position: Optional[Position] = None,
+        current_pick: Optional[int] = None,
+        current_round: Optional[int] = None
+    ):
+        """Remove a drafted player from the pool and update the draft context"""
+        row = self._find_player(player_name)
+        if row is None and not (drafted_by_user and position is not None):
+            raise KeyError(player_name)
+        
+        bye_week = None
+        if row is not None:
+            position = position or self.players[row].position
+            # Resolved from the schedule when the player has none
+            bye_week = int(self.bye_weeks[row]) or None
+            self.features = np.delete(self.features, row, axis=0)
+            self.adp = np.delete(self.adp, row)
+            self.bye_weeks = np.delete(self.bye_weeks, row)
+            del self.players[row]
+        
+        if drafted_by_user:
+            getattr(self.user_roster, Position(position).value).append(player_name)
+            if bye_week:
+                self.user_roster.bye_weeks[player_name] = bye_week
+        if current_pick is not None:
+            self.current_pick = current_pick
+        if current_round is not None:
+            self.current_round = current_round
+        
+        if drafted_by_user or current_pick is not None or current_round is not None:
+            self._refresh_context()
+    
+    def get_recommendations(self, top_k: int = 3) -> List[Recommendation]:
+        """Score the remaining pool against the current draft context"""
+        availability = self.model._availability(
+            self.adp, self.current_pick, self.current_round, self.league_settings
+        )
+        return self.model.recommend_from_features(
+            self.features, self.players, self.user_roster, self.current_round, top_k, availability
+        )
+    
+    def info(self) -> Dict:
+        return {
+            'session_id': self.session_id,
+            'current_pick': self.current_pick,
+            'current_round': self.current_round,
+            # A copy, since later picks may change the roster while the response is serialized
+            'user_roster': self.user_roster.model_copy(deep=True),
+            'players_remaining': len(self.players)
+        }
+
+class DraftSessionStore:
+    """In-memory draft sessions with idle-TTL and memory-cap eviction"""
+    
+    def __init__(self, ttl_seconds: float, max_sessions: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, DraftSession]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def create(self, model, **kwargs) -> DraftSession:
+        """Create a session and evict idle or least recently used sessions as needed"""
+        session = DraftSession(uuid.uuid4().hex, model, **kwargs)
+        if session.nbytes > self.max_bytes:
+            raise ValueError(f"Player pool needs ~{session.nbytes} bytes, above the {self.max_bytes} byte session cap")
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._evict()
+        return session
+    
+    def get(self, session_id: str) -> Optional[DraftSession]:
+        """Look up a live session and mark it as recently used"""
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+    
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': sum(s.nbytes for s in self._sessions.values()),
+                'ttl_seconds': self.ttl_seconds,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes
+            }
+    
+    def _evict(self):
+        """Drop expired sessions, then least recently used ones until under the caps"""
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now - s.last_access > self.ttl_seconds]
+        for sid in expired:
+            del self._sessions[sid]
+        
+        total_bytes = sum(s.nbytes for s in self._sessions.values())
+        while self._sessions and (len(self._sessions) > self.max_sessions or total_bytes > self.max_bytes):
+            sid, session = self._sessions.popitem(last=False)
+            total_bytes -= session.nbytes
+            logger.info(f"Evicted draft session {sid} to stay under the session caps")
@@ -0,0 +1,418 @@
+"""
+Monte Carlo simulation of the rest of a snake draft
+
+Each simulation gives every opponent a noisy copy of the ADP board and lets
+them pick the best player left that fits their roster rules. The user's
+later picks follow the model. A candidate for the current pick is valued by
+the points the user's picks add to the starting lineup, averaged over all
+simulations.
+
+Every candidate is played against the same opponent boards (common random
+numbers), so differences between candidates are not swamped by board noise.
+Each chunk simulates all (candidate, simulation) rows at once with NumPy,
+and chunks are spread across a process pool until the simulation count or
+the time budget runs out.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.availability import DEFAULT_ADP_SPREAD
+from app.models.ml_model import ScoutAIModel, POSITIONS, POSITION_INDEX
+from app.models.schemas import Player, Roster
+from app.utils.executors import BoundedExecutor, PoolOverloaded
+
+logger = logging.getLogger(__name__)
+
+# Starting lineup; FLEX takes the best remaining RB/WR/TE
+STARTER_SLOTS = np.array([1, 2, 2, 1, 1, 1])
+FLEX_SLOTS = 1
+FLEX_POSITIONS = [POSITION_INDEX['RB'], POSITION_INDEX['WR'], POSITION_INDEX['TE']]
+
+# Opponent roster rules: most players taken per position, and K/DST only in the last rounds
+OPPONENT_CAPS = np.array([2, 7, 7, 2, 1, 1])
+LATE_ONLY_POSITIONS = [POSITION_INDEX['K'], POSITION_INDEX['DST']]
+LATE_ROUNDS = 2
+
+# The user's simulated picks are chosen by the model from this many best available players by ADP
+USER_SHORTLIST = 24
+
+class SimulationScorer:
+    """Picklable model scorer for worker processes
+
+    Uses the compiled ensemble when there is one, so workers never import
+    XGBoost; otherwise the XGBoost model and scaler.
+    """
+
+    def __init__(self, compiled=None, model=None, scaler=None):
+        if compiled is None and model is None:
+            raise ValueError("SimulationScorer needs a compiled ensemble or a model")
+        self.compiled = compiled
+        self.model = model
+        self.scaler = scaler
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "SimulationScorer":
+        if snapshot.compiled is not None:
+            return cls(compiled=snapshot.compiled)
+        return cls(model=snapshot.get_model(), scaler=snapshot.scaler)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        if self.compiled is not None:
+            scores = self.compiled.predict(features)
+        else:
+            scores = self.model.predict(self.scaler.transform(features).astype(np.float32))
+        return np.clip(scores, 0, 1)
+
+@dataclass
+class SimulationSetup:
+    """Everything a worker needs to simulate the rest of the draft"""
+    player_features: np.ndarray  # (players, features), draft-context columns unset, K/DST last
+    player_index: np.ndarray     # index into available_players of each feature row
+    candidates: np.ndarray       # feature rows of the players considered for the current pick
+    candidate_scores: np.ndarray # model score of each candidate at the current pick
+    roster_counts: np.ndarray    # (positions,) players the user already has at each position
+    num_teams: int
+    num_rounds: int
+    pick_index: int              # 0-based overall index of the user's current pick
+    scorer: SimulationScorer
+    max_rounds_ahead: Optional[int] = None
+
+    @property
+    def num_early_players(self) -> int:
+        """Feature rows before the first K/DST"""
+        position = self.player_features[:, :len(POSITIONS)].argmax(axis=1)
+        return int(np.count_nonzero(~np.isin(position, LATE_ONLY_POSITIONS)))
+
+    @property
+    def end_index(self) -> int:
+        """Overall index one past the last simulated pick"""
+        end = self.num_teams * self.num_rounds
+        if self.max_rounds_ahead is not None:
+            current_round = self.pick_index // self.num_teams
+            end = min(end, (current_round + self.max_rounds_ahead + 1) * self.num_teams)
+        return end
+
+@dataclass
+class SimulationResult:
+    """Per-candidate lineup value estimates, in candidate order"""
+    candidates: np.ndarray  # indices into available_players
+    mean: np.ndarray
+    std_error: np.ndarray
+    best_probability: np.ndarray
+    simulations: int
+    elapsed_seconds: float
+    budget_exhausted: bool
+
+def pick_team(pick_index: int, num_teams: int) -> int:
+    """Team slot (0-based) making a snake draft's pick at a 0-based overall index"""
+    draft_round, position = divmod(pick_index, num_teams)
+    return position if draft_round % 2 == 0 else num_teams - 1 - position
+
+def build_setup(
+    model: ScoutAIModel,
+    current_pick: int,
+    current_round: int,
+    user_roster: Roster,
+    available_players: List[Player],
+    num_teams: int = 12,
+    num_rounds: int = 15,
+    num_candidates: int = 5,
+    max_rounds_ahead: Optional[int] = None
+) -> SimulationSetup:
+    """Featurize the pool and pick the model's top candidates for the current pick
+
+    ``current_pick`` is the pick number within the round, as everywhere else
+    in the API.
+    """
+    snapshot = model.snapshot
+    if snapshot is None:
+        raise RuntimeError("ML model not loaded. Please train the model first.")
+    if not 1 <= current_pick <= num_teams:
+        raise ValueError(f"current_pick must be between 1 and num_teams ({num_teams})")
+    if not 1 <= current_round <= num_rounds:
+        raise ValueError(f"current_round must be between 1 and num_rounds ({num_rounds})")
+    if not available_players:
+        raise ValueError("No available players to simulate")
+
+    player_features, bye_weeks = model._player_features_and_byes(available_players)
+    # Bye conflicts stay those against the current roster for every simulated pick
+    model._apply_bye_conflicts(player_features[np.newaxis], [user_roster], bye_weeks)
+    features = player_features.copy()
+    model._apply_draft_context(features, user_roster, current_round, current_pick, bye_weeks)
+    scores = model._score_features(features, snapshot)
+
+    # K/DST go last so early-round opponent picks can skip them with a slice
+    position = player_features[:, :len(POSITIONS)].argmax(axis=1)
+    player_index = np.argsort(np.isin(position, LATE_ONLY_POSITIONS), kind='stable')
+    feature_row = np.empty_like(player_index)
+    feature_row[player_index] = np.arange(len(player_index))
+
+    top_idx = model._top_k_indices(scores, num_candidates)
+
+    return SimulationSetup(
+        player_features=player_features[player_index],
+        player_index=player_index,
+        candidates=feature_row[top_idx],
+        candidate_scores=scores[top_idx],
+        roster_counts=model._roster_counts([user_roster])[0],
+        num_teams=num_teams,
+        num_rounds=num_rounds,
+        pick_index=(current_round - 1) * num_teams + current_pick - 1,
+        scorer=SimulationScorer.from_snapshot(snapshot),
+        max_rounds_ahead=max_rounds_ahead
+    )
+
+def _user_picks(
+    setup: SimulationSetup,
+    available: np.ndarray,
+    user_counts: np.ndarray,
+    adp_order: np.ndarray,
+    pick_index: int
+) -> np.ndarray:
+    """The model's choice for every simulation row, or -1 where nothing is left
+
+    ``available`` is in ADP order. Only the best USER_SHORTLIST available
+    players by ADP are scored, and each distinct (roster, player) pair is
+    scored once.
+    """
+    rows, n = available.shape
+    # At most one player per simulated pick is gone, so the shortlist is within this many columns
+    window = available[:, :min(n, pick_index - setup.pick_index + USER_SHORTLIST)]
+    shortlist = window & (np.cumsum(window, axis=1) <= USER_SHORTLIST)
+    row_idx, col_idx = np.nonzero(shortlist)
+    choice = np.full(rows, -1, dtype=np.intp)
+    if len(row_idx) == 0:
+        return choice
+    players = adp_order[col_idx]
+
+    # Roster states packed into one integer each (counts stay below 64)
+    state_keys = (user_counts.astype(np.int64) << (6 * np.arange(len(POSITIONS)))).sum(axis=1)
+    _, state_first, state_idx = np.unique(state_keys, return_index=True, return_inverse=True)
+    pairs, pair_idx = np.unique(state_idx[row_idx] * n + players, return_inverse=True)
+    features = setup.player_features[pairs % n][:, np.newaxis, :].copy()
+    ScoutAIModel._apply_draft_contexts(
+        features,
+        user_counts[state_first[pairs // n]].astype(np.float64),
+        np.full(len(pairs), pick_index // setup.num_teams + 1, dtype=np.float64),
+        np.full(len(pairs), pick_index % setup.num_teams + 1, dtype=np.float64)
+    )
+    scores = setup.scorer(features[:, 0, :])[pair_idx]
+
+    # Highest score per row; ties go to the better ADP
+    order = np.lexsort((col_idx, -scores, row_idx))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = row_idx[order[1:]] != row_idx[order[:-1]]
+    choice[row_idx[order[first]]] = players[order[first]]
+    return choice
+
+def _lineup_values(setup: SimulationSetup, picks: np.ndarray, points: np.ndarray, position: np.ndarray) -> np.ndarray:
+    """Points the user's new picks add to the starting lineup, per simulation row
+
+    Players already on the roster keep their starting slots; their points
+    are the same for every candidate and are left out.
+    """
+    valid = picks >= 0
+    pick_points = np.where(valid, points[np.maximum(picks, 0)], -np.inf)
+    pick_position = np.where(valid, position[np.maximum(picks, 0)], -1)
+
+    open_slots = np.maximum(0, STARTER_SLOTS - setup.roster_counts).astype(int)
+    bench_flex = np.maximum(0, setup.roster_counts - STARTER_SLOTS)[FLEX_POSITIONS].sum()
+    open_flex = max(0, FLEX_SLOTS - int(bench_flex))
+
+    values = np.zeros(len(picks))
+    leftovers = []
+    for p in range(len(POSITIONS)):
+        # Descending points of this position's picks, -inf padded
+        ranked = -np.sort(-np.where(pick_position == p, pick_points, -np.inf), axis=1)
+        starters = ranked[:, :open_slots[p]]
+        values += np.where(np.isfinite(starters), starters, 0).sum(axis=1)
+        if p in FLEX_POSITIONS:
+            leftovers.append(ranked[:, open_slots[p]:])
+    if open_flex and leftovers:
+        flex = -np.sort(-np.concatenate(leftovers, axis=1), axis=1)[:, :open_flex]
+        values += np.where(np.isfinite(flex), flex, 0).sum(axis=1)
+    return values
+
+def _empty_chunk(num_candidates: int) -> Dict[str, Any]:
+    return {
+        'sum': np.zeros(num_candidates),
+        'sum_sq': np.zeros(num_candidates),
+        'wins': np.zeros(num_candidates, dtype=np.int64),
+        'count': 0
+    }
+
+def simulate_chunk(
+    setup: SimulationSetup,
+    num_simulations: int,
+    seed: int,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """Play out the rest of the draft num_simulations times for every candidate
+
+    Runs in a worker process. Returns per-candidate sums so chunks can be
+    merged: ``sum``, ``sum_sq``, ``wins`` (simulations where the candidate
+    was best) and ``count``. Past ``deadline`` (a ``time.time()`` value) the
+    caller no longer waits for the chunk, so it stops and returns an empty
+    result instead of holding a pool worker.
+    """
+    rng = np.random.default_rng(seed)
+    features = setup.player_features
+    n = len(features)
+    position = features[:, :len(POSITIONS)].argmax(axis=1)
+    adp = features[:, 6]
+    points = features[:, 7]
+    adp_order = np.argsort(adp, kind='stable')
+    adp_rank = np.empty_like(adp_order)
+    adp_rank[adp_order] = np.arange(n)
+    num_candidates = len(setup.candidates)
+    rows = num_candidates * num_simulations
+    row_range = np.arange(rows)
+
+    num_early = setup.num_early_players
+
+    # One noisy board per simulation, shared by every candidate; taken players are inf.
+    # The noise uses the same ADP spread as the next-pick availability probabilities.
+    noise = rng.standard_normal((num_simulations, n)) * DEFAULT_ADP_SPREAD.sd(adp)
+    board = np.tile((adp + noise).astype(np.float32), (num_candidates, 1))
+    first_pick = np.repeat(setup.candidates, num_simulations)
+    board[row_range, first_pick] = np.inf
+    # The same availability in ADP order, for the user's shortlist
+    available = np.ones((rows, n), dtype=bool)
+    available[row_range, adp_rank[first_pick]] = False
+
+    user_counts = np.tile(setup.roster_counts, (rows, 1))
+    user_counts[row_range, position[first_pick]] += 1
+    picks = [first_pick]
+    opponent_counts = np.zeros((rows, setup.num_teams, len(POSITIONS)), dtype=np.int64)
+    user_team = pick_team(setup.pick_index, setup.num_teams)
+
+    for pick_index in range(setup.pick_index + 1, setup.end_index):
+        if deadline is not None and time.time() > deadline:
+            return _empty_chunk(num_candidates)
+        team = pick_team(pick_index, setup.num_teams)
+        if team == user_team:
+            choice = _user_picks(setup, available, user_counts, adp_order, pick_index)
+            made = choice >= 0
+            user_counts[row_range[made], position[choice[made]]] += 1
+            picks.append(choice)
+        else:
+            allowed = opponent_counts[:, team, :] < OPPONENT_CAPS
+            if pick_index // setup.num_teams < setup.num_rounds - LATE_ROUNDS:
+                allowed[:, LATE_ONLY_POSITIONS] = False
+                choice = board[:, :num_early].argmin(axis=1)
+                # Every player before the K/DST block is gone: look at the whole board instead
+                exhausted = np.isinf(board[row_range, choice])
+                if exhausted.any():
+                    choice[exhausted] = board[exhausted].argmin(axis=1)
+            else:
+                choice = board.argmin(axis=1)
+            # Rows whose best player breaks a roster cap redo the pick with the rules applied
+            broken = ~allowed[row_range, position[choice]]
+            if broken.any():
+                keys = np.where(allowed[broken][:, position], board[broken], np.inf)
+                fixed = keys.argmin(axis=1)
+                # No player fits the roster rules: take the best one left
+                stuck = np.isinf(keys[np.arange(len(fixed)), fixed])
+                fixed[stuck] = board[broken][stuck].argmin(axis=1)
+                choice[broken] = fixed
+            made = np.isfinite(board[row_range, choice])
+            choice = np.where(made, choice, -1)
+            opponent_counts[row_range[made], team, position[choice[made]]] += 1
+        made = choice >= 0
+        board[row_range[made], choice[made]] = np.inf
+        available[row_range[made], adp_rank[choice[made]]] = False
+
+    values = _lineup_values(setup, np.stack(picks, axis=1), points, position).reshape(num_candidates, num_simulations)
+    return {
+        'sum': values.sum(axis=1),
+        'sum_sq': np.square(values).sum(axis=1),
+        'wins': np.bincount(values.argmax(axis=0), minlength=num_candidates),
+        'count': num_simulations
+    }
+
+async def run_simulations(
+    pool: BoundedExecutor,
+    setup: SimulationSetup,
+    num_simulations: int,
+    time_budget_seconds: float,
+    chunk_size: int = 100,
+    seed: Optional[int] = None
+) -> SimulationResult:
+    """Run chunks of simulations on the pool until num_simulations or the time budget is reached
+
+    At most ``pool.max_workers`` chunks are in flight at once. The first
+    chunk is always waited for, so there is an estimate even when the
+    budget is shorter than one chunk. Later chunks get the deadline and stop
+    at it themselves, so abandoned chunks free their workers quickly.
+    Raises PoolOverloaded only if not even the first chunk can be queued.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + time_budget_seconds
+    seeds = np.random.SeedSequence(seed)
+
+    # Workers are other processes, so they get the deadline on the wall clock
+    worker_deadline = time.time() + time_budget_seconds
+
+    k = len(setup.candidates)
+    totals = _empty_chunk(k)
+    pending = set()
+    submitted = 0
+
+    def submit():
+        nonlocal submitted
+        size = min(chunk_size, num_simulations - submitted)
+        chunk_seed = int(seeds.spawn(1)[0].generate_state(1)[0])
+        # The first chunk always finishes, so there is an estimate
+        chunk_deadline = worker_deadline if submitted else None
+        pending.add(asyncio.wrap_future(pool.submit(simulate_chunk, setup, size, chunk_seed, chunk_deadline)))
+        submitted += size
+
+    def fill():
+        while submitted < num_simulations and len(pending) < pool.max_workers:
+            try:
+                submit()
+            except PoolOverloaded:
+                break  # Other requests are using the pool; carry on with what is in flight
+
+    submit()
+    fill()
+    budget_exhausted = False
+    while pending:
+        timeout = None if totals['count'] == 0 else max(0.0, deadline - loop.time())
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            budget_exhausted = True
+            break
+        for future in done:
+            chunk = future.result()
+            for key in totals:
+                totals[key] = totals[key] + chunk[key]
+        # Chunks stopped at the deadline come back empty; keep waiting for the first one
+        if totals['count'] and loop.time() >= deadline:
+            budget_exhausted = bool(pending) or submitted < num_simulations
+            break
+        fill()
+    for future in pending:
+        future.cancel()
+
+    count = totals['count']
+    mean = totals['sum'] / count
+    variance = np.maximum(0.0, totals['sum_sq'] / count - np.square(mean))
+    elapsed = loop.time() - start
+    logger.info(f"Ran {count} draft simulations for {k} candidates in {elapsed:.2f}s")
+    return SimulationResult(
+        candidates=setup.player_index[setup.candidates],
+        mean=mean,
+        std_error=np.sqrt(variance / max(1, count - 1)),
+        best_probability=totals['wins'] / count,
+        simulations=count,
+        elapsed_seconds=elapsed,
+        budget_exhausted=budget_exhausted
+    )
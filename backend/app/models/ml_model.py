@@ -1,149 +1,553 @@
 import numpy as np
-import pandas as pd
 import pickle
 import logging
-from typing import List, Dict, Any, Optional
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import xgboost as xgb
-from app.models.schemas import Player, Roster, Recommendation, Position
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, Sequence, Tuple, TYPE_CHECKING
+from app.models.schemas import Player, Roster, Recommendation, Position, DraftContext
+from app.models.columnar import PlayerTable
+from app.models.explanations import ContributionExplainer
+from app.models.team_context import TeamContextStore, context_params, encode_teams
+from app.models.schedule import MAX_WEEK, SCHEDULE_COLUMNS, ScheduleStore
+from app.models.artifacts import ArtifactStore, ArrayScaler
+from app.models.tree_ensemble import CompiledEnsemble, compile_booster
+from app.models.availability import CAN_WAIT_PROBABILITY, adp_spread, availability_at_next_pick, league_params
+from app.utils import metrics
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import functools
 import os
+import threading
+import time
+
+# pandas, sklearn and xgboost are only needed for training and the XGBoost
+# scoring path, so they are imported on first use to keep API startup fast
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Position order used for the one-hot and roster count feature blocks
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'K', 'DST']
+POSITION_INDEX = {position: i for i, position in enumerate(POSITIONS)}
+TARGET_COUNTS = np.array([1, 3, 3, 1, 1, 1], dtype=np.float64)
+
+# Features every model uses; team-context and schedule columns, when enabled, follow them
+BASE_FEATURE_COLUMNS = [
+    'position_qb', 'position_rb', 'position_wr', 'position_te', 'position_k', 'position_dst',
+    'adp', 'projected_points', 'bye_week',
+    'roster_qb_count', 'roster_rb_count', 'roster_wr_count', 'roster_te_count', 'roster_k_count', 'roster_dst_count',
+    'current_round', 'current_pick',
+    'position_need_score', 'adp_value', 'points_value'
+]
+
+# Rows drawn per spawned Generator when producing synthetic training data
+TRAINING_BLOCK_SIZE = 65536
+
+# XGBoost settings used unless train_model is given tuned parameters
+DEFAULT_XGB_PARAMS = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1}
+
+def _or_default(values: np.ndarray, default: float) -> np.ndarray:
+    """Column version of ``value or default``: NaN (missing) and 0 both take the default"""
+    return np.where(np.isnan(values) | (values == 0), default, values)
+
+class TrainingCancelled(Exception):
+    """Raised when a training run is cancelled before it finishes"""
+
+def _training_progress(num_rounds: int, on_progress: Callable[[float], bool]):
+    """XGBoost callback that reports per-round progress and stops on request"""
+    import xgboost as xgb
+    
+    class _TrainingProgress(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log) -> bool:
+            # Returning True stops boosting early
+            return not on_progress((epoch + 1) / num_rounds)
+    
+    return _TrainingProgress()
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """Immutable trained model and scaler pair used for scoring
+    
+    A new snapshot is built for every trained or loaded model and swapped in
+    with a single attribute assignment, so a request that has already read
+    the snapshot keeps a consistent model+scaler pair.
+    
+    Snapshots loaded from disk score with the compiled ensemble and leave
+    ``model`` as None; get_model() loads the XGBoost model on first use.
+    """
+    model: Any
+    scaler: Any
+    label_encoders: Dict[str, Any]
+    version: str
+    trained_at: float
+    load_seconds: float = 0.0
+    # NumPy copy of the model with the scaler folded in (None if it could not be compiled)
+    compiled: Optional[CompiledEnsemble] = None
+    model_loader: Optional[Callable[[], Any]] = field(default=None, repr=False, compare=False)
+    _model_lock: Any = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    
+    def get_model(self):
+        """The XGBoost model, loading it on first use"""
+        if self.model is None and self.model_loader is not None:
+            with self._model_lock:
+                if self.model is None:
+                    # Memoized once; the model itself never changes within a snapshot
+                    object.__setattr__(self, 'model', self.model_loader())
+        return self.model
+
 class ScoutAIModel:
     """Real ML model for fantasy football draft recommendations"""
     
-    def __init__(self, model_path: str = "models/scoutai_model.pkl"):
-        self.model_path = model_path
-        self.model = None
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
+    def __init__(
+        self,
+        model_dir: str = "models/artifacts",
+        legacy_model_path: str = "models/scoutai_model.pkl",
+        keep_versions: int = 5,
+        loaded_versions: int = 3,
+        compiled_max_rows: int = 32,
+        adp_spread_path: Optional[str] = None,
+        explanation_cache_size: int = 4096,
+        exact_explanations: bool = False,
+        team_context_dir: Optional[str] = None,
+        schedule_dir: Optional[str] = None,
+        raise_save_errors: bool = False
+    ):
+        self.model_dir = model_dir
+        self.legacy_model_path = legacy_model_path
+        self.artifacts = ArtifactStore(model_dir, keep_versions=keep_versions)
+        # Training jobs need a failed save to fail the job; the API keeps serving the model it has
+        self.raise_save_errors = raise_save_errors
+        self._snapshot: Optional[ModelSnapshot] = None
+        # Recently loaded versions stay in memory so rollback is instant
+        self._loaded: "OrderedDict[str, ModelSnapshot]" = OrderedDict()
+        self._max_loaded = loaded_versions
+        self._load_attempted = False
+        self._load_lock = threading.RLock()
+        self._xgboost_loading = set()
+        # Batches up to this size are scored by the compiled ensemble, larger ones by XGBoost
+        self.compiled_max_rows = compiled_max_rows
+        # Optional JSON file of per-season ADP spreads for availability probabilities
+        self.adp_spread_path = adp_spread_path
         self.model_version = "1.0.0"
-        self.is_model_loaded = False
-        self.feature_columns = [
-            'position_qb', 'position_rb', 'position_wr', 'position_te', 'position_k', 'position_dst',
-            'adp', 'projected_points', 'bye_week',
-            'roster_qb_count', 'roster_rb_count', 'roster_wr_count', 'roster_te_count', 'roster_k_count', 'roster_dst_count',
-            'current_round', 'current_pick',
-            'position_need_score', 'adp_value', 'points_value'
-        ]
+        # Optional memory-mapped team offense/defense context, appended to the base features
+        self.team_context_dir = team_context_dir
+        self.team_context = TeamContextStore.load(team_context_dir) if team_context_dir else None
+        # Optional strength-of-schedule tables; adds schedule and bye-conflict columns after those
+        self.schedule_dir = schedule_dir
+        self.schedule = ScheduleStore.load(schedule_dir) if schedule_dir else None
+        self.feature_columns = (
+            BASE_FEATURE_COLUMNS
+            + (self.team_context.columns if self.team_context else [])
+            + (SCHEDULE_COLUMNS + ['bye_conflicts'] if self.schedule else [])
+        )
+        if self.schedule is not None:
+            self._schedule_column = self.feature_columns.index(SCHEDULE_COLUMNS[0])
+            self._bye_conflicts_column = self.feature_columns.index('bye_conflicts')
+        # Explanations from the model's per-feature contributions for the top-k rows
+        self.explainer = ContributionExplainer(
+            self.feature_columns, max_entries=explanation_cache_size, exact=exact_explanations
+        )
+    
+    @property
+    def snapshot(self) -> Optional[ModelSnapshot]:
+        """The model snapshot currently used for scoring (loaded on first use)"""
+        if not self._load_attempted:
+            with self._load_lock:
+                if not self._load_attempted:
+                    self._load_model()
+        return self._snapshot
+    
+    @property
+    def load_attempted(self) -> bool:
+        """True once the saved model has been looked for, whether or not one was found"""
+        return self._load_attempted
+    
+    @property
+    def model(self):
+        snapshot = self.snapshot
+        return snapshot.get_model() if snapshot else None
+    
+    @property
+    def scaler(self):
+        snapshot = self.snapshot
+        return snapshot.scaler if snapshot else None
+    
+    @property
+    def label_encoders(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return snapshot.label_encoders if snapshot else {}
+    
+    @property
+    def is_model_loaded(self) -> bool:
+        return self.snapshot is not None
+    
+    @property
+    def model_path(self) -> Optional[str]:
+        """Artifact directory of the version being served"""
+        snapshot = self.snapshot
+        return self.artifacts.path(snapshot.version) if snapshot else None
+    
+    def publish(self, snapshot: Optional[ModelSnapshot]):
+        """Atomically swap in a new model snapshot (None unloads the model)"""
+        self._load_attempted = True
+        self._snapshot = snapshot
+        metrics.MODEL_INFO.clear()
+        if snapshot is not None:
+            metrics.MODEL_INFO.labels(snapshot.version, str(snapshot.compiled is not None).lower()).set(1)
+    
+    def _load_model(self) -> bool:
+        """Load the trained ML model named by the artifact store's CURRENT pointer
+        
+        Returns True if a model was loaded. If loading fails, the model
+        currently in use (if any) stays published.
+        """
+        with self._load_lock:
+            try:
+                version = self.artifacts.current()
+                if version is None and os.path.exists(self.legacy_model_path):
+                    version = self._migrate_legacy_model()
+                if version is None:
+                    logger.warning("No trained model found. Please train the model first.")
+                    self.publish(None)
+                    return False
+                self.publish(self.load_version(version))
+                logger.info(f"ML model {version} loaded successfully from disk")
+                return True
+            except Exception as e:
+                metrics.ERRORS.labels('model_load').inc()
+                logger.error(f"Error loading ML model: {e}")
+            finally:
+                self._load_attempted = True
+            return False
+    
+    def warm_up(self):
+        """Load the current model, then its XGBoost model for large batches
         
-        self._load_model()
+        Meant to run in the background at startup: the compiled ensemble is
+        ready to score as soon as the snapshot is published.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None:
+            self._load_xgboost_model(snapshot)
+    
+    def _load_xgboost_model(self, snapshot: ModelSnapshot):
+        try:
+            start = time.perf_counter()
+            snapshot.get_model()
+            logger.info(f"XGBoost model {snapshot.version} ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+        except Exception as e:
+            metrics.ERRORS.labels('xgboost_load').inc()
+            logger.error(f"Error loading XGBoost model {snapshot.version}: {e}")
+    
+    def _load_xgboost_model_in_background(self, snapshot: ModelSnapshot):
+        with self._load_lock:
+            if snapshot.version in self._xgboost_loading:
+                return
+            self._xgboost_loading.add(snapshot.version)
+        threading.Thread(
+            target=self._load_xgboost_model, args=(snapshot,), name="xgboost-loader", daemon=True
+        ).start()
+    
+    def load_version(self, version: str) -> ModelSnapshot:
+        """Load a saved model version, reusing it if it is already in memory"""
+        with self._load_lock:
+            snapshot = self._loaded.get(version)
+            if snapshot is not None:
+                self._loaded.move_to_end(version)
+                return snapshot
+            
+            start = time.perf_counter()
+            scaler, manifest = self.artifacts.load(version)
+            if manifest['feature_columns'] != self.feature_columns:
+                raise ValueError(f"Model version {version} was trained on a different feature set")
+            model_loader = functools.partial(self.artifacts.load_model, version)
+            model = None
+            compiled = self.artifacts.load_compiled(version)
+            if compiled is None:
+                # Saved without a compiled ensemble: score with XGBoost and try compiling it now
+                model = model_loader()
+                compiled = self._compile(model, scaler)
+            snapshot = ModelSnapshot(
+                model=model,
+                scaler=scaler,
+                label_encoders={},
+                version=version,
+                trained_at=manifest.get('trained_at', manifest['created_at']),
+                load_seconds=time.perf_counter() - start,
+                compiled=compiled,
+                model_loader=model_loader
+            )
+            logger.info(f"Loaded model version {version} in {snapshot.load_seconds * 1000:.1f} ms")
+            self._remember(snapshot)
+            return snapshot
+    
+    def _remember(self, snapshot: ModelSnapshot):
+        self._loaded[snapshot.version] = snapshot
+        self._loaded.move_to_end(snapshot.version)
+        while len(self._loaded) > self._max_loaded:
+            self._loaded.popitem(last=False)
+    
+    def activate_version(self, version: str) -> ModelSnapshot:
+        """Serve a saved version (e.g. roll back to a previous model)"""
+        with self._load_lock:
+            snapshot = self.load_version(version)
+            self.artifacts.set_current(version)
+            self.publish(snapshot)
+            return snapshot
+    
+    def delete_current_version(self) -> Optional[str]:
+        """Delete the served version from disk and unload it"""
+        with self._load_lock:
+            version = self.artifacts.current()
+            if version is not None:
+                self.artifacts.set_current(None)
+                self.artifacts.delete(version)
+                self._loaded.pop(version, None)
+            self.publish(None)
+            return version
+    
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Saved model versions, newest first"""
+        current = self.artifacts.current()
+        versions = []
+        for version in reversed(self.artifacts.versions()):
+            manifest = self.artifacts.read_manifest(version)
+            versions.append({
+                'version': version,
+                'current': version == current,
+                'loaded': version in self._loaded,
+                'trained_at': manifest.get('trained_at'),
+                'metrics': manifest.get('metrics')
+            })
+        return versions
+    
+    def _migrate_legacy_model(self) -> Optional[str]:
+        """Convert a pickled model from before artifact directories into an artifact"""
+        with open(self.legacy_model_path, 'rb') as f:
+            model_data = pickle.load(f)
+        trained_at = model_data.get('trained_at') or os.path.getmtime(self.legacy_model_path)
+        snapshot = ModelSnapshot(
+            model=model_data['model'],
+            scaler=model_data['scaler'],
+            label_encoders={},
+            version=self._snapshot_version(trained_at),
+            trained_at=trained_at,
+            compiled=self._compile(model_data['model'], model_data['scaler'])
+        )
+        logger.info(f"Migrating legacy model {self.legacy_model_path} to {self.model_dir}")
+        self._save_model(snapshot)
+        return snapshot.version
     
-    def _load_model(self):
-        """Load the trained ML model"""
+    def _compile(self, model, scaler) -> Optional[CompiledEnsemble]:
+        """Compile a trained model and scaler for NumPy scoring, or None if unsupported"""
         try:
-            if os.path.exists(self.model_path):
-                with open(self.model_path, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.model = model_data['model']
-                    self.scaler = model_data['scaler']
-                    self.label_encoders = model_data['label_encoders']
-                    self.is_model_loaded = True
-                logger.info("ML model loaded successfully from disk")
-            else:
-                logger.warning("No trained model found. Please train the model first.")
-                self.is_model_loaded = False
+            return compile_booster(model.get_booster(), scaler.mean_, scaler.scale_)
         except Exception as e:
-            logger.error(f"Error loading ML model: {e}")
-            self.is_model_loaded = False
+            logger.warning(f"Could not compile model for NumPy scoring, using XGBoost: {e}")
+            return None
+    
+    def _snapshot_version(self, trained_at: float) -> str:
+        millis = int(trained_at * 1000) % 1000
+        return f"{self.model_version}+{time.strftime('%Y%m%d%H%M%S', time.gmtime(trained_at))}{millis:03d}"
     
-    def _save_model(self):
-        """Save the trained model to disk"""
+    def _save_model(
+        self,
+        snapshot: ModelSnapshot,
+        metrics: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        tuning: Optional[Dict[str, Any]] = None
+    ):
+        """Save a trained model snapshot as a new artifact version and make it current
+        
+        Errors are logged, and re-raised if ``raise_save_errors`` is set.
+        """
         try:
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            model_data = {
-                'model': self.model,
-                'scaler': self.scaler,
-                'label_encoders': self.label_encoders,
-                'version': self.model_version
-            }
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(model_data, f)
+            self.artifacts.save(
+                snapshot.version,
+                snapshot.get_model(),
+                snapshot.scaler,
+                self.feature_columns,
+                extra={
+                    'model_version': self.model_version,
+                    'trained_at': snapshot.trained_at,
+                    'metrics': metrics,
+                    'params': params,
+                    'tuning': tuning
+                },
+                compiled=snapshot.compiled
+            )
+            self.artifacts.set_current(snapshot.version)
+            self.artifacts.prune()
             logger.info("Model saved successfully")
         except Exception as e:
             logger.error(f"Error saving model: {e}")
+            if self.raise_save_errors:
+                raise
     
-    def generate_training_data(self, num_samples: int = 10000) -> pd.DataFrame:
+    def generate_training_data(
+        self,
+        num_samples: int = 10000,
+        seed: int = 42,
+        chunk_size: Optional[int] = None
+    ) -> "pd.DataFrame":
         """Generate synthetic training data for the model"""
-        np.random.seed(42)
+        import pandas as pd
         
-        data = []
-        positions = ['QB', 'RB', 'WR', 'TE', 'K', 'DST']
+        chunks = list(self.iter_training_data(num_samples, chunk_size=chunk_size or TRAINING_BLOCK_SIZE, seed=seed))
+        if not chunks:
+            return self._training_frame(self._generate_training_arrays(np.random.default_rng(seed), 0))
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_training_data(
+        self,
+        num_samples: int,
+        chunk_size: int = TRAINING_BLOCK_SIZE,
+        seed: int = 42
+    ) -> Iterator["pd.DataFrame"]:
+        """Yield synthetic training data as DataFrames of at most chunk_size rows
         
-        for _ in range(num_samples):
-            # Generate player features
-            position = np.random.choice(positions)
-            adp = np.random.uniform(1, 200)
-            projected_points = np.random.uniform(50, 400)
-            bye_week = np.random.randint(1, 18)
-            
-            # Generate roster state
-            roster_counts = {
-                'QB': np.random.randint(0, 3),
-                'RB': np.random.randint(0, 6),
-                'WR': np.random.randint(0, 6),
-                'TE': np.random.randint(0, 3),
-                'K': np.random.randint(0, 2),
-                'DST': np.random.randint(0, 2)
-            }
-            
-            current_round = np.random.randint(1, 16)
-            current_pick = np.random.randint(1, 13)
-            
-            # Calculate position need score
-            target_counts = {'QB': 1, 'RB': 3, 'WR': 3, 'TE': 1, 'K': 1, 'DST': 1}
-            position_need = max(0, (target_counts[position] - roster_counts[position]) / target_counts[position])
-            
-            # Calculate ADP value (lower ADP = higher value)
-            adp_value = max(0, (200 - adp) / 200)
-            
-            # Calculate points value
-            points_value = min(1.0, projected_points / 400)
-            
-            # Create feature vector
-            features = {
-                'position_qb': 1 if position == 'QB' else 0,
-                'position_rb': 1 if position == 'RB' else 0,
-                'position_wr': 1 if position == 'WR' else 0,
-                'position_te': 1 if position == 'TE' else 0,
-                'position_k': 1 if position == 'K' else 0,
-                'position_dst': 1 if position == 'DST' else 0,
-                'adp': adp,
-                'projected_points': projected_points,
-                'bye_week': bye_week,
-                'roster_qb_count': roster_counts['QB'],
-                'roster_rb_count': roster_counts['RB'],
-                'roster_wr_count': roster_counts['WR'],
-                'roster_te_count': roster_counts['TE'],
-                'roster_k_count': roster_counts['K'],
-                'roster_dst_count': roster_counts['DST'],
-                'current_round': current_round,
-                'current_pick': current_pick,
-                'position_need_score': position_need,
-                'adp_value': adp_value,
-                'points_value': points_value
-            }
-            
-            # Generate target (draft recommendation score)
-            # This is a simplified scoring function - in practice, you'd use real draft data
-            target_score = (
-                position_need * 0.4 +
-                adp_value * 0.3 +
-                points_value * 0.3 +
-                np.random.normal(0, 0.1)  # Add some noise
-            )
-            target_score = max(0, min(1, target_score))  # Clamp to [0, 1]
-            
-            features['target_score'] = target_score
-            data.append(features)
+        Rows are drawn in fixed-size blocks, each from its own Generator spawned
+        from ``seed``, so the sample stream depends only on the seed and not on
+        chunk_size.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        
+        # Rows left over from earlier blocks, fewer than chunk_size; only a
+        # chunk that spans blocks is concatenated, the rest are slices
+        pending: List[Dict[str, np.ndarray]] = []
+        pending_rows = 0
+        for block in self._iter_training_blocks(num_samples, seed):
+            block_rows = len(block['target_score'])
+            offset = 0
+            if pending:
+                needed = chunk_size - pending_rows
+                pending.append({k: v[:needed] for k, v in block.items()})
+                if block_rows < needed:
+                    pending_rows += block_rows
+                    continue
+                yield self._training_frame({k: np.concatenate([b[k] for b in pending]) for k in block})
+                pending, pending_rows, offset = [], 0, needed
+            while block_rows - offset >= chunk_size:
+                yield self._training_frame({k: v[offset:offset + chunk_size] for k, v in block.items()})
+                offset += chunk_size
+            if offset < block_rows:
+                pending.append({k: v[offset:] for k, v in block.items()})
+                pending_rows = block_rows - offset
+        if pending:
+            yield self._training_frame({k: np.concatenate([b[k] for b in pending]) for k in pending[0]})
+    
+    def _iter_training_blocks(self, num_samples: int, seed: int) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield column arrays for consecutive TRAINING_BLOCK_SIZE-row blocks"""
+        num_blocks = -(-num_samples // TRAINING_BLOCK_SIZE)
+        for i, block_seed in enumerate(np.random.SeedSequence(seed).spawn(num_blocks)):
+            rows = min(TRAINING_BLOCK_SIZE, num_samples - i * TRAINING_BLOCK_SIZE)
+            yield self._generate_training_arrays(np.random.default_rng(block_seed), rows)
+    
+    def _generate_training_arrays(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        """Draw n synthetic samples as one array per column"""
+        # Generate player features
+        position_idx = rng.integers(0, len(POSITIONS), size=n)
+        adp = rng.uniform(1, 200, size=n)
+        projected_points = rng.uniform(50, 400, size=n)
+        bye_week = rng.integers(1, 18, size=n, dtype=np.int8)
+        
+        # Generate roster state (one column per position)
+        max_counts = np.array([3, 6, 6, 3, 2, 2])
+        roster_counts = rng.integers(0, max_counts, size=(n, len(POSITIONS)), dtype=np.int8)
+        
+        current_round = rng.integers(1, 16, size=n, dtype=np.int8)
+        current_pick = rng.integers(1, 13, size=n, dtype=np.int8)
+        
+        # Calculate position need score
+        target = TARGET_COUNTS[position_idx]
+        own_count = roster_counts[np.arange(n), position_idx]
+        position_need = np.maximum(0, (target - own_count) / target)
         
-        return pd.DataFrame(data)
+        # Calculate ADP value (lower ADP = higher value)
+        adp_value = np.maximum(0, (200 - adp) / 200)
+        
+        # Calculate points value
+        points_value = np.minimum(1.0, projected_points / 400)
+        
+        # Generate target (draft recommendation score)
+        # This is a simplified scoring function - in practice, you'd use real draft data
+        target_score = (
+            position_need * 0.4 +
+            adp_value * 0.3 +
+            points_value * 0.3 +
+            rng.normal(0, 0.1, size=n)  # Add some noise
+        )
+        # Team context from random (week, team) pairs; drawn last so the base columns
+        # match those of a model trained without it
+        if self.team_context is not None:
+            context = self.team_context.sample(rng, n)
+            mean, std = self.team_context.column_stats()
+            strength = np.tanh((context - mean) / np.where(std > 0, std, 1))
+            # Players on strong offenses score a little higher; DST by its own defense
+            is_dst = position_idx == POSITION_INDEX['DST']
+            offense = strength[:, self.team_context.columns.index('team_off_total_off_points')]
+            defense = strength[:, self.team_context.columns.index('team_def_sack')]
+            target_score = target_score + 0.05 * np.where(is_dst, defense, offense)
+        if self.schedule is not None:
+            sos = self.schedule.sample(rng, position_idx == POSITION_INDEX['DST'])
+            # Rostered players at the candidate's position sharing its bye week (about 1 in 13 each)
+            bye_conflicts = rng.binomial(own_count, 1 / 13)
+            target_score = target_score - 0.05 * bye_conflicts - 0.03 * np.tanh(sos[:, 1])
+        target_score = np.clip(target_score, 0, 1)  # Clamp to [0, 1]
+        
+        one_hot = np.zeros((n, len(POSITIONS)), dtype=np.int8)
+        one_hot[np.arange(n), position_idx] = 1
+        
+        columns = {f'position_{p.lower()}': one_hot[:, i] for i, p in enumerate(POSITIONS)}
+        columns.update({
+            'adp': adp.astype(np.float32),
+            'projected_points': projected_points.astype(np.float32),
+            'bye_week': bye_week,
+        })
+        columns.update({f'roster_{p.lower()}_count': roster_counts[:, i] for i, p in enumerate(POSITIONS)})
+        columns.update({
+            'current_round': current_round,
+            'current_pick': current_pick,
+            'position_need_score': position_need.astype(np.float32),
+            'adp_value': adp_value.astype(np.float32),
+            'points_value': points_value.astype(np.float32),
+            'target_score': target_score.astype(np.float32)
+        })
+        if self.team_context is not None:
+            columns.update({name: context[:, i] for i, name in enumerate(self.team_context.columns)})
+        if self.schedule is not None:
+            columns.update({name: sos[:, i] for i, name in enumerate(SCHEDULE_COLUMNS)})
+            columns['bye_conflicts'] = bye_conflicts.astype(np.int8)
+        return columns
+    
+    def _training_frame(self, columns: Dict[str, np.ndarray]) -> "pd.DataFrame":
+        """Build a training DataFrame in feature_columns order from column arrays"""
+        import pandas as pd
+        
+        return pd.DataFrame({name: columns[name] for name in self.feature_columns + ['target_score']}, copy=False)
     
-    def train_model(self, data: Optional[pd.DataFrame] = None, test_size: float = 0.2):
-        """Train the XGBoost model"""
+    def train_model(
+        self,
+        data: Optional["pd.DataFrame"] = None,
+        test_size: float = 0.2,
+        on_progress: Optional[Callable[[float], bool]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        tuning: Optional[Dict[str, Any]] = None
+    ):
+        """Train the XGBoost model
+        
+        The new model and scaler are built off to the side and published as a
+        fresh snapshot at the end, so scoring keeps using the previous model
+        until then. ``on_progress`` is called with the fraction of boosting
+        rounds done; returning False cancels training. ``params`` override
+        DEFAULT_XGB_PARAMS; they and the ``tuning`` summary are saved in the
+        model manifest.
+        """
+        import xgboost as xgb
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
         logger.info("Starting model training...")
         
         # Generate training data if none provided
@@ -160,96 +564,372 @@ class ScoutAIModel:
         )
         
         # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
         
         # Train XGBoost model
-        self.model = xgb.XGBRegressor(
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1,
+        params = {**DEFAULT_XGB_PARAMS, **(params or {})}
+        n_estimators = params['n_estimators']
+        model = xgb.XGBRegressor(
             random_state=42,
-            objective='reg:squarederror'
+            objective='reg:squarederror',
+            callbacks=[_training_progress(n_estimators, on_progress)] if on_progress else None,
+            **params
         )
         
-        self.model.fit(X_train_scaled, y_train)
+        model.fit(X_train_scaled, y_train)
+        if on_progress:
+            # The callback holds the progress hook, which must not be pickled with the model
+            model.set_params(callbacks=None)
+            if model.get_booster().num_boosted_rounds() < n_estimators:
+                raise TrainingCancelled("Training cancelled")
         
         # Evaluate model
-        y_pred = self.model.predict(X_test_scaled)
-        mse = mean_squared_error(y_test, y_pred)
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        y_pred = model.predict(X_test_scaled)
+        mse = float(mean_squared_error(y_test, y_pred))
+        mae = float(mean_absolute_error(y_test, y_pred))
+        r2 = float(r2_score(y_test, y_pred))
         
         logger.info(f"Model training complete!")
         logger.info(f"MSE: {mse:.4f}")
         logger.info(f"MAE: {mae:.4f}")
         logger.info(f"R²: {r2:.4f}")
         
-        # Save model
-        self._save_model()
-        self.is_model_loaded = True
-        
-        return {
+        results = {
             'mse': mse,
             'mae': mae,
             'r2': r2,
             'training_samples': len(X_train),
             'test_samples': len(X_test)
         }
+        
+        self._publish_trained(model, ArrayScaler.from_scaler(scaler), results, params, tuning)
+        return results
+    
+    def _publish_trained(
+        self,
+        model,
+        scaler: ArrayScaler,
+        results: Dict[str, Any],
+        params: Dict[str, Any],
+        tuning: Optional[Dict[str, Any]] = None
+    ):
+        """Save a newly trained model, then swap it in"""
+        trained_at = time.time()
+        snapshot = ModelSnapshot(
+            model=model,
+            scaler=scaler,
+            label_encoders={},
+            version=self._snapshot_version(trained_at),
+            trained_at=trained_at,
+            compiled=self._compile(model, scaler)
+        )
+        self._save_model(snapshot, metrics=results, params=params, tuning=tuning)
+        with self._load_lock:
+            self._remember(snapshot)
+            self.publish(snapshot)
+    
+    def training_batches(self, num_samples: int, chunk_size: int = TRAINING_BLOCK_SIZE, seed: int = 42):
+        """Batch source over synthetic training data, generated afresh on every pass"""
+        return lambda: self.iter_training_data(num_samples, chunk_size=chunk_size, seed=seed)
+    
+    def train_model_streaming(
+        self,
+        source: Callable[[], Iterable["pd.DataFrame"]],
+        test_size: float = 0.2,
+        on_progress: Optional[Callable[[float], bool]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        external_memory_dir: Optional[str] = None,
+        seed: int = 42
+    ) -> Dict[str, Any]:
+        """Train out of core from a re-iterable source of DataFrame batches
+        
+        ``source()`` must yield batches with feature_columns and target_score
+        each time it is called, e.g. out_of_core.parquet_batches over the
+        processed store or training_batches. The data is read in three
+        streaming passes (scaler statistics, XGBoost quantization, test
+        metrics) and never held in memory as a whole. With
+        ``external_memory_dir`` XGBoost keeps its pages on disk there instead
+        of in a QuantileDMatrix.
+        """
+        import xgboost as xgb
+        from app.models.out_of_core import (
+            RunningMetrics, RunningScaler, build_dmatrix, peak_rss_mb, split_batches
+        )
+        
+        logger.info("Starting out-of-core model training...")
+        
+        def batches(test: bool = False):
+            return split_batches(source, self.feature_columns, 'target_score', test_size, seed, test=test)
+        
+        # Pass 1: scaler statistics of the training rows
+        running = RunningScaler(len(self.feature_columns))
+        for X, _ in batches():
+            running.update(X)
+        scaler = running.to_scaler()
+        
+        # Pass 2: XGBoost pulls scaled batches into its own compressed matrix
+        dtrain, _ = build_dmatrix(
+            lambda: ((scaler.transform(X), y) for X, y in batches()),
+            external_memory_dir=external_memory_dir
+        )
+        params = {**DEFAULT_XGB_PARAMS, **(params or {})}
+        n_estimators = params['n_estimators']
+        booster_params = {k: v for k, v in params.items() if k != 'n_estimators'}
+        booster = xgb.train(
+            {'objective': 'reg:squarederror', 'tree_method': 'hist', 'seed': 42, **booster_params},
+            dtrain,
+            num_boost_round=n_estimators,
+            callbacks=[_training_progress(n_estimators, on_progress)] if on_progress else None
+        )
+        if booster.num_boosted_rounds() < n_estimators:
+            raise TrainingCancelled("Training cancelled")
+        training_samples = dtrain.num_row()
+        del dtrain
+        
+        # Pass 3: metrics on the held-out rows
+        running_metrics = RunningMetrics()
+        for X, y in batches(test=True):
+            running_metrics.update(y, booster.inplace_predict(scaler.transform(X).astype(np.float32)))
+        results = running_metrics.results()
+        results.update(
+            training_samples=training_samples,
+            test_samples=running_metrics.count,
+            peak_rss_mb=peak_rss_mb()
+        )
+        logger.info(f"Model training complete!")
+        logger.info(f"MSE: {results['mse']:.4f}")
+        logger.info(f"MAE: {results['mae']:.4f}")
+        logger.info(f"R²: {results['r2']:.4f}")
+        logger.info(f"Peak memory: {results['peak_rss_mb']:.0f} MB")
+        
+        # Same model class as train_model produces, so saving and compiling work unchanged
+        model = xgb.XGBRegressor()
+        model.load_model(bytearray(booster.save_raw('json')))
+        self._publish_trained(model, scaler, results, params)
+        return results
+    
+    def tune_model(
+        self,
+        data: Optional["pd.DataFrame"] = None,
+        test_size: float = 0.2,
+        num_trials: int = 20,
+        folds: int = 5,
+        workers: Optional[int] = None,
+        search_space: Optional[Dict[str, Any]] = None,
+        seed: int = 42
+    ) -> Dict[str, Any]:
+        """Pick hyperparameters by cross-validated search, then train and publish a model with them
+        
+        The search only sees the training split, so the test metrics stay
+        honest. Features are not scaled for the search: tree splits do not
+        depend on feature scale.
+        """
+        from sklearn.model_selection import train_test_split
+        from app.models.tuning import search
+        
+        if data is None:
+            data = self.generate_training_data()
+        # Same split as train_model
+        X_train, _, y_train, _ = train_test_split(
+            data[self.feature_columns].to_numpy(), data['target_score'].to_numpy(), test_size=test_size, random_state=42
+        )
+        tuning = search(
+            X_train, y_train,
+            search_space=search_space,
+            num_trials=num_trials,
+            folds=folds,
+            workers=workers,
+            seed=seed
+        )
+        results = self.train_model(data, test_size=test_size, params=tuning['best_params'], tuning=tuning)
+        results['params'] = tuning['best_params']
+        results['cv_rmse'] = tuning['cv_rmse']
+        results['tuning_seconds'] = tuning['wall_seconds']
+        return results
     
     def _prepare_features(self, player: Player, roster: Roster, current_round: int, current_pick: int) -> np.ndarray:
         """Prepare features for a single player"""
-        # Position one-hot encoding
-        position_features = {
-            'QB': [1, 0, 0, 0, 0, 0],
-            'RB': [0, 1, 0, 0, 0, 0],
-            'WR': [0, 0, 1, 0, 0, 0],
-            'TE': [0, 0, 0, 1, 0, 0],
-            'K': [0, 0, 0, 0, 1, 0],
-            'DST': [0, 0, 0, 0, 0, 1]
-        }
+        return self._prepare_features_batch([player], roster, current_round, current_pick)
+    
+    def _prepare_features_batch(
+        self,
+        players: Sequence[Player],
+        roster: Roster,
+        current_round: int,
+        current_pick: int,
+        league_settings: Optional[Dict] = None
+    ) -> np.ndarray:
+        """Prepare the feature matrix (one row per player) in feature_columns order"""
+        features, bye_weeks = self._player_features_and_byes(players, league_settings)
+        self._apply_draft_context(features, roster, current_round, current_pick, bye_weeks)
+        return features
+    
+    def _prepare_player_features(self, players: Sequence[Player], league_settings: Optional[Dict] = None) -> np.ndarray:
+        """Fill the columns that depend only on the players; draft-context columns are left at 0"""
+        return self._player_features_and_byes(players, league_settings)[0]
+    
+    def _player_features_and_byes(
+        self,
+        players: Sequence[Player],
+        league_settings: Optional[Dict] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Player feature matrix and each player's known bye week (0 if unknown)
         
-        # Roster counts
-        roster_counts = {
-            'QB': len(roster.QB),
-            'RB': len(roster.RB),
-            'WR': len(roster.WR),
-            'TE': len(roster.TE),
-            'K': len(roster.K),
-            'DST': len(roster.DST)
-        }
+        Team-context columns are gathered for the league settings' season and
+        week (the latest data if no season is given). Schedule columns and
+        missing bye weeks come from that season's schedule, and stay 0 if it
+        is not stored or no season is given. The bye_week column defaults
+        unknown weeks to 8; bye conflicts are counted from the returned weeks
+        instead, so an unknown week never conflicts.
+        """
+        n = len(players)
+        # Kept in float64 until after scaling so scores match the single-player path exactly
+        features = np.zeros((n, len(self.feature_columns)), dtype=np.float64)
         
-        # Calculate position need
-        target_counts = {'QB': 1, 'RB': 3, 'WR': 3, 'TE': 1, 'K': 1, 'DST': 1}
-        position_need = max(0, (target_counts[player.position] - roster_counts[player.position]) / target_counts[player.position])
+        # Player columns, with the same defaults as the single-player path
+        if isinstance(players, PlayerTable):
+            position_idx = players.position_idx
+            adp = _or_default(players.adp, 100)
+            projected_points = _or_default(players.projected_points, 200)
+            bye_week = players.bye_week
+        else:
+            position_idx = np.fromiter((POSITION_INDEX[p.position] for p in players), dtype=np.intp, count=n)
+            adp = np.fromiter((p.adp or 100 for p in players), dtype=np.float64, count=n)
+            projected_points = np.fromiter((p.projected_points or 200 for p in players), dtype=np.float64, count=n)
+            bye_week = np.fromiter((p.bye_week or np.nan for p in players), dtype=np.float64, count=n)
         
-        # Calculate ADP value
-        adp = player.adp or 100
-        adp_value = max(0, (200 - adp) / 200)
+        season, week = context_params(league_settings)
+        if self.team_context is not None or self.schedule is not None:
+            teams = players.columns.teams if isinstance(players, PlayerTable) else [p.team for p in players]
+            codes, inverse = encode_teams(teams)
+        if self.schedule is not None:
+            schedule_idx = self.schedule.team_indices(codes)[inverse]
+            # Missing bye weeks come from the team's schedule
+            missing = np.isnan(bye_week) | (bye_week == 0)
+            bye_week = np.where(missing, self.schedule.bye_weeks(schedule_idx, season), bye_week)
+        known_byes = np.clip(np.nan_to_num(bye_week), 0, MAX_WEEK).astype(np.intp)
+        bye_week = _or_default(bye_week, 8)
         
-        # Calculate points value
-        projected_points = player.projected_points or 200
-        points_value = min(1.0, projected_points / 400)
-        
-        # Create feature vector
-        features = position_features[player.position] + [
-            adp,
-            projected_points,
-            player.bye_week or 8,
-            roster_counts['QB'],
-            roster_counts['RB'],
-            roster_counts['WR'],
-            roster_counts['TE'],
-            roster_counts['K'],
-            roster_counts['DST'],
-            current_round,
-            current_pick,
-            position_need,
-            adp_value,
-            points_value
-        ]
+        features[np.arange(n), position_idx] = 1
+        features[:, 6] = adp
+        features[:, 7] = projected_points
+        features[:, 8] = bye_week
+        features[:, 18] = np.maximum(0, (200 - adp) / 200)  # ADP value
+        features[:, 19] = np.minimum(1.0, projected_points / 400)  # Points value
+        
+        if self.team_context is not None:
+            start = len(BASE_FEATURE_COLUMNS)
+            team_idx = self.team_context.team_indices(codes)[inverse]
+            features[:, start:start + len(self.team_context.columns)] = self.team_context.gather(team_idx, season, week)
+        if self.schedule is not None:
+            start = self._schedule_column
+            is_dst = position_idx == POSITION_INDEX['DST']
+            features[:, start:start + len(SCHEDULE_COLUMNS)] = self.schedule.gather(schedule_idx, is_dst, season)
+        
+        return features, known_byes
+    
+    def _apply_draft_context(
+        self,
+        features: np.ndarray,
+        roster: Roster,
+        current_round: int,
+        current_pick: int,
+        bye_weeks: Optional[np.ndarray] = None
+    ):
+        """Fill the roster- and pick-dependent columns of a player feature matrix in place
         
-        return np.array(features).reshape(1, -1)
+        ``bye_weeks`` (from _player_features_and_byes) is needed for the
+        bye_conflicts column.
+        """
+        self._apply_draft_contexts(
+            features[np.newaxis],
+            self._roster_counts([roster]),
+            np.array([current_round], dtype=np.float64),
+            np.array([current_pick], dtype=np.float64)
+        )
+        if bye_weeks is not None:
+            self._apply_bye_conflicts(features[np.newaxis], [roster], bye_weeks)
+    
+    @staticmethod
+    def _roster_counts(rosters: List[Roster]) -> np.ndarray:
+        """(contexts, positions) matrix of players already on each roster"""
+        return np.array(
+            [[len(getattr(roster, position)) for position in POSITIONS] for roster in rosters], dtype=np.float64
+        ).reshape(len(rosters), len(POSITIONS))
+    
+    @staticmethod
+    def _roster_byes(rosters: List[Roster]) -> np.ndarray:
+        """(contexts, positions, weeks) count of rostered players with each bye week, from Roster.bye_weeks"""
+        counts = np.zeros((len(rosters), len(POSITIONS), MAX_WEEK + 1), dtype=np.float64)
+        for c, roster in enumerate(rosters):
+            for p, position in enumerate(POSITIONS):
+                for name in getattr(roster, position):
+                    week = roster.bye_weeks.get(name)
+                    if week and 1 <= week <= MAX_WEEK:
+                        counts[c, p, week] += 1
+        return counts
+    
+    def _apply_bye_conflicts(self, features: np.ndarray, rosters: List[Roster], bye_weeks: np.ndarray):
+        """Fill bye_conflicts of a (contexts, players, features) array in place, if the schedule is enabled
+        
+        A conflict is a rostered player at the candidate's position with the
+        same bye week; ``bye_weeks`` holds each player's known week, and week
+        0 (unknown) has no rostered players. One fancy-indexing lookup per array.
+        """
+        if self.schedule is None:
+            return
+        roster_byes = self._roster_byes(rosters)
+        position_idx = features[:, :, :len(POSITIONS)].argmax(axis=2)
+        context_idx = np.arange(len(rosters))[:, np.newaxis]
+        features[:, :, self._bye_conflicts_column] = roster_byes[context_idx, position_idx, bye_weeks[np.newaxis, :]]
+    
+    @staticmethod
+    def _apply_draft_contexts(
+        features: np.ndarray,
+        roster_counts: np.ndarray,
+        current_rounds: np.ndarray,
+        current_picks: np.ndarray
+    ):
+        """Fill the context columns of a (contexts, players, features) array in place
+        
+        Context values broadcast across the player axis, and the player
+        columns broadcast across the context axis.
+        """
+        position_idx = features[:, :, :len(POSITIONS)].argmax(axis=2)
+        target = TARGET_COUNTS[position_idx]
+        own_count = np.take_along_axis(roster_counts, position_idx, axis=1)
+        
+        features[:, :, 9:15] = roster_counts[:, np.newaxis, :]
+        features[:, :, 15] = current_rounds[:, np.newaxis]
+        features[:, :, 16] = current_picks[:, np.newaxis]
+        features[:, :, 17] = np.maximum(0, (target - own_count) / target)
+    
+    def _score_features(self, features: np.ndarray, snapshot: Optional[ModelSnapshot] = None) -> np.ndarray:
+        """Score a feature matrix with the compiled ensemble, or one scaler transform and one model predict"""
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            raise RuntimeError("Model not loaded. Please train the model first.")
+        if len(features) == 0:
+            return np.empty(0, dtype=np.float32)
+        if snapshot.compiled is not None and self.compiled_max_rows > 0:
+            if len(features) > self.compiled_max_rows and snapshot.model is None:
+                # Keep serving from the compiled ensemble until the XGBoost model is loaded
+                self._load_xgboost_model_in_background(snapshot)
+            if len(features) <= self.compiled_max_rows or snapshot.model is None:
+                # No DMatrix or scaling pass; gives the same scores as the XGBoost path
+                metrics.SCORED_ROWS.labels(snapshot.version, 'compiled').inc(len(features))
+                with metrics.stage('predict'):
+                    return np.clip(snapshot.compiled.predict(features), 0, 1)
+        # XGBoost works in float32 internally, so hand it float32 directly
+        with metrics.stage('scale'):
+            features_scaled = snapshot.scaler.transform(features).astype(np.float32)
+        model = snapshot.get_model()
+        metrics.SCORED_ROWS.labels(snapshot.version, 'xgboost').inc(len(features))
+        with metrics.stage('predict'):
+            scores = model.predict(features_scaled)
+        return np.clip(scores, 0, 1)  # Clamp to [0, 1]
     
     def predict_score(self, player: Player, roster: Roster, current_round: int, current_pick: int) -> float:
         """Predict draft recommendation score for a player"""
@@ -257,42 +937,240 @@ class ScoutAIModel:
             raise RuntimeError("Model not loaded. Please train the model first.")
         
         features = self._prepare_features(player, roster, current_round, current_pick)
-        features_scaled = self.scaler.transform(features)
-        score = self.model.predict(features_scaled)[0]
-        return max(0, min(1, score))  # Clamp to [0, 1]
+        return float(self._score_features(features)[0])
+    
+    def predict_scores(
+        self,
+        players: List[Player],
+        roster: Roster,
+        current_round: int,
+        current_pick: int
+    ) -> np.ndarray:
+        """Predict draft recommendation scores for a list of players in one model call"""
+        if not self.is_model_loaded:
+            raise RuntimeError("Model not loaded. Please train the model first.")
+        
+        features = self._prepare_features_batch(players, roster, current_round, current_pick)
+        return self._score_features(features)
+    
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first (ties keep input order)"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order]
     
     def get_recommendations(
         self,
         current_pick: int,
         current_round: int,
         user_roster: Roster,
-        available_players: List[Player]
+        available_players: Sequence[Player],
+        top_k: int = 3,
+        league_settings: Optional[Dict] = None
     ) -> List[Recommendation]:
-        """Generate draft recommendations using the trained model"""
+        """Generate draft recommendations using the trained model
+        
+        ``available_players`` is a list of Player or a PlayerTable.
+        """
         
         if not self.is_model_loaded:
             raise RuntimeError("ML model not loaded. Please train the model first.")
         
-        # Score all available players
-        player_scores = []
-        for player in available_players:
-            try:
-                score = self.predict_score(player, user_roster, current_round, current_pick)
-                player_scores.append((player, score))
-            except Exception as e:
-                logger.warning(f"Error scoring player {player.name}: {e}")
-                continue
+        with metrics.stage('features'):
+            features = self._prepare_features_batch(
+                available_players, user_roster, current_round, current_pick, league_settings
+            )
+        with metrics.stage('availability'):
+            availability = self._availability(
+                self._player_adp(available_players), current_pick, current_round, league_settings
+            )
+        return self.recommend_from_features(
+            features, available_players, user_roster, current_round, top_k, availability
+        )
+    
+    def recommend_from_features(
+        self,
+        features: np.ndarray,
+        available_players: Sequence[Player],
+        user_roster: Roster,
+        current_round: int,
+        top_k: int = 3,
+        availability: Optional[np.ndarray] = None
+    ) -> List[Recommendation]:
+        """Generate recommendations from an already prepared feature matrix"""
+        if not self.is_model_loaded:
+            raise RuntimeError("ML model not loaded. Please train the model first.")
+        
+        # Score all available players in one batch
+        snapshot = self.snapshot
+        scores = self._score_features(features, snapshot)
+        return self._recommendations_from_scores(
+            scores, available_players, user_roster, current_round, top_k, availability, features, snapshot
+        )
+    
+    def get_batch_recommendations(
+        self,
+        contexts: List[DraftContext],
+        available_players: List[Player],
+        top_k: int = 3,
+        league_settings: Optional[Dict] = None
+    ) -> List[List[Recommendation]]:
+        """Top-k recommendations for many (roster, round, pick) contexts over one player pool
+        
+        Player columns are computed once, context columns are broadcast over
+        them, and every (context, player) pair is scored in one model call.
+        """
+        if not self.is_model_loaded:
+            raise RuntimeError("ML model not loaded. Please train the model first.")
+        if not contexts:
+            return []
+        
+        current_rounds = np.array([context.current_round for context in contexts], dtype=np.float64)
+        current_picks = np.array([context.current_pick for context in contexts], dtype=np.float64)
+        with metrics.stage('features'):
+            player_features, bye_weeks = self._player_features_and_byes(available_players, league_settings)
+            features = np.repeat(player_features[np.newaxis], len(contexts), axis=0)
+            self._apply_draft_contexts(
+                features,
+                self._roster_counts([context.user_roster for context in contexts]),
+                current_rounds,
+                current_picks
+            )
+            self._apply_bye_conflicts(features, [context.user_roster for context in contexts], bye_weeks)
+        snapshot = self.snapshot
+        scores = self._score_features(features.reshape(-1, features.shape[2]), snapshot).reshape(len(contexts), -1)
+        # One (contexts, players) pass for every context's next pick
+        with metrics.stage('availability'):
+            availability = self._availability(
+                self._player_adp(available_players),
+                current_picks[:, np.newaxis],
+                current_rounds[:, np.newaxis],
+                league_settings
+            )
+        
+        # One contributions call for every context's top k; each context then reads the cache
+        if self.explainer.enabled:
+            with metrics.stage('explain'):
+                top_rows = [
+                    features[c, self._top_k_indices(np.where(np.isfinite(s), s, -np.inf), top_k)]
+                    for c, s in enumerate(scores)
+                ]
+                self._contributions(np.concatenate(top_rows), snapshot)
+        
+        return [
+            self._recommendations_from_scores(
+                context_scores, available_players, context.user_roster, context.current_round, top_k,
+                context_availability, context_features, snapshot
+            )
+            for context, context_scores, context_availability, context_features in zip(
+                contexts, scores, availability, features
+            )
+        ]
+    
+    @staticmethod
+    def _player_adp(players: Sequence[Player]) -> np.ndarray:
+        """ADP of each player, NaN where unknown"""
+        if isinstance(players, PlayerTable):
+            return np.where(players.adp == 0, np.nan, players.adp)
+        return np.fromiter((p.adp or np.nan for p in players), dtype=np.float64, count=len(players))
+    
+    def _availability(
+        self,
+        adp: np.ndarray,
+        current_pick,
+        current_round,
+        league_settings: Optional[Dict] = None
+    ) -> np.ndarray:
+        """Chance each player is still available at the user's next pick (NaN where unknown)"""
+        num_teams, season = league_params(league_settings)
+        spread = adp_spread(season, self.adp_spread_path)
+        return availability_at_next_pick(adp, spread.sd(adp), current_pick, current_round, num_teams)
+    
+    def _recommendations_from_scores(
+        self,
+        scores: np.ndarray,
+        available_players: Sequence[Player],
+        user_roster: Roster,
+        current_round: int,
+        top_k: int,
+        availability: Optional[np.ndarray] = None,
+        features: Optional[np.ndarray] = None,
+        snapshot: Optional[ModelSnapshot] = None
+    ) -> List[Recommendation]:
+        """Build Recommendation objects for the top-k scored players
+        
+        With the scored ``features`` and ``snapshot``, explanations come from
+        the model's feature contributions; otherwise from the rule-based
+        _generate_explanation.
+        """
+        # Drop rows the model could not score instead of failing the whole request
+        valid = np.isfinite(scores)
+        if not valid.all():
+            invalid = np.flatnonzero(~valid)
+            metrics.ERRORS.labels('player_score').inc(len(invalid))
+            for i in invalid:
+                logger.warning(f"Error scoring player {available_players[i].name}: non-finite score")
+            scores = np.where(valid, scores, -np.inf)
         
-        # Sort by score and take top 3
-        player_scores.sort(key=lambda x: x[1], reverse=True)
-        top_players = player_scores[:3]
+        # Partial selection of the top k
+        with metrics.stage('rank'):
+            top_idx = [i for i in self._top_k_indices(scores, top_k) if valid[i]]
         
-        # Generate recommendations
+        with metrics.stage('explain'):
+            contributions = None
+            if features is not None and top_idx:
+                contributions = self._contributions(features[top_idx], snapshot or self.snapshot)
+            return self._build_recommendations(
+                scores, top_idx, available_players, user_roster, current_round, availability,
+                features, contributions
+            )
+    
+    def _contributions(self, rows: np.ndarray, snapshot: ModelSnapshot) -> Optional[np.ndarray]:
+        """Feature contributions for rows, or None if they cannot be computed right now"""
+        if snapshot.model is None:
+            # Compiled-only snapshot: explain with rules until XGBoost is loaded
+            self._load_xgboost_model_in_background(snapshot)
+            return None
+        try:
+            return self.explainer.contributions(snapshot, rows)
+        except Exception as e:
+            metrics.ERRORS.labels('explanation').inc()
+            logger.warning(f"Error computing feature contributions: {e}")
+            return None
+    
+    def _build_recommendations(
+        self,
+        scores: np.ndarray,
+        top_idx: List[int],
+        available_players: Sequence[Player],
+        user_roster: Roster,
+        current_round: int,
+        availability: Optional[np.ndarray],
+        features: Optional[np.ndarray] = None,
+        contributions: Optional[np.ndarray] = None
+    ) -> List[Recommendation]:
+        """Recommendation objects with explanations and risk levels for the selected players
+        
+        ``contributions`` has one row per entry of top_idx.
+        """
         recommendations = []
-        for player, score in top_players:
+        for j, i in enumerate(top_idx):
+            player = available_players[i]
+            score = float(scores[i])
+            
             # Calculate additional metrics
             boom_prob = min(0.3, score * 0.4)  # Simplified boom probability
             vor = score * 50  # Simplified value over replacement
+            available_next = None
+            if availability is not None and np.isfinite(availability[i]):
+                available_next = float(availability[i])
             
             recommendation = Recommendation(
                 player=player,
@@ -300,14 +1178,48 @@ class ScoutAIModel:
                 predicted_points=player.projected_points or 200.0,
                 boom_probability=boom_prob,
                 value_over_replacement=vor,
-                explanation=self._generate_explanation(player, score, user_roster, current_round),
-                risk_level=self._calculate_risk_level(player, score)
+                explanation=(
+                    self._explain_contributions(contributions[j], features[i], available_next)
+                    if contributions is not None
+                    else self._generate_explanation(player, score, user_roster, current_round, available_next)
+                ),
+                risk_level=self._calculate_risk_level(player, score),
+                availability_next_pick=available_next,
+                can_wait=None if available_next is None else available_next >= CAN_WAIT_PROBABILITY
             )
             recommendations.append(recommendation)
         
         return recommendations
     
-    def _generate_explanation(self, player: Player, score: float, roster: Roster, current_round: int) -> str:
+    def _explain_contributions(
+        self,
+        contributions: np.ndarray,
+        row: np.ndarray,
+        availability: Optional[float] = None
+    ) -> str:
+        """Explanation from the largest feature-group contributions to the score"""
+        explanations = self.explainer.reasons(contributions, row)
+        note = self._availability_note(availability)
+        if note:
+            explanations.append(note)
+        if not explanations:
+            explanations.append("Solid all-around value")
+        return ". ".join(explanations)
+    
+    @staticmethod
+    def _availability_note(availability: Optional[float]) -> Optional[str]:
+        if availability is not None and availability >= CAN_WAIT_PROBABILITY:
+            return f"Can wait a round ({availability:.0%} likely available at your next pick)"
+        return None
+    
+    def _generate_explanation(
+        self,
+        player: Player,
+        score: float,
+        roster: Roster,
+        current_round: int,
+        availability: Optional[float] = None
+    ) -> str:
         """Generate explanation for recommendation"""
         explanations = []
         
@@ -348,11 +1260,76 @@ class ScoutAIModel:
             if player.position in ['K', 'DST']:
                 explanations.append("Late round target")
         
+        # Next-pick availability
+        note = self._availability_note(availability)
+        if note:
+            explanations.append(note)
+        
         if not explanations:
             explanations.append("Solid all-around value")
         
         return ". ".join(explanations)
-    
+
+    def analyze_roster(
+        self,
+        roster: Roster,
+        recommendations: List[Recommendation],
+        league_settings: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Roster needs, stacked bye weeks and each recommendation's bye conflicts and schedule
+
+        Bye weeks of rostered players come from ``Roster.bye_weeks``; schedule
+        fields are only present when the schedule tables are enabled, and are
+        None when the tables have no schedule for the league's season
+        (``schedule_season`` is then None).
+        """
+        counts = self._roster_counts([roster])[0]
+        roster_byes = self._roster_byes([roster])[0]
+        players = [rec.player for rec in recommendations]
+        position_idx = np.fromiter((POSITION_INDEX[p.position] for p in players), dtype=np.intp, count=len(players))
+        bye_week = np.fromiter((p.bye_week or 0 for p in players), dtype=np.intp, count=len(players))
+        season = context_params(league_settings)[0]
+        schedule_season = self.schedule.season_index(season) if self.schedule is not None else None
+        if self.schedule is not None:
+            team_idx = self.schedule.team_indices([p.team for p in players])
+            is_dst = position_idx == POSITION_INDEX['DST']
+            bye_week = np.where(bye_week == 0, self.schedule.bye_weeks(team_idx, season), bye_week)
+            sos = self.schedule.gather(team_idx, is_dst, season)
+            playoff_matchups = self.schedule.playoff_matchups(team_idx, is_dst, season)
+        bye_week = np.clip(bye_week, 0, MAX_WEEK)
+        # Week 0 (unknown) never has rostered players, so it counts no conflicts
+        conflicts = roster_byes[position_idx, bye_week]
+
+        candidates = []
+        for i, player in enumerate(players):
+            candidate = {
+                'name': player.name,
+                'bye_week': int(bye_week[i]) or None,
+                'bye_conflicts': int(conflicts[i])
+            }
+            if self.schedule is not None and schedule_season is None:
+                candidate.update({'schedule_difficulty': None, 'playoff_sos': None, 'playoff_matchups': None})
+            elif self.schedule is not None:
+                candidate.update({
+                    'schedule_difficulty': round(float(sos[i, 0]), 3),
+                    'playoff_sos': round(float(sos[i, 1]), 3),
+                    'playoff_matchups': [round(float(value), 3) for value in playoff_matchups[i]]
+                })
+            candidates.append(candidate)
+
+        players_off = roster_byes.sum(axis=0)
+        return {
+            'position_counts': {position: int(count) for position, count in zip(POSITIONS, counts)},
+            'position_needs': [position for position, count, target in zip(POSITIONS, counts, TARGET_COUNTS) if count < target],
+            # Weeks with two or more rostered players on bye, by position
+            'bye_stacks': {
+                str(week): {position: int(n) for position, n in zip(POSITIONS, roster_byes[:, week]) if n}
+                for week in np.flatnonzero(players_off >= 2)
+            },
+            'candidates': candidates,
+            'schedule_season': self.schedule.seasons[schedule_season] if schedule_season is not None else None
+        }
+
     def _calculate_risk_level(self, player: Player, score: float) -> str:
         """Calculate risk level for a player"""
         risk_factors = 0
@@ -382,25 +1359,33 @@ class ScoutAIModel:
     
     def get_version(self) -> str:
         """Get model version"""
-        return self.model_version
+        snapshot = self.snapshot
+        return snapshot.version if snapshot else self.model_version
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model"""
+        snapshot = self.snapshot
         return {
-            'version': self.model_version,
-            'loaded': self.is_model_loaded,
+            'version': self.get_version(),
+            'loaded': snapshot is not None,
+            'trained_at': snapshot.trained_at if snapshot else None,
+            'load_seconds': snapshot.load_seconds if snapshot else None,
+            'compiled': snapshot is not None and snapshot.compiled is not None,
             'features': len(self.feature_columns),
+            'team_context': self.team_context.info() if self.team_context else None,
+            'schedule': self.schedule.info() if self.schedule else None,
             'model_path': self.model_path
         }
     
     def get_feature_importance(self) -> Dict[str, float]:
         """Get feature importance scores from the trained model"""
-        if not self.is_model_loaded or self.model is None:
+        snapshot = self.snapshot
+        if snapshot is None:
             raise RuntimeError("Model not loaded. Please train the model first.")
         
         try:
             # Get feature importance from XGBoost model
-            importance_scores = self.model.feature_importances_
+            importance_scores = snapshot.get_model().feature_importances_
             
             # Create dictionary mapping feature names to importance scores
             feature_importance = dict(zip(self.feature_columns, importance_scores))
@@ -430,4 +1415,4 @@ class ScoutAIModel:
                 'percentage': float(importance * 100)
             })
         
-        return top_features 
\ No newline at end of file
+        return top_features
@@ -0,0 +1,177 @@
+"""
+Out-of-core training data: streamed batches, scaler statistics and metrics
+
+Training data arrives as a re-iterable source of DataFrame batches (a
+Parquet store read with pyarrow, or the synthetic generator), so no step
+needs the whole table in memory:
+
+1. One pass accumulates the scaler mean and variance of the training rows.
+2. XGBoost pulls scaled batches through a DataIter into a QuantileDMatrix
+   (or an external-memory DMatrix cached on disk).
+3. A final pass scores the held-out rows and accumulates MSE, MAE and R².
+
+Rows are assigned to the train or test split by a generator seeded with
+the batch number, so every pass over the source sees the same split.
+"""
+
+import logging
+import os
+import resource
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.artifacts import ArrayScaler
+
+logger = logging.getLogger(__name__)
+
+# Rows per batch read from a Parquet store
+PARQUET_BATCH_ROWS = 65536
+
+BatchSource = Callable[[], Iterable["pd.DataFrame"]]
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def parquet_batches(path: str, columns: List[str], batch_rows: int = PARQUET_BATCH_ROWS) -> BatchSource:
+    """Batch source over a Parquet file or directory, reading only the given columns
+
+    Files whose names start with '.' or '_' (such as the store watermark)
+    are skipped.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet')
+    missing = [c for c in columns if c not in dataset.schema.names]
+    if missing:
+        raise ValueError(f"{path} is missing training columns: {', '.join(missing)}")
+
+    def batches() -> Iterator["pd.DataFrame"]:
+        for batch in dataset.to_batches(columns=columns, batch_size=batch_rows):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    return batches
+
+def split_mask(batch_index: int, num_rows: int, test_size: float, seed: int) -> np.ndarray:
+    """True for the rows of a batch that belong to the test split"""
+    return np.random.default_rng([seed, batch_index]).random(num_rows) < test_size
+
+def split_batches(
+    source: BatchSource,
+    feature_columns: List[str],
+    target_column: str,
+    test_size: float,
+    seed: int,
+    test: bool = False
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(X, y) float64 arrays of the train (or test) rows of each batch"""
+    for i, batch in enumerate(source()):
+        X = batch[feature_columns].to_numpy(dtype=np.float64)
+        y = batch[target_column].to_numpy(dtype=np.float64)
+        mask = split_mask(i, len(y), test_size, seed)
+        if not test:
+            mask = ~mask
+        if mask.any():
+            yield X[mask], y[mask]
+
+class RunningScaler:
+    """Mean and variance accumulated batch by batch (Chan et al. parallel update)"""
+
+    def __init__(self, num_features: int):
+        self.count = 0
+        self.mean = np.zeros(num_features)
+        self.m2 = np.zeros(num_features)
+
+    def update(self, X: np.ndarray):
+        n = len(X)
+        if not n:
+            return
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    def to_scaler(self) -> ArrayScaler:
+        """ArrayScaler with StandardScaler's conventions (population variance, zero variance -> 1)"""
+        if not self.count:
+            raise ValueError("No training rows")
+        scale = np.sqrt(self.m2 / self.count)
+        scale[scale == 0] = 1.0
+        return ArrayScaler(self.mean.copy(), scale)
+
+class RunningMetrics:
+    """MSE, MAE and R² accumulated over batches of predictions"""
+
+    def __init__(self):
+        self.count = 0
+        self.squared_error = 0.0
+        self.absolute_error = 0.0
+        self.y_sum = 0.0
+        self.y_squared_sum = 0.0
+
+    def update(self, y: np.ndarray, y_pred: np.ndarray):
+        error = y - y_pred
+        self.count += len(y)
+        self.squared_error += float(np.dot(error, error))
+        self.absolute_error += float(np.abs(error).sum())
+        self.y_sum += float(y.sum())
+        self.y_squared_sum += float(np.dot(y, y))
+
+    def results(self) -> Dict[str, float]:
+        if not self.count:
+            raise ValueError("No test rows")
+        total_variance = self.y_squared_sum - self.y_sum ** 2 / self.count
+        return {
+            'mse': self.squared_error / self.count,
+            'mae': self.absolute_error / self.count,
+            'r2': 1 - self.squared_error / total_variance if total_variance > 0 else 0.0
+        }
+
+def make_data_iter(batches: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray]]], cache_prefix: Optional[str] = None):
+    """xgboost.DataIter over (X, y) batches; a cache_prefix switches XGBoost to external memory"""
+    import xgboost as xgb
+
+    class _BatchIter(xgb.DataIter):
+        def __init__(self):
+            super().__init__(cache_prefix=cache_prefix)
+            self._iterator = None
+            self.rows = 0
+
+        def next(self, input_data) -> int:
+            if self._iterator is None:
+                self._iterator = iter(batches())
+                self.rows = 0
+            try:
+                X, y = next(self._iterator)
+            except StopIteration:
+                return 0
+            self.rows += len(y)
+            input_data(data=X, label=y)
+            return 1
+
+        def reset(self):
+            self._iterator = None
+
+    return _BatchIter()
+
+def build_dmatrix(
+    batches: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray]]],
+    external_memory_dir: Optional[str] = None,
+    max_bin: int = 256
+):
+    """(DMatrix, rows of the last pass): a QuantileDMatrix in memory, or a disk-cached DMatrix with external_memory_dir"""
+    import xgboost as xgb
+
+    if external_memory_dir is not None:
+        os.makedirs(external_memory_dir, exist_ok=True)
+        data_iter = make_data_iter(batches, cache_prefix=os.path.join(external_memory_dir, 'cache'))
+        dmatrix = xgb.DMatrix(data_iter)
+    else:
+        data_iter = make_data_iter(batches)
+        # Quantized as it streams: about one byte per feature per row instead of the float batches
+        dmatrix = xgb.QuantileDMatrix(data_iter, max_bin=max_bin)
+    return dmatrix, data_iter.rows
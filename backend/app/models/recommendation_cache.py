@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.models.availability import league_params
+from app.models.ml_model import POSITIONS
+from app.models.team_context import context_params
+from app.models.schemas import ColumnarDraftRequest, DraftRequest, Recommendation
+from app.utils.metrics import RECOMMENDATION_CACHE
+
+logger = logging.getLogger(__name__)
+
+def _player_rows(request: Union[DraftRequest, ColumnarDraftRequest]) -> Iterable[str]:
+    """One unit-separated row per player; floats use repr so equal values give equal text"""
+    players = request.available_players
+    if isinstance(request, DraftRequest):
+        return (
+            f'{p.name}\x1f{p.position.value}\x1f{p.team}\x1f{p.adp!r}\x1f{p.projected_points!r}\x1f{p.bye_week}'
+            for p in players
+        )
+    # Same rows as the per-player encoding, so both give the same key
+    missing = [None] * len(players)
+    return (
+        f'{name}\x1f{position}\x1f{team}\x1f{adp!r}\x1f{points!r}\x1f{bye_week}'
+        for name, position, team, adp, points, bye_week in zip(
+            players.names, players.positions, players.teams,
+            players.adp or missing, players.projected_points or missing, players.bye_week or missing
+        )
+    )
+
+def draft_state_key(request: Union[DraftRequest, ColumnarDraftRequest], model_version: str) -> str:
+    """Canonical hash of everything a /suggest response depends on
+
+    Roster names are reduced to counts and known bye weeks per position and
+    the player pool is sorted, so the same draft state scraped in a
+    different order (or sent to /suggest-columnar) maps to the same key. The hex digest doubles as
+    the response ETag.
+    """
+    roster = request.user_roster
+    roster_counts = ','.join(str(len(getattr(roster, position))) for position in POSITIONS)
+    # Known bye weeks per position decide bye conflicts and the roster analysis
+    roster_byes = ';'.join(
+        ','.join(sorted(str(roster.bye_weeks[name]) for name in getattr(roster, position) if name in roster.bye_weeks))
+        for position in POSITIONS
+    )
+    num_teams, season = league_params(request.league_settings)
+    # Week selects the team-context features
+    week = context_params(request.league_settings)[1]
+    players = sorted(_player_rows(request))
+    header = (
+        f'{model_version}\x1f{request.current_round}\x1f{request.current_pick}\x1f{roster_counts}'
+        f'\x1f{num_teams}\x1f{season}\x1f{week}\x1f{roster_byes}'
+    )
+    return hashlib.blake2b('\x1e'.join([header, *players]).encode(), digest_size=16).hexdigest()
+
+def etag(key: str) -> str:
+    return f'"{key}"'
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """True if an If-None-Match header lists this key's ETag (or is *)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    # Weak comparison: W/"x" matches "x"
+    return '*' in tags or any(tag.removeprefix('W/') == etag(key) for tag in tags)
+
+class RecommendationCache:
+    """TTL and LRU-bounded cache of /suggest results keyed by draft_state_key
+
+    Entries are dropped as soon as a different model version is seen, so a
+    model swap never serves recommendations from the previous model. Used
+    from the event loop only, so it needs no lock.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expires_at, recommendations), least recently used first
+        self._cache: "OrderedDict[str, Tuple[float, List[Recommendation]]]" = OrderedDict()
+        self._model_version: Optional[str] = None
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def check_version(self, model_version: str):
+        """Clear the cache if the model being served has changed"""
+        if model_version != self._model_version:
+            if self._cache:
+                self._invalidations += 1
+                logger.info(f"Model changed to {model_version}; cleared {len(self._cache)} cached recommendations")
+            self._cache.clear()
+            self._model_version = model_version
+
+    def get(self, key: str) -> Optional[List[Recommendation]]:
+        if not self.enabled:
+            return None
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._cache[key]
+            entry = None
+        if entry is None:
+            self._misses += 1
+            RECOMMENDATION_CACHE.labels('miss').inc()
+            return None
+        self._hits += 1
+        RECOMMENDATION_CACHE.labels('hit').inc()
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, recommendations: List[Recommendation]):
+        if not self.enabled:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, recommendations)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def record_not_modified(self):
+        self._not_modified += 1
+        RECOMMENDATION_CACHE.labels('not_modified').inc()
+
+    def stats(self) -> Dict:
+        lookups = self._hits + self._misses
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._cache),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'model_version': self._model_version,
+            'hits': self._hits,
+            'misses': self._misses,
+            'not_modified': self._not_modified,
+            'hit_rate': self._hits / lookups if lookups else None,
+            'invalidations': self._invalidations
+        }
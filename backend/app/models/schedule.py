@@ -0,0 +1,235 @@
+"""
+Strength-of-schedule and bye-week tables for each season's schedule
+
+build_schedule_tables.py builds them offline from the weekly team defense
+stats. Each game there has one row per team, so the other row of a
+game_id is the opponent, which gives every past season's schedule. An
+upcoming season's schedule can be added from a CSV with a game_id column
+("2025_01_DAL_PHI", away team first) or season, week, away_team and
+home_team columns.
+
+Teams are rated from the season before the schedule's season, which is
+what is known at draft time:
+- defense: offensive points allowed per game
+- offense: offensive points scored per game
+Both are z-scores within the season, positive meaning harder to play
+against.
+
+Tables, one entry per schedule season:
+- matchup: (teams + 1, weeks + 1, 2) difficulty of each week's opponent for
+  offensive players (its defense rating) and for DST (its offense rating);
+  0 on bye weeks
+- sos: (teams + 1, 2, 2) mean difficulty per kind (offense players, DST)
+  over the regular season and over fantasy playoff weeks 14-17
+- bye_week: (teams + 1,) each team's bye week, 0 if unknown
+
+The last team row is all zeros, for free agents and unknown team codes.
+Lookups for a season without a stored schedule are all zeros too: another
+season's byes and opponents say nothing about it.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.team_context import TEAM_ALIASES
+
+STORE_DIR = 'data/processed/schedule'
+INDEX_FILE = 'schedule.json'
+ARRAY_FILES = {'matchup': 'matchup.npy', 'sos': 'sos.npy', 'bye_week': 'bye_week.npy'}
+STORE_VERSION = 1
+
+MAX_WEEK = 18
+PLAYOFF_WEEKS = [14, 15, 16, 17]
+# Feature columns, in order
+SCHEDULE_COLUMNS = ['schedule_difficulty', 'playoff_sos']
+
+def _schedule_games(schedule: "pd.DataFrame") -> "pd.DataFrame":
+    """(season, week, team, opponent) rows, both directions, from a schedule CSV"""
+    import pandas as pd
+
+    if 'game_id' in schedule.columns:
+        parts = schedule['game_id'].str.split('_', expand=True)
+        schedule = pd.DataFrame({
+            'season': parts[0].astype(int), 'week': parts[1].astype(int), 'away_team': parts[2], 'home_team': parts[3]
+        })
+    if 'game_type' in schedule.columns:
+        schedule = schedule[schedule['game_type'] == 'REG']
+    away = schedule['away_team'].str.upper().replace(TEAM_ALIASES)
+    home = schedule['home_team'].str.upper().replace(TEAM_ALIASES)
+    keys = schedule[['season', 'week']].astype(int).reset_index(drop=True)
+    return pd.concat([
+        keys.assign(team=away.to_numpy(), opponent=home.to_numpy()),
+        keys.assign(team=home.to_numpy(), opponent=away.to_numpy())
+    ], ignore_index=True)
+
+def build_schedule_tables(
+    defense: "pd.DataFrame",
+    schedule: Optional["pd.DataFrame"] = None
+) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """(arrays, index) from weekly team defense rows and an optional extra schedule"""
+    import pandas as pd
+
+    games = defense[defense['season_type'] == 'REG'][['game_id', 'season', 'week', 'team', 'total_off_points']]
+    games = games.astype({'team': str, 'season': int, 'week': int})
+    # Each game has one row per team; the other row of the game is the opponent
+    pairs = games.merge(games[['game_id', 'team', 'total_off_points']], on='game_id', suffixes=('', '_opp'))
+    pairs = pairs[pairs['team'] != pairs['team_opp']]
+
+    ratings = pairs.groupby(['season', 'team']).agg(
+        scored=('total_off_points', 'mean'), allowed=('total_off_points_opp', 'mean')
+    )
+    by_season = ratings.groupby(level='season')
+    zscore = lambda column: (ratings[column] - by_season[column].transform('mean')) / by_season[column].transform('std')
+    # Fewer points allowed is a tougher defense; more points scored a tougher offense
+    team_ratings = {key: (-d, o) for key, d, o in zip(ratings.index, zscore('allowed'), zscore('scored'))}
+    rated_seasons = sorted({season for season, _ in ratings.index})
+
+    played = pairs[['season', 'week', 'team']].assign(opponent=pairs['team_opp'].to_numpy())
+    if schedule is not None:
+        extra = _schedule_games(schedule)
+        played = pd.concat([played[~played['season'].isin(set(extra['season']))], extra], ignore_index=True)
+    played = played[played['week'].between(1, MAX_WEEK)]
+
+    teams = sorted(set(played['team']) | set(played['opponent']))
+    seasons = sorted(set(played['season']))
+    team_index = {team: i for i, team in enumerate(teams)}
+    season_index = {season: i for i, season in enumerate(seasons)}
+
+    # Ratings from the previous season, or the earliest rated one for the first season
+    rating_season = {}
+    for season in seasons:
+        earlier = [s for s in rated_seasons if s < season]
+        rating_season[season] = earlier[-1] if earlier else rated_seasons[0]
+
+    matchup = np.zeros((len(seasons), len(teams) + 1, MAX_WEEK + 1, 2), dtype=np.float32)
+    has_game = np.zeros((len(seasons), len(teams) + 1, MAX_WEEK + 1), dtype=bool)
+    for season, week, team, opponent in played[['season', 'week', 'team', 'opponent']].itertuples(index=False):
+        s, t = season_index[season], team_index[team]
+        matchup[s, t, week] = team_ratings.get((rating_season[season], opponent), (0.0, 0.0))
+        has_game[s, t, week] = True
+
+    # Bye: the first week without a game, up to the season's last week
+    bye_week = np.zeros((len(seasons), len(teams) + 1), dtype=np.int8)
+    for season, s in season_index.items():
+        last_week = int(played.loc[played['season'] == season, 'week'].max())
+        open_weeks = ~has_game[s, :-1, 1:last_week + 1]
+        bye_week[s, :-1] = np.where(open_weeks.any(axis=1), open_weeks.argmax(axis=1) + 1, 0)
+
+    sos = np.zeros((len(seasons), len(teams) + 1, 2, 2), dtype=np.float32)
+    for span, weeks in enumerate((slice(1, MAX_WEEK + 1), PLAYOFF_WEEKS)):
+        games_played = has_game[:, :, weeks].sum(axis=2)
+        totals = matchup[:, :, weeks].sum(axis=2)
+        sos[:, :, :, span] = totals / np.maximum(games_played, 1)[:, :, np.newaxis]
+
+    index = {
+        'version': STORE_VERSION,
+        'teams': teams,
+        'seasons': seasons,
+        'rating_seasons': [rating_season[season] for season in seasons],
+        'playoff_weeks': PLAYOFF_WEEKS,
+        'built_at': time.time()
+    }
+    return {'matchup': matchup, 'sos': sos, 'bye_week': bye_week}, index
+
+def save_schedule_tables(store_dir: str, arrays: Dict[str, np.ndarray], index: Dict):
+    """Write the arrays and their index, each replaced atomically"""
+    os.makedirs(store_dir, exist_ok=True)
+    for name, filename in ARRAY_FILES.items():
+        path = os.path.join(store_dir, filename)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, np.ascontiguousarray(arrays[name]))
+        os.replace(path + '.tmp', path)
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f)
+    os.replace(index_path + '.tmp', index_path)
+
+class ScheduleStore:
+    """Memory-mapped schedule tables, gathered per player team"""
+
+    def __init__(
+        self,
+        matchup: np.ndarray,
+        sos: np.ndarray,
+        bye_week: np.ndarray,
+        teams: List[str],
+        seasons: List[int]
+    ):
+        shape = (len(seasons), len(teams) + 1)
+        if matchup.shape[:2] != shape or sos.shape[:2] != shape or bye_week.shape != shape:
+            raise ValueError(f"Schedule arrays do not match {len(seasons)} seasons and {len(teams)} teams")
+        self.matchup = matchup
+        self.sos = sos
+        self.bye_week = bye_week
+        self.teams = list(teams)
+        self.seasons = list(seasons)
+        self._team_index = {team: i for i, team in enumerate(teams)}
+        for alias, team in TEAM_ALIASES.items():
+            if team in self._team_index and alias not in self._team_index:
+                self._team_index[alias] = self._team_index[team]
+        self._unknown_team = len(teams)
+
+    @classmethod
+    def load(cls, store_dir: str) -> "ScheduleStore":
+        with open(os.path.join(store_dir, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported schedule store version {index.get('version')} in {store_dir}")
+        arrays = {
+            name: np.load(os.path.join(store_dir, filename), mmap_mode='r') for name, filename in ARRAY_FILES.items()
+        }
+        return cls(arrays['matchup'], arrays['sos'], arrays['bye_week'], index['teams'], index['seasons'])
+
+    def season_index(self, season: Optional[int] = None) -> Optional[int]:
+        """Index of the season's schedule; None if season is None or its schedule is not stored"""
+        if season is None:
+            return None
+        i = int(np.searchsorted(self.seasons, season))
+        return i if i < len(self.seasons) and self.seasons[i] == season else None
+
+    def team_indices(self, teams: Sequence[str]) -> np.ndarray:
+        """Row of each team code, or the all-zero row for unknown codes"""
+        lookup = self._team_index.get
+        unknown = self._unknown_team
+        return np.fromiter((lookup(team.upper(), unknown) for team in teams), dtype=np.intp, count=len(teams))
+
+    def gather(self, team_idx: np.ndarray, is_dst: np.ndarray, season: Optional[int] = None) -> np.ndarray:
+        """(players, 2) season and playoff strength of schedule; DST is rated against opposing offenses"""
+        s = self.season_index(season)
+        if s is None:
+            return np.zeros((len(team_idx), 2), dtype=self.sos.dtype)
+        rows = self.sos[s][team_idx]
+        return rows[np.arange(len(team_idx)), is_dst.astype(np.intp)]
+
+    def bye_weeks(self, team_idx: np.ndarray, season: Optional[int] = None) -> np.ndarray:
+        """Each team's bye week, 0 if unknown"""
+        s = self.season_index(season)
+        if s is None:
+            return np.zeros(len(team_idx), dtype=self.bye_week.dtype)
+        return self.bye_week[s][team_idx]
+
+    def playoff_matchups(self, team_idx: np.ndarray, is_dst: np.ndarray, season: Optional[int] = None) -> np.ndarray:
+        """(players, playoff weeks) difficulty of each fantasy playoff opponent"""
+        s = self.season_index(season)
+        if s is None:
+            return np.zeros((len(team_idx), len(PLAYOFF_WEEKS)), dtype=self.matchup.dtype)
+        rows = self.matchup[s][team_idx][:, PLAYOFF_WEEKS]
+        return rows[np.arange(len(team_idx)), :, is_dst.astype(np.intp)]
+
+    def sample(self, rng: np.random.Generator, is_dst: np.ndarray) -> np.ndarray:
+        """Strength of schedule of random (season, team) pairs, for synthetic training data"""
+        n = len(is_dst)
+        rows = self.sos[rng.integers(len(self.seasons), size=n), rng.integers(len(self.teams), size=n)]
+        return rows[np.arange(n), is_dst.astype(np.intp)]
+
+    def info(self) -> Dict:
+        return {
+            'teams': len(self.teams),
+            'seasons': [self.seasons[0], self.seasons[-1]] if self.seasons else None,
+            'playoff_weeks': PLAYOFF_WEEKS,
+            'nbytes': int(self.matchup.nbytes + self.sos.nbytes + self.bye_week.nbytes)
+        }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Dict, Optional
 from enum import Enum
 
@@ -28,6 +28,7 @@ class Roster(BaseModel):
     TE: List[str] = Field(default_factory=list, description="Tight ends")
     K: List[str] = Field(default_factory=list, description="Kickers")
     DST: List[str] = Field(default_factory=list, description="Defense/Special teams")
+    bye_weeks: Dict[str, int] = Field(default_factory=dict, description="Bye week of rostered players by name (optional), for bye-conflict checks")
 
 class Recommendation(BaseModel):
     """Player recommendation with analysis"""
@@ -38,6 +39,8 @@ class Recommendation(BaseModel):
     value_over_replacement: float = Field(..., description="Value over replacement player")
     explanation: str = Field(..., description="Brief explanation of recommendation")
     risk_level: str = Field(..., description="Risk level: low, medium, high")
+    availability_next_pick: Optional[float] = Field(None, ge=0.0, le=1.0, description="Probability the player is still available at your next pick")
+    can_wait: Optional[bool] = Field(None, description="Whether the player is likely to last until your next pick")
 
 class DraftRequest(BaseModel):
     """Request for draft recommendations"""
@@ -47,8 +50,121 @@ class DraftRequest(BaseModel):
     available_players: List[Player] = Field(..., description="Available players to draft")
     league_settings: Optional[Dict] = Field(default_factory=dict, description="League settings (optional)")
 
+class PlayerColumns(BaseModel):
+    """Player pool as parallel arrays, one entry per player
+    
+    Validating a few lists is much cheaper than one Player model per player.
+    Positions are plain strings checked against Position once, and omitted
+    optional columns mean unknown for every player.
+    """
+    names: List[str] = Field(..., description="Player names")
+    positions: List[str] = Field(..., description="Player positions (QB, RB, WR, TE, K, DST)")
+    teams: List[str] = Field(..., description="Player teams")
+    adp: Optional[List[Optional[float]]] = Field(None, description="Average draft positions")
+    projected_points: Optional[List[Optional[float]]] = Field(None, description="Projected fantasy points")
+    bye_week: Optional[List[Optional[int]]] = Field(None, description="Bye weeks")
+    
+    @model_validator(mode='after')
+    def check_columns(self) -> 'PlayerColumns':
+        n = len(self.names)
+        for column in ('positions', 'teams', 'adp', 'projected_points', 'bye_week'):
+            values = getattr(self, column)
+            if values is not None and len(values) != n:
+                raise ValueError(f"{column} has {len(values)} entries but names has {n}")
+        unknown = set(self.positions).difference(Position._value2member_map_)
+        if unknown:
+            raise ValueError(f"Unknown positions: {', '.join(sorted(unknown))}")
+        return self
+    
+    def __len__(self) -> int:
+        return len(self.names)
+
+class ColumnarDraftRequest(BaseModel):
+    """DraftRequest with the player pool sent as columns"""
+    current_pick: int = Field(..., ge=1, description="Current pick number")
+    current_round: int = Field(..., ge=1, description="Current draft round")
+    user_roster: Roster = Field(..., description="User's current roster")
+    available_players: PlayerColumns = Field(..., description="Available players to draft, as columns")
+    league_settings: Optional[Dict] = Field(default_factory=dict, description="League settings (optional)")
+
 class DraftResponse(BaseModel):
     """Response with draft recommendations"""
     recommendations: List[Recommendation] = Field(..., description="List of player recommendations")
     roster_analysis: Optional[Dict] = Field(None, description="Analysis of current roster needs")
-    draft_strategy: Optional[str] = Field(None, description="Recommended draft strategy") 
\ No newline at end of file
+    draft_strategy: Optional[str] = Field(None, description="Recommended draft strategy")
+
+class DraftContext(BaseModel):
+    """One team's draft state within a batch request"""
+    context_id: Optional[str] = Field(None, description="Caller-chosen identifier, e.g. the team name")
+    current_pick: int = Field(..., ge=1, description="Current pick number")
+    current_round: int = Field(..., ge=1, description="Current draft round")
+    user_roster: Roster = Field(default_factory=Roster, description="This team's current roster")
+
+class BatchDraftRequest(BaseModel):
+    """Request for recommendations for many draft contexts against one player pool"""
+    available_players: List[Player] = Field(..., description="Available players, shared by every context")
+    contexts: List[DraftContext] = Field(..., min_length=1, description="Draft contexts to score")
+    top_k: int = Field(3, ge=1, le=50, description="Recommendations per context")
+    league_settings: Optional[Dict] = Field(default_factory=dict, description="League settings shared by every context (optional)")
+
+class ContextRecommendations(BaseModel):
+    """Recommendations for one context of a batch request"""
+    context_id: Optional[str] = Field(None, description="Identifier from the request")
+    recommendations: List[Recommendation] = Field(..., description="List of player recommendations")
+
+class BatchDraftResponse(BaseModel):
+    """Response with recommendations for every context, in request order"""
+    results: List[ContextRecommendations] = Field(..., description="Per-context recommendations")
+
+class SimulationRequest(BaseModel):
+    """Request to value the current pick by simulating the rest of the draft"""
+    current_pick: int = Field(..., ge=1, description="Current pick number within the round")
+    current_round: int = Field(..., ge=1, description="Current draft round")
+    user_roster: Roster = Field(default_factory=Roster, description="User's current roster")
+    available_players: List[Player] = Field(..., min_length=1, description="Available players to draft")
+    num_teams: int = Field(12, ge=2, le=32, description="Teams in the league")
+    num_rounds: int = Field(15, ge=1, le=30, description="Rounds in the draft")
+    num_candidates: int = Field(5, ge=1, le=10, description="Top model picks to compare")
+    num_simulations: int = Field(2000, ge=1, description="Simulated drafts per candidate")
+    time_budget_seconds: float = Field(2.0, gt=0, description="Return the best estimate after this long")
+    max_rounds_ahead: Optional[int] = Field(None, ge=0, description="Stop simulating after this many more rounds")
+    seed: Optional[int] = Field(None, description="Random seed, for reproducible results")
+
+class CandidateValue(BaseModel):
+    """Simulated rest-of-draft value of one candidate for the current pick"""
+    player: Player = Field(..., description="Candidate player")
+    confidence_score: float = Field(..., ge=0.0, le=1.0, description="Model score for the current pick")
+    expected_lineup_points: float = Field(..., description="Mean points the user's picks add to the starting lineup")
+    std_error: float = Field(..., description="Standard error of expected_lineup_points")
+    best_pick_probability: float = Field(..., ge=0.0, le=1.0, description="Share of simulations in which this candidate was best")
+
+class SimulationResponse(BaseModel):
+    """Candidates ordered by expected lineup points"""
+    candidates: List[CandidateValue] = Field(..., description="Candidates, best first")
+    simulations: int = Field(..., description="Simulated drafts per candidate")
+    elapsed_seconds: float = Field(..., description="Time spent simulating")
+    budget_exhausted: bool = Field(..., description="Whether the time budget ran out before num_simulations")
+
+class DraftSessionCreate(BaseModel):
+    """Request to start a server-side draft session"""
+    current_pick: int = Field(..., ge=1, description="Current pick number")
+    current_round: int = Field(..., ge=1, description="Current draft round")
+    user_roster: Roster = Field(default_factory=Roster, description="User's current roster")
+    available_players: List[Player] = Field(..., description="Full player pool at the start of the session")
+    league_settings: Optional[Dict] = Field(default_factory=dict, description="League settings (optional)")
+
+class PickEvent(BaseModel):
+    """A single pick made during a draft session"""
+    player_name: str = Field(..., description="Name of the drafted player")
+    drafted_by_user: bool = Field(False, description="Whether the user made this pick")
+    position: Optional[Position] = Field(None, description="Position, needed only for user picks of players outside the pool")
+    current_pick: Optional[int] = Field(None, ge=1, description="Current pick number after this pick")
+    current_round: Optional[int] = Field(None, ge=1, description="Current draft round after this pick")
+
+class DraftSessionInfo(BaseModel):
+    """State of a server-side draft session"""
+    session_id: str = Field(..., description="Session identifier")
+    current_pick: int = Field(..., description="Current pick number")
+    current_round: int = Field(..., description="Current draft round")
+    user_roster: Roster = Field(..., description="User's current roster")
+    players_remaining: int = Field(..., description="Players still available in the pool")
@@ -0,0 +1,178 @@
+"""
+Team-context feature store: season-to-date team offense and defense stats
+
+build_team_context.py builds the store offline from the weekly team stats.
+It is one float32 array of shape (slots, teams + 1, features):
+- one slot per (season, week) in the data
+- one row per team code, plus a last row with the league average for
+  unknown teams (free agents, unmapped codes)
+
+Each value is the team's regular-season average through that week, so a
+slot only reflects games already played.
+
+At serving time the array is memory-mapped, so every worker process shares
+the same pages instead of holding its own copy. A request attaches context
+to the whole player matrix with one fancy-indexing gather.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STORE_DIR = 'data/processed/team_context'
+ARRAY_FILE = 'team_context.npy'
+INDEX_FILE = 'team_context.json'
+STORE_VERSION = 1
+
+TEAM_KEYS = ['team', 'season', 'week']
+# Weekly stats averaged into the context vectors
+TEAM_OFFENSE_STATS = ['total_off_points', 'total_off_yards', 'pass_attempts', 'rush_attempts', 'pass_pct']
+TEAM_DEFENSE_STATS = ['sack', 'qb_hit', 'interception', 'fumble_forced', 'def_touchdown']
+TEAM_OFFENSE_COLUMNS = [f'team_off_{stat}' for stat in TEAM_OFFENSE_STATS]
+TEAM_DEFENSE_COLUMNS = [f'team_def_{stat}' for stat in TEAM_DEFENSE_STATS]
+TEAM_CONTEXT_COLUMNS = TEAM_OFFENSE_COLUMNS + TEAM_DEFENSE_COLUMNS
+
+# Codes used by draft sites that differ from the stats data
+TEAM_ALIASES = {'LAR': 'LA', 'STL': 'LA', 'JAC': 'JAX', 'WSH': 'WAS', 'OAK': 'LV', 'LVR': 'LV', 'SD': 'LAC'}
+
+def context_params(league_settings: Optional[Dict]) -> Tuple[Optional[int], int]:
+    """(season, week) from request league settings; week 0 (the default) is before the season starts"""
+    league_settings = league_settings or {}
+    season = league_settings.get('season')
+    return int(season) if season is not None else None, int(league_settings.get('week') or 0)
+
+def encode_teams(teams: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """Distinct team codes (upper-cased) and each player's index into them
+
+    A pool has only a few dozen teams, so stores look up the distinct codes
+    and expand them with ``team_indices(codes)[inverse]``.
+    """
+    codes: Dict[str, int] = {}
+    inverse = np.fromiter((codes.setdefault(team, len(codes)) for team in teams), dtype=np.intp, count=len(teams))
+    return [code.upper() for code in codes], inverse
+
+def build_team_context(offense: "pd.DataFrame", defense: "pd.DataFrame") -> Tuple[np.ndarray, Dict]:
+    """(values, index) from weekly team offense and defense rows"""
+    frames = []
+    for df, stats, columns in (
+        (offense, TEAM_OFFENSE_STATS, TEAM_OFFENSE_COLUMNS),
+        (defense, TEAM_DEFENSE_STATS, TEAM_DEFENSE_COLUMNS),
+    ):
+        df = df[df['season_type'] == 'REG'][TEAM_KEYS + stats].sort_values(TEAM_KEYS)
+        df = df.astype({'team': str})
+        grouped = df.groupby(['team', 'season'])
+        # Season-to-date mean through each week
+        means = grouped[stats].cumsum().div(grouped.cumcount() + 1, axis=0)
+        means.columns = columns
+        frames.append(df[TEAM_KEYS].join(means).set_index(TEAM_KEYS))
+    context = frames[0].join(frames[1], how='outer').reset_index()
+
+    teams = sorted(context['team'].unique())
+    slots = sorted({(int(s), int(w)) for s, w in zip(context['season'], context['week'])})
+    team_index = {team: i for i, team in enumerate(teams)}
+    slot_index = {slot: i for i, slot in enumerate(slots)}
+
+    values = np.full((len(slots), len(teams) + 1, len(TEAM_CONTEXT_COLUMNS)), np.nan, dtype=np.float32)
+    rows = np.fromiter((slot_index[(int(s), int(w))] for s, w in zip(context['season'], context['week'])), dtype=np.intp)
+    cols = np.fromiter((team_index[t] for t in context['team']), dtype=np.intp)
+    values[rows, cols] = context[TEAM_CONTEXT_COLUMNS].to_numpy(dtype=np.float32)
+
+    # Bye weeks keep the team's previous value within the same season
+    for i in range(1, len(slots)):
+        if slots[i][0] == slots[i - 1][0]:
+            missing = np.isnan(values[i])
+            values[i][missing] = values[i - 1][missing]
+    # Last row: league average; teams yet to play this season get it too
+    values[:, -1] = np.nanmean(values[:, :-1], axis=1)
+    values = np.where(np.isnan(values), values[:, -1:], values)
+    values = np.nan_to_num(values)
+
+    index = {
+        'version': STORE_VERSION,
+        'columns': TEAM_CONTEXT_COLUMNS,
+        'teams': teams,
+        'slots': [list(slot) for slot in slots],
+        'built_at': time.time()
+    }
+    return np.ascontiguousarray(values), index
+
+def save_team_context(store_dir: str, values: np.ndarray, index: Dict):
+    """Write the array and its index, each replaced atomically"""
+    os.makedirs(store_dir, exist_ok=True)
+    array_path = os.path.join(store_dir, ARRAY_FILE)
+    with open(array_path + '.tmp', 'wb') as f:
+        np.save(f, values)
+    os.replace(array_path + '.tmp', array_path)
+    index_path = os.path.join(store_dir, INDEX_FILE)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f)
+    os.replace(index_path + '.tmp', index_path)
+
+class TeamContextStore:
+    """Memory-mapped team context vectors, gathered per player team"""
+
+    def __init__(self, values: np.ndarray, columns: List[str], teams: List[str], slots: List[Tuple[int, int]]):
+        if values.shape != (len(slots), len(teams) + 1, len(columns)):
+            raise ValueError(f"Team context array has shape {values.shape}, expected "
+                             f"{(len(slots), len(teams) + 1, len(columns))}")
+        self.values = values
+        self.columns = list(columns)
+        self.teams = list(teams)
+        self._team_index = {team: i for i, team in enumerate(teams)}
+        for alias, team in TEAM_ALIASES.items():
+            if team in self._team_index and alias not in self._team_index:
+                self._team_index[alias] = self._team_index[team]
+        self._unknown_team = len(teams)
+        self._slot_keys = np.array([season * 100 + week for season, week in slots], dtype=np.int64)
+        self.slots = [tuple(slot) for slot in slots]
+        self._column_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def load(cls, store_dir: str) -> "TeamContextStore":
+        with open(os.path.join(store_dir, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported team context store version {index.get('version')} in {store_dir}")
+        values = np.load(os.path.join(store_dir, ARRAY_FILE), mmap_mode='r')
+        return cls(values, index['columns'], index['teams'], index['slots'])
+
+    def slot(self, season: Optional[int] = None, week: int = 0) -> int:
+        """Latest slot at or before (season, week); the newest slot if season is None"""
+        if season is None:
+            return len(self.slots) - 1
+        i = int(np.searchsorted(self._slot_keys, season * 100 + week, side='right')) - 1
+        return max(i, 0)
+
+    def team_indices(self, teams: Sequence[str]) -> np.ndarray:
+        """Row of each team code, or the league-average row for unknown codes"""
+        lookup = self._team_index.get
+        unknown = self._unknown_team
+        return np.fromiter((lookup(team.upper(), unknown) for team in teams), dtype=np.intp, count=len(teams))
+
+    def gather(self, team_idx: np.ndarray, season: Optional[int] = None, week: int = 0) -> np.ndarray:
+        """(players, columns) context for each player's team row at (season, week)"""
+        return self.values[self.slot(season, week)][team_idx]
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Context rows of n random (slot, team) pairs, for synthetic training data"""
+        return self.values[rng.integers(len(self.slots), size=n), rng.integers(len(self.teams), size=n)]
+
+    def column_stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean and standard deviation of each column over every slot and team"""
+        if self._column_stats is None:
+            values = np.asarray(self.values[:, :-1]).reshape(-1, len(self.columns))
+            self._column_stats = (values.mean(axis=0), values.std(axis=0))
+        return self._column_stats
+
+    def info(self) -> Dict:
+        return {
+            'teams': len(self.teams),
+            'slots': len(self.slots),
+            'first_slot': list(self.slots[0]) if self.slots else None,
+            'last_slot': list(self.slots[-1]) if self.slots else None,
+            'columns': self.columns,
+            'nbytes': int(self.values.nbytes)
+        }
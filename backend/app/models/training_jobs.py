@@ -0,0 +1,217 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from app.models.ml_model import ScoutAIModel, TrainingCancelled
+from app.utils.executors import BoundedExecutor
+from app.utils.metrics import TRAINING_JOB_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for the status endpoint
+MAX_JOB_HISTORY = 50
+
+class TrainingJobConflict(Exception):
+    """Raised when a training job is submitted while another one is active"""
+
+def run_training_job(
+    model_dir: str,
+    num_samples: int,
+    progress,
+    cancel_event,
+    streaming: bool = False,
+    data_dir: Optional[str] = None,
+    team_context_dir: Optional[str] = None,
+    schedule_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Generate data, train and save a model; runs inside a training worker process
+    
+    ``progress`` is a shared dict the API process reads for status, and
+    ``cancel_event`` a shared event it sets to cancel the job. Streaming jobs
+    train out of core from the Parquet store in ``data_dir``, or from a
+    synthetic stream of ``num_samples`` rows if it is not set. The worker
+    maps the same team-context and schedule stores as the API, so the
+    feature sets match.
+    """
+    def report(stage: str, fraction: float):
+        progress.update(stage=stage, progress=fraction)
+        if cancel_event.is_set():
+            raise TrainingCancelled("Training cancelled")
+    
+    model = ScoutAIModel(
+        model_dir=model_dir, team_context_dir=team_context_dir, schedule_dir=schedule_dir, raise_save_errors=True
+    )
+    
+    # Boosting rounds cover 10%-95% of the reported progress
+    def on_round(fraction: float) -> bool:
+        progress.update(stage='training', progress=0.1 + 0.85 * fraction)
+        return not cancel_event.is_set()
+    
+    if streaming:
+        from app.models.out_of_core import parquet_batches
+        
+        report('reading_data', 0.0)
+        if data_dir:
+            source = parquet_batches(data_dir, model.feature_columns + ['target_score'])
+        else:
+            source = model.training_batches(num_samples)
+        results = model.train_model_streaming(source, test_size=0.2, on_progress=on_round)
+        progress.update(stage='saved', progress=1.0)
+        return results
+    
+    report('generating_data', 0.0)
+    training_data = model.generate_training_data(num_samples=num_samples)
+    
+    report('training', 0.1)
+    results = model.train_model(data=training_data, test_size=0.2, on_progress=on_round)
+    progress.update(stage='saved', progress=1.0)
+    return results
+
+class TrainingJob:
+    """Status record for one training job"""
+    
+    def __init__(
+        self,
+        num_samples: int,
+        progress,
+        cancel_event,
+        streaming: bool = False,
+        previous_version: Optional[str] = None
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.num_samples = num_samples
+        self.streaming = streaming
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.metrics: Optional[Dict[str, Any]] = None
+        self.model_version: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        # CURRENT model version when the job started; a successful job must replace it
+        self.previous_version = previous_version
+        # Resolved once the outcome is recorded and any new model is published
+        self.completed: Future = Future()
+        self._progress = progress
+        self._cancel_event = cancel_event
+        self._final_progress: Optional[Dict[str, Any]] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ('succeeded', 'failed', 'cancelled')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        progress = self._final_progress if self._final_progress is not None else dict(self._progress)
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'num_samples': self.num_samples,
+            'streaming': self.streaming,
+            'stage': progress.get('stage'),
+            'progress': progress.get('progress', 1.0 if self.status == 'succeeded' else 0.0),
+            'metrics': self.metrics,
+            'model_version': self.model_version,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'duration_seconds': (self.finished_at or time.time()) - self.created_at
+        }
+
+class TrainingJobManager:
+    """Runs one training job at a time in a worker process and hot-swaps the result
+    
+    When a job succeeds, the saved model is loaded into a new snapshot and
+    published on ``model``. Requests already scoring keep the previous snapshot.
+    """
+    
+    def __init__(self, model: ScoutAIModel, pool: BoundedExecutor):
+        self.model = model
+        self.pool = pool
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._active: Optional[TrainingJob] = None
+        self._lock = threading.Lock()
+        self._manager = None
+    
+    def _shared(self):
+        # The multiprocessing manager (a small server process) is started on first use
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager
+    
+    def submit(self, num_samples: int, streaming: bool = False, data_dir: Optional[str] = None) -> TrainingJob:
+        """Start a training job, or raise TrainingJobConflict if one is already active"""
+        with self._lock:
+            if self._active is not None and not self._active.done:
+                raise TrainingJobConflict(f"Training job {self._active.job_id} is already {self._active.status}")
+            manager = self._shared()
+            job = TrainingJob(
+                num_samples, manager.dict(stage='queued', progress=0.0), manager.Event(), streaming,
+                previous_version=self.model.artifacts.current()
+            )
+            job.future = self.pool.submit(
+                run_training_job, self.model.model_dir, num_samples, job._progress, job._cancel_event,
+                streaming, data_dir, self.model.team_context_dir, self.model.schedule_dir
+            )
+            job.status = 'running'
+            self._active = job
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > MAX_JOB_HISTORY:
+                self._jobs.popitem(last=False)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+    
+    def _finish(self, job: TrainingJob, future: Future):
+        """Record the outcome and publish the new model (runs on the pool's callback thread)"""
+        # Keep the last reported progress and release the shared objects in the manager process
+        try:
+            job._final_progress = dict(job._progress)
+        except Exception:
+            job._final_progress = {}
+        job._progress = job._cancel_event = None
+        
+        try:
+            if future.cancelled():
+                job.status = 'cancelled'
+            else:
+                job.metrics = future.result()
+                if self.model.artifacts.current() in (None, job.previous_version):
+                    raise RuntimeError(f"Training finished but no new model was saved to {self.model.model_dir}")
+                if not self.model._load_model():
+                    raise RuntimeError(f"Could not load the trained model from {self.model.model_dir}")
+                job.model_version = self.model.get_version()
+                job.status = 'succeeded'
+        except TrainingCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            logger.error(f"Training job {job.job_id} failed: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            TRAINING_JOB_SECONDS.labels(job.status).observe(job.finished_at - job.created_at)
+            job.completed.set_result(job.status)
+    
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+    
+    def list(self) -> List[TrainingJob]:
+        return list(reversed(self._jobs.values()))
+    
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """Cancel a queued or running job; the worker stops after its current boosting round"""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if not job.future.cancel() and job._cancel_event is not None:
+            job._cancel_event.set()
+        return job
+    
+    def shutdown(self):
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
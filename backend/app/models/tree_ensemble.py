@@ -0,0 +1,229 @@
+"""
+Pure-NumPy evaluator for a trained XGBoost regression booster
+
+compile_booster() flattens the booster into a few contiguous node arrays
+(split feature, threshold, default direction and leaf value). Each tree is
+padded to a complete binary tree, so a node's children are at 2i+1 and 2i+2
+and a batch walks down every tree in lockstep, one level per step.
+
+The StandardScaler is folded into the split thresholds. XGBoost goes left
+when ``float32((x - mean) / scale) < t``. That is monotone in x, so each
+split has a single raw cut point ``r`` with ``x < r`` giving the same
+decision for every float64 input. ``r`` is found exactly by bisection, so
+CompiledEnsemble.predict() scores raw feature matrices without importing
+xgboost or sklearn and without a scaling pass.
+"""
+
+import json
+from typing import Optional
+
+import numpy as np
+
+# Padding grows as 2**depth per tree, so refuse anything deeper than this
+MAX_COMPILED_DEPTH = 16
+
+_SIGN_BIT = np.int64(-2 ** 63)
+_MAGNITUDE = np.int64(2 ** 63 - 1)
+
+def _float_keys(x: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same ordering"""
+    bits = x.view(np.int64)
+    return np.where(bits >= 0, bits, -(bits & _MAGNITUDE))
+
+def _key_floats(keys: np.ndarray) -> np.ndarray:
+    return np.where(keys >= 0, keys, (-keys) | _SIGN_BIT).view(np.float64)
+
+def _fold_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Smallest raw x per split with float32((x - mean) / scale) >= threshold"""
+    threshold = threshold.astype(np.float32)
+
+    def goes_right(x):
+        return ((x - mean) / scale).astype(np.float32) >= threshold
+
+    guess = threshold.astype(np.float64) * scale + mean
+    delta = (np.abs(guess) + np.abs(scale)) * 1e-6
+    lo, hi = guess - delta, guess + delta
+    for _ in range(64):
+        bad_lo, bad_hi = goes_right(lo), ~goes_right(hi)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        delta *= 2
+        lo = np.where(bad_lo, guess - delta, lo)
+        hi = np.where(bad_hi, guess + delta, hi)
+    else:
+        raise ValueError("Could not bracket folded split thresholds")
+
+    lo_key, hi_key = _float_keys(lo), _float_keys(hi)
+    while (hi_key - lo_key > 1).any():
+        mid_key = lo_key + (hi_key - lo_key) // 2
+        right = goes_right(_key_floats(mid_key))
+        hi_key = np.where(right, mid_key, hi_key)
+        lo_key = np.where(right, lo_key, mid_key)
+    return _key_floats(hi_key)
+
+class CompiledEnsemble:
+    """Tree ensemble stored as padded complete binary trees in flat NumPy arrays"""
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        num_trees: int,
+        depth: int,
+        base_score: float
+    ):
+        self.feature = feature            # int32, split feature per node
+        self.threshold = threshold        # float64, raw cut point: go right when x >= threshold
+        self.default_left = default_left  # bool, direction for missing (NaN) values
+        self.value = value                # float32, leaf values, 2**depth per tree
+        self.num_trees = int(num_trees)
+        self.depth = int(depth)
+        self.base_score = float(base_score)
+        self.nodes_per_tree = 2 ** self.depth - 1
+        self.leaves_per_tree = 2 ** self.depth
+        # Node ids are global: tree t owns [t * nodes_per_tree, (t + 1) * nodes_per_tree)
+        tree = np.arange(self.num_trees, dtype=np.intp)
+        self._roots = tree * self.nodes_per_tree
+        # Left child of global id g in tree t is 2 * g + 1 - roots[t]
+        self._child_shift = 1 - self._roots
+        # A global id past the last level maps to its leaf with g + t - nodes_per_tree
+        self._leaf_shift = tree - self.nodes_per_tree
+
+    @property
+    def nbytes(self) -> int:
+        return self.feature.nbytes + self.threshold.nbytes + self.default_left.nbytes + self.value.nbytes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score a raw (unscaled) feature matrix; returns float32 like XGBRegressor.predict"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n = len(X)
+        if n == 0 or self.num_trees == 0:
+            return np.full(n, self.base_score, dtype=np.float32)
+
+        flat = X.ravel()
+        row_offset = (np.arange(n, dtype=np.intp) * X.shape[1])[:, None]
+        has_missing = np.isnan(flat).any()
+        node = np.repeat(self._roots[None, :], n, axis=0)
+        for _ in range(self.depth):
+            x = flat[row_offset + self.feature[node]]
+            go_right = x >= self.threshold[node]
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left[node], go_right)
+            node *= 2
+            node += self._child_shift
+            node += go_right
+
+        leaf_sum = self.value[node + self._leaf_shift].sum(axis=1, dtype=np.float64)
+        return (self.base_score + leaf_sum).astype(np.float32)
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                feature=self.feature,
+                threshold=self.threshold,
+                default_left=self.default_left,
+                value=self.value,
+                meta=np.array([self.num_trees, self.depth, self.base_score], dtype=np.float64)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledEnsemble":
+        with np.load(path) as data:
+            num_trees, depth, base_score = data['meta']
+            return cls(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                default_left=data['default_left'],
+                value=data['value'],
+                num_trees=int(num_trees),
+                depth=int(depth),
+                base_score=base_score
+            )
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=np.int32)
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+def compile_booster(
+    booster,
+    mean: Optional[np.ndarray] = None,
+    scale: Optional[np.ndarray] = None
+) -> CompiledEnsemble:
+    """Flatten an xgboost.Booster (gbtree, reg:squarederror) into a CompiledEnsemble
+
+    Pass the scaler's ``mean``/``scale`` if the booster was trained on
+    standardized features; the compiled ensemble then takes raw features.
+    """
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+    objective = learner['objective']['name']
+    if objective != 'reg:squarederror':
+        raise ValueError(f"Only reg:squarederror boosters can be compiled, got {objective}")
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree':
+        raise ValueError(f"Only gbtree boosters can be compiled, got {gbm['name']}")
+    trees = gbm['model']['trees']
+
+    # Match XGBRegressor.predict, which stops at the best iteration after early stopping
+    best_iteration = booster.attributes().get('best_iteration')
+    if best_iteration is not None:
+        trees = trees[:gbm['model']['iteration_indptr'][int(best_iteration) + 1]]
+
+    parsed = []
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("Categorical splits cannot be compiled")
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        right = np.asarray(tree['right_children'], dtype=np.int64)
+        parsed.append((left, right, tree))
+    depth = max((_tree_depth(left, right) for left, right, _ in parsed), default=0)
+    if depth > MAX_COMPILED_DEPTH:
+        raise ValueError(f"Trees of depth {depth} are too deep to compile (max {MAX_COMPILED_DEPTH})")
+
+    nodes_per_tree, leaves_per_tree = 2 ** depth - 1, 2 ** depth
+    num_trees = len(parsed)
+    feature = np.zeros(num_trees * nodes_per_tree, dtype=np.int32)
+    # NaN never compares >=, so padding nodes always go left
+    threshold = np.full(num_trees * nodes_per_tree, np.nan, dtype=np.float64)
+    default_left = np.ones(num_trees * nodes_per_tree, dtype=bool)
+    value = np.zeros(num_trees * leaves_per_tree, dtype=np.float32)
+
+    for t, (left, right, tree) in enumerate(parsed):
+        split_index = tree['split_indices']
+        # Leaf nodes keep their value in split_conditions
+        condition = np.asarray(tree['split_conditions'], dtype=np.float32)
+        tree_default_left = tree['default_left']
+        node_base, leaf_base = t * nodes_per_tree, t * leaves_per_tree
+
+        # (original node, position in the padded tree, level)
+        stack = [(0, 0, 0)]
+        while stack:
+            node, slot, level = stack.pop()
+            if level == depth:
+                value[leaf_base + slot - nodes_per_tree] = condition[node]
+            elif left[node] < 0:
+                # Leaf above the bottom level: carry it down the always-left padding path
+                stack.append((node, 2 * slot + 1, level + 1))
+            else:
+                feature[node_base + slot] = split_index[node]
+                threshold[node_base + slot] = condition[node]
+                default_left[node_base + slot] = bool(tree_default_left[node])
+                stack.append((left[node], 2 * slot + 1, level + 1))
+                stack.append((right[node], 2 * slot + 2, level + 1))
+
+    is_split = ~np.isnan(threshold)
+    split_feature = feature[is_split]
+    num_features = int(learner['learner_model_param']['num_feature'])
+    mean = np.zeros(num_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(num_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    threshold[is_split] = _fold_thresholds(threshold[is_split], mean[split_feature], scale[split_feature])
+
+    base_score = float(learner['learner_model_param']['base_score'])
+    return CompiledEnsemble(feature, threshold, default_left, value, num_trees, depth, base_score)
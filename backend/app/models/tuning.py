@@ -0,0 +1,227 @@
+"""
+Hyperparameter search with k-fold cross-validation on a process pool
+
+Trials are random draws from a search space. Each (trial, fold) fit runs
+on a pool worker with XGBoost's ``hist`` tree method and early stopping on
+the held-out fold. Workers get ``cores // workers`` threads each so the
+pool never runs more threads than there are cores.
+
+Poor trials are pruned by successive halving over folds: every trial is
+scored on the first fold, the best third go on to the next rung of folds,
+and only the survivors of the last rung are cross-validated on every fold.
+The feature matrix is sent to each worker once, when the pool starts.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Values are lists to choose from, or (low, high) / (low, high, 'log') ranges
+SEARCH_SPACE: Dict[str, Any] = {
+    'max_depth': [3, 4, 5, 6, 7, 8],
+    'learning_rate': (0.02, 0.3, 'log'),
+    'min_child_weight': [1, 2, 4, 8],
+    'subsample': (0.6, 1.0),
+    'colsample_bytree': (0.6, 1.0),
+    'reg_lambda': (0.1, 10.0, 'log'),
+}
+
+# Boosting rounds are chosen by early stopping on the validation fold
+MAX_ROUNDS = 1000
+EARLY_STOPPING_ROUNDS = 20
+# Fraction of trials kept at each pruning rung is 1 / PRUNE_FACTOR
+PRUNE_FACTOR = 3
+
+@dataclass
+class Trial:
+    """One sampled configuration and its validation scores so far"""
+    trial_id: int
+    params: Dict[str, Any]
+    fold_rmse: Dict[int, float] = field(default_factory=dict)
+    fold_rounds: Dict[int, int] = field(default_factory=dict)
+    pruned: bool = False
+
+    @property
+    def rmse(self) -> float:
+        return float(np.mean(list(self.fold_rmse.values()))) if self.fold_rmse else math.inf
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trial_id': self.trial_id,
+            'params': self.params,
+            'cv_rmse': self.rmse,
+            'folds_evaluated': len(self.fold_rmse),
+            'pruned': self.pruned
+        }
+
+def sample_params(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    params = {}
+    for name, values in space.items():
+        if isinstance(values, list):
+            params[name] = values[rng.integers(len(values))]
+            if isinstance(params[name], np.generic):
+                params[name] = params[name].item()
+        elif len(values) == 3 and values[2] == 'log':
+            params[name] = float(np.exp(rng.uniform(np.log(values[0]), np.log(values[1]))))
+        else:
+            params[name] = float(rng.uniform(values[0], values[1]))
+    return params
+
+def plan_workers(workers: Optional[int], num_tasks: int, cores: Optional[int] = None) -> Tuple[int, int]:
+    """(workers, threads per worker) that together use at most the available cores"""
+    cores = cores or os.cpu_count() or 1
+    workers = max(1, min(workers or cores, cores, num_tasks))
+    return workers, max(1, cores // workers)
+
+def fold_indices(num_rows: int, folds: int, seed: int) -> List[np.ndarray]:
+    """Shuffled validation row indices for each fold"""
+    order = np.random.default_rng(seed).permutation(num_rows)
+    return np.array_split(order, folds)
+
+def prune_rungs(folds: int) -> List[int]:
+    """Cumulative folds evaluated at each rung, e.g. [1, 2, 5] for 5 folds"""
+    return sorted({1, max(1, folds // 2), folds})
+
+# Worker state, set once per process by _init_worker
+_X: Optional[np.ndarray] = None
+_y: Optional[np.ndarray] = None
+_folds: List[np.ndarray] = []
+_threads = 1
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: List[np.ndarray], threads: int):
+    global _X, _y, _folds, _threads
+    # Set before XGBoost starts its OpenMP runtime in this process
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    _X, _y, _folds, _threads = X, y, folds, threads
+
+def _fit_fold(trial_id: int, params: Dict[str, Any], fold: int) -> Tuple[int, int, float, int]:
+    """(trial_id, fold, validation RMSE, boosting rounds kept) for one fold"""
+    import xgboost as xgb
+
+    val_idx = _folds[fold]
+    train_mask = np.ones(len(_y), dtype=bool)
+    train_mask[val_idx] = False
+    model = xgb.XGBRegressor(
+        n_estimators=MAX_ROUNDS,
+        tree_method='hist',
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        objective='reg:squarederror',
+        random_state=42,
+        n_jobs=_threads,
+        **params
+    )
+    model.fit(_X[train_mask], _y[train_mask], eval_set=[(_X[val_idx], _y[val_idx])], verbose=False)
+    rmse = float(model.evals_result()['validation_0']['rmse'][model.best_iteration])
+    return trial_id, fold, rmse, model.best_iteration + 1
+
+def search(
+    X: np.ndarray,
+    y: np.ndarray,
+    search_space: Optional[Dict[str, Any]] = None,
+    num_trials: int = 20,
+    folds: int = 5,
+    workers: Optional[int] = None,
+    seed: int = 42,
+    cores: Optional[int] = None
+) -> Dict[str, Any]:
+    """Cross-validated random search; returns the best parameters and a summary of every trial
+
+    ``best_params`` includes ``n_estimators``: the mean number of rounds
+    early stopping kept across the best trial's folds.
+    """
+    if num_trials < 1:
+        raise ValueError("Need at least one trial")
+    if folds < 2:
+        raise ValueError("Cross-validation needs at least 2 folds")
+    if len(y) < folds:
+        raise ValueError(f"Need at least {folds} rows for {folds}-fold cross-validation")
+    rng = np.random.default_rng(seed)
+    trials = [Trial(i, sample_params(search_space or SEARCH_SPACE, rng)) for i in range(num_trials)]
+    workers, threads = plan_workers(workers, num_trials, cores)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.ascontiguousarray(y, dtype=np.float32)
+
+    start = time.perf_counter()
+    alive = trials
+    done_folds = 0
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        # spawn rather than fork: forking after XGBoost/OpenMP has started can deadlock
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(X, y, fold_indices(len(y), folds, seed), threads)
+    )
+    with executor:
+        for rung_folds in prune_rungs(folds):
+            tasks = [
+                executor.submit(_fit_fold, trial.trial_id, trial.params, fold)
+                for trial in alive for fold in range(done_folds, rung_folds)
+            ]
+            for task in tasks:
+                trial_id, fold, rmse, rounds = task.result()
+                trials[trial_id].fold_rmse[fold] = rmse
+                trials[trial_id].fold_rounds[fold] = rounds
+            done_folds = rung_folds
+            if rung_folds < folds:
+                alive = sorted(alive, key=lambda t: t.rmse)
+                keep = max(1, math.ceil(len(alive) / PRUNE_FACTOR))
+                for trial in alive[keep:]:
+                    trial.pruned = True
+                alive = alive[:keep]
+                logger.info(f"Tuning: {len(alive)} of {num_trials} trials left after {rung_folds} fold(s)")
+    wall_seconds = time.perf_counter() - start
+
+    best = min(alive, key=lambda t: t.rmse)
+    best_params = dict(best.params, n_estimators=int(round(np.mean(list(best.fold_rounds.values())))))
+    logger.info(f"Tuning: best CV RMSE {best.rmse:.4f} with {best_params} in {wall_seconds:.1f}s")
+    return {
+        'best_params': best_params,
+        'cv_rmse': best.rmse,
+        'cv_rmse_std': float(np.std(list(best.fold_rmse.values()))),
+        'folds': folds,
+        'num_trials': num_trials,
+        'pruned_trials': sum(t.pruned for t in trials),
+        'fits': sum(len(t.fold_rmse) for t in trials),
+        'workers': workers,
+        'threads_per_worker': threads,
+        'wall_seconds': wall_seconds,
+        'trials': [t.to_dict() for t in sorted(trials, key=lambda t: t.rmse)]
+    }
+
+def scaling_curve(
+    X: np.ndarray,
+    y: np.ndarray,
+    core_counts: Sequence[int],
+    num_trials: int = 8,
+    folds: int = 3,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """Wall-clock time of the same search when limited to each number of cores
+
+    Use it to size a training machine: speedup is relative to the first
+    core count, and efficiency is speedup per extra core. Counts above the
+    cores of the machine running it are meaningless.
+    """
+    rows = []
+    for cores in core_counts:
+        result = search(X, y, num_trials=num_trials, folds=folds, workers=cores, seed=seed, cores=cores)
+        rows.append({
+            'cores': cores,
+            'workers': result['workers'],
+            'threads_per_worker': result['threads_per_worker'],
+            'wall_seconds': result['wall_seconds'],
+            'fits': result['fits']
+        })
+    for row in rows:
+        row['speedup'] = rows[0]['wall_seconds'] / row['wall_seconds']
+        row['efficiency'] = row['speedup'] / (row['cores'] / rows[0]['cores'])
+    return rows
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from app.utils.metrics import POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class PoolOverloaded(Exception):
+    """Raised when a pool already has its maximum number of queued and running tasks"""
+
+def _timed_call(wait_seconds, submitted_at: float, fn: Callable, args, kwargs):
+    wait_seconds.observe(time.perf_counter() - submitted_at)
+    return fn(*args, **kwargs)
+
+class BoundedExecutor:
+    """Run blocking work off the event loop, rejecting new work once the pool is full
+    
+    At most ``max_workers`` tasks run at once and at most ``max_queued`` more
+    wait for a worker. Anything beyond that raises PoolOverloaded immediately
+    instead of queueing without limit.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[int], Executor],
+        max_workers: int,
+        max_queued: int,
+        track_wait: bool = False
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Queue wait is observed inside the worker, so only in-process (thread) pools can record it
+        self._wait_seconds = POOL_WAIT_SECONDS.labels(name) if track_wait else None
+    
+    def _get_executor(self) -> Executor:
+        # Created on first use so importing the API does not start threads or processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.max_workers)
+            return self._executor
+    
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn on the pool and return its future, or raise PoolOverloaded"""
+        if not self._slots.acquire(blocking=False):
+            raise PoolOverloaded(f"{self.name} pool is at capacity ({self.max_workers} running, {self.max_queued} queued)")
+        with self._lock:
+            self._pending += 1
+        try:
+            if self._wait_seconds is not None:
+                future = self._get_executor().submit(
+                    _timed_call, self._wait_seconds, time.perf_counter(), fn, args, kwargs
+                )
+            else:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+    
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn on the pool and wait for its result without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+    
+    def stats(self) -> dict:
+        return {
+            'max_workers': self.max_workers,
+            'max_queued': self.max_queued,
+            'pending': self._pending
+        }
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def thread_pool(name: str, max_workers: int, max_queued: int) -> BoundedExecutor:
+    """Bounded thread pool for short CPU-bound work such as model inference"""
+    return BoundedExecutor(
+        name,
+        lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"scoutai-{name}"),
+        max_workers,
+        max_queued,
+        track_wait=True
+    )
+
+def process_pool(name: str, max_workers: int, max_queued: int) -> BoundedExecutor:
+    """Bounded process pool for long-running work such as model training"""
+    # spawn rather than fork: forking a process that already has XGBoost/OpenMP threads can deadlock
+    return BoundedExecutor(
+        name,
+        lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")),
+        max_workers,
+        max_queued
+    )
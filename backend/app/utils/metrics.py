@@ -0,0 +1,344 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format
+
+Counters, gauges and histograms with labels, cheap enough to leave on in
+production: observing a value is a dict lookup, a bisect and an increment
+under a per-series lock. Series are created on first use.
+"""
+
+import contextvars
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Starlette appends "; charset=utf-8" to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; from 100 µs (a compiled-model predict) to 10 s (a slow request)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric(ABC):
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_series(self):
+        """A new, empty series for one set of label values"""
+
+    def labels(self, *values, **labels):
+        """The series for these label values, created on first use"""
+        if labels:
+            values = tuple(labels[n] for n in self.label_names)
+        # Fast path: already-seen string labels skip the conversion
+        series = self._series.get(values)
+        if series is None:
+            values = tuple(str(v) for v in values)
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = self._series[values] = self._new_series()
+        return series
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Exposition lines for every series"""
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(self.samples())
+        return lines
+
+class _CounterSeries:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. errors"""
+    type_name = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, series in list(self._series.items()):
+            yield f'{self.name}{_label_text(self.label_names, values)} {_format_value(series.value)}'
+
+class _GaugeSeries:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = float(value)
+
+class Gauge(_Metric):
+    """Current value, e.g. the served model version; set_function reads it at scrape time"""
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]):
+        """Compute the series at scrape time: function returns {label values: value}"""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            items = [(tuple(str(v) for v in values), value) for values, value in self._function().items()]
+        else:
+            items = [(values, series.value) for values, series in list(self._series.items())]
+        for values, value in items:
+            yield f'{self.name}{_label_text(self.label_names, values)} {_format_value(value)}'
+
+class _Timer:
+    __slots__ = ('_series', '_start')
+
+    def __init__(self, series: "_HistogramSeries"):
+        self._series = series
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._start)
+
+class _HistogramSeries:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        """Context manager that observes the seconds spent inside it"""
+        return _Timer(self)
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets, e.g. latencies"""
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def samples(self):
+        for values, series in list(self._series.items()):
+            with series._lock:
+                counts, total = list(series.counts), series.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f'{self.name}_bucket{_label_text(self.label_names, values, le)} {cumulative}'
+            labels = _label_text(self.label_names, values)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+class Registry:
+    """Metrics rendered together by /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def counter(name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, label_names))
+
+def gauge(name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, label_names))
+
+def histogram(
+    name: str,
+    documentation: str,
+    label_names: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, label_names, buckets))
+
+# ScoutAI metrics
+
+HTTP_REQUESTS = counter('scoutai_http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+HTTP_REQUEST_SECONDS = histogram('scoutai_http_request_seconds', 'HTTP request latency', ('method', 'route'))
+STAGE_SECONDS = histogram(
+    'scoutai_stage_seconds',
+    'Latency of each recommendation stage: validate, features, availability, scale, predict, rank, explain, serialize',
+    ('stage',)
+)
+POOL_SIZE = histogram(
+    'scoutai_player_pool_size',
+    'Players per recommendation request',
+    ('endpoint',),
+    buckets=(10, 25, 50, 100, 200, 300, 500, 750, 1000, 2000, 5000)
+)
+SCORED_ROWS = counter('scoutai_scored_rows_total', 'Feature rows scored, by model version and engine', ('model_version', 'engine'))
+ERRORS = counter('scoutai_errors_total', 'Errors that were handled without failing the request, or that failed it', ('kind',))
+MODEL_INFO = gauge('scoutai_model_info', 'Model version currently served (value is always 1)', ('version', 'compiled'))
+TRAINING_JOB_SECONDS = histogram(
+    'scoutai_training_job_seconds',
+    'Training job duration by outcome',
+    ('status',),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+RECOMMENDATION_CACHE = counter(
+    'scoutai_recommendation_cache_total',
+    'Recommendation cache lookups by result: hit, miss or not_modified (answered 304)',
+    ('result',)
+)
+EXPLANATION_CACHE = counter(
+    'scoutai_explanation_cache_total',
+    'Feature-contribution rows served from the explanation cache (hit) or computed (miss)',
+    ('result',)
+)
+POOL_WAIT_SECONDS = histogram('scoutai_pool_wait_seconds', 'Time tasks wait for a free worker thread', ('pool',))
+POOL_PENDING = gauge('scoutai_pool_pending_tasks', 'Running plus queued tasks per worker pool', ('pool',))
+
+# Per-request timing shared between the middleware and the route handlers
+_request_timing: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    'scoutai_request_timing', default=None
+)
+
+def stage(name: str) -> _Timer:
+    """Time a block as one stage: ``with metrics.stage('features'): ...``"""
+    return STAGE_SECONDS.labels(name).time()
+
+def handler_started():
+    """Record the validate stage: from the request arriving to the handler running
+
+    This covers reading the body, JSON decoding and Pydantic validation.
+    Handlers that decode their own body call it once the body is validated.
+    """
+    timing = _request_timing.get()
+    if timing is not None:
+        timing['handler_started'] = time.perf_counter()
+        STAGE_SECONDS.labels('validate').observe(timing['handler_started'] - timing['start'])
+
+def handler_finished():
+    """Mark the end of the handler; the middleware records serialization up to the response start
+
+    Only the first call counts, so a handler that serializes its own
+    response can mark the end before doing so.
+    """
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.setdefault('handler_finished', time.perf_counter())
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timing = {'start': time.perf_counter()}
+        token = _request_timing.set(timing)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if 'handler_finished' in timing:
+                    STAGE_SECONDS.labels('serialize').observe(time.perf_counter() - timing['handler_finished'])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_timing.reset(token)
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            HTTP_REQUESTS.labels(scope['method'], route, status).inc()
+            HTTP_REQUEST_SECONDS.labels(scope['method'], route).observe(time.perf_counter() - timing['start'])
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class NewsUnavailable(Exception):
+    """Raised when news cannot be fetched (no API key, upstream error or timeout)"""
+
+class NewsClient:
+    """Async client for the news search API with a per-player TTL cache
+
+    One pooled httpx.AsyncClient is shared by all requests. Results are
+    cached per player with a TTL and evicted least recently used first once
+    ``max_entries`` is reached. Concurrent requests for a player that is not
+    cached share a single upstream call.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        timeout_seconds: float = 5.0,
+        ttl_seconds: float = 900.0,
+        max_entries: int = 1000,
+        max_connections: int = 10,
+        prefetch_concurrency: int = 2,
+        article_count: int = 5
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout_seconds = timeout_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_connections = max_connections
+        self.article_count = article_count
+        self._client: Optional[httpx.AsyncClient] = None
+        # player key -> (expires_at, articles), least recently used first
+        self._cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._prefetch_tasks: Dict[str, asyncio.Task] = {}
+        self._prefetch_concurrency = prefetch_concurrency
+        self._prefetch_slots: Optional[asyncio.Semaphore] = None
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Ocp-Apim-Subscription-Key": self.api_key},
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+        return self._client
+
+    @staticmethod
+    def _key(player: str) -> str:
+        return ' '.join(player.lower().split())
+
+    def _cached(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, articles = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return articles
+
+    def _store(self, key: str, articles: List[Dict[str, Any]]):
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, articles)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def get_articles(self, player: str) -> List[Dict[str, Any]]:
+        """Recent news articles about a player, from the cache when fresh"""
+        if not self.enabled:
+            raise NewsUnavailable("Bing News API key not set in environment variables.")
+        key = self._key(player)
+        articles = self._cached(key)
+        if articles is not None:
+            self._hits += 1
+            return articles
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self._misses += 1
+            task = asyncio.create_task(self._fetch(key, player))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self._coalesced += 1
+        # Shielded so a caller that disconnects does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, player: str) -> List[Dict[str, Any]]:
+        params = {
+            "q": player,
+            "mkt": "en-US",
+            "count": self.article_count,
+            "sortBy": "Date"
+        }
+        try:
+            response = await self._get_client().get("/news/search", params=params)
+        except httpx.HTTPError as e:
+            logger.warning(f"News request for {player} failed: {e!r}")
+            raise NewsUnavailable("Failed to fetch news articles.")
+        if response.status_code != 200:
+            logger.warning(f"News request for {player} returned HTTP {response.status_code}")
+            raise NewsUnavailable("Failed to fetch news articles.")
+
+        try:
+            items = response.json().get("value", [])
+        except ValueError:
+            logger.warning(f"News response for {player} is not valid JSON")
+            raise NewsUnavailable("Failed to fetch news articles.")
+
+        articles = []
+        for item in items:
+            articles.append({
+                "title": item.get("name"),
+                "url": item.get("url"),
+                "source": (item.get("provider") or [{}])[0].get("name", "Unknown"),
+                "publishedAt": item.get("datePublished"),
+                "snippet": item.get("description")
+            })
+        self._store(key, articles)
+        return articles
+
+    def prefetch(self, players: Iterable[str]):
+        """Warm the cache for players in the background (e.g. the ones just recommended)"""
+        if not self.enabled:
+            return
+        if self._prefetch_slots is None:
+            self._prefetch_slots = asyncio.Semaphore(self._prefetch_concurrency)
+        for player in players:
+            key = self._key(player)
+            if key in self._in_flight or key in self._prefetch_tasks or self._cached(key) is not None:
+                continue
+            task = asyncio.create_task(self._prefetch_one(player))
+            self._prefetch_tasks[key] = task
+            task.add_done_callback(lambda _, key=key: self._prefetch_tasks.pop(key, None))
+
+    async def _prefetch_one(self, player: str):
+        async with self._prefetch_slots:
+            try:
+                await self.get_articles(player)
+            except NewsUnavailable:
+                pass  # Already logged; the sidebar will retry on click
+            except Exception as e:
+                logger.error(f"Error prefetching news for {player}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'cached_players': len(self._cache),
+            'in_flight': len(self._in_flight),
+            'prefetching': len(self._prefetch_tasks),
+            'hits': self._hits,
+            'misses': self._misses,
+            'coalesced': self._coalesced
+        }
+
+    async def aclose(self):
+        for task in list(self._prefetch_tasks.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
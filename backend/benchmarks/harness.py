@@ -0,0 +1,193 @@
+"""
+Measurement helpers for the benchmark suite: timing, peak memory, result
+files and comparison against a stored baseline
+"""
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.models.ml_model import POSITIONS
+from app.models.schemas import Player
+
+RESULTS_VERSION = 1
+
+# Metrics checked against the baseline, with the smallest change that counts
+# as a regression on top of the relative tolerance (filters out timer noise)
+COMPARED_METRICS = {
+    'p50_ms': 0.05,
+    'peak_memory_mb': 1.0,
+}
+
+def make_players(rng: np.random.Generator, n: int) -> List[Player]:
+    """Random but reproducible player pool"""
+    return [
+        Player(
+            name=f'Player {i}',
+            position=POSITIONS[rng.integers(len(POSITIONS))],
+            team='FA',
+            adp=float(rng.uniform(1, 250)),
+            projected_points=float(rng.uniform(40, 400)),
+            bye_week=int(rng.integers(5, 15))
+        )
+        for i in range(n)
+    ]
+
+def player_columns(players: List[Player]) -> Dict[str, list]:
+    """The same pool as /suggest-columnar's parallel arrays"""
+    return {
+        'names': [p.name for p in players],
+        'positions': [p.position.value for p in players],
+        'teams': [p.team for p in players],
+        'adp': [p.adp for p in players],
+        'projected_points': [p.projected_points for p in players],
+        'bye_week': [p.bye_week for p in players],
+    }
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max()),
+    }
+
+def peak_memory_mb(fn: Callable[[], Any]) -> float:
+    """Peak traced Python and NumPy allocation during one call of fn"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    params: Optional[Dict[str, Any]] = None,
+    repeat: int = 20,
+    warmup: int = 1,
+    items: int = 1,
+    unit: str = 'calls'
+) -> Dict[str, Any]:
+    """Time fn over repeat runs, then measure its peak memory in one extra traced run
+
+    ``items`` is the work done per call (e.g. players scored) and sets the
+    throughput; tracing is kept out of the timed runs because it slows them.
+    """
+    for _ in range(warmup):
+        fn()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    result = {
+        'name': name,
+        'params': params or {},
+        'runs': repeat,
+        **latency_summary(seconds),
+        'peak_memory_mb': peak_memory_mb(fn),
+    }
+    result['throughput'] = items / (result['mean_ms'] / 1000)
+    result['throughput_unit'] = f'{unit}/s'
+    return result
+
+def result_key(result: Dict[str, Any]) -> str:
+    params = ','.join(f'{k}={v}' for k, v in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+def environment() -> Dict[str, Any]:
+    """Versions and machine details stored with the results"""
+    packages = {}
+    for package in ['numpy', 'pandas', 'scikit-learn', 'xgboost', 'fastapi', 'pyarrow']:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+        'git_commit': commit,
+    }
+
+def save_results(path: str, results: List[Dict[str, Any]], settings: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        'version': RESULTS_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': environment(),
+        'settings': settings,
+        'results': results,
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(document, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[Dict[str, Any]]:
+    """One row per result and compared metric; rows with regressed=True got worse than allowed"""
+    previous = {result_key(r): r for r in baseline.get('results', [])}
+    rows = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        for metric, min_change in COMPARED_METRICS.items():
+            if metric not in result or metric not in old:
+                continue
+            current, reference = result[metric], old[metric]
+            ratio = current / reference if reference else float('inf')
+            rows.append({
+                'key': result_key(result),
+                'metric': metric,
+                'baseline': reference,
+                'current': current,
+                'ratio': ratio,
+                'regressed': current > reference * (1 + tolerance) and current - reference > min_change,
+            })
+    return rows
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"{'benchmark':<48} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'throughput':>20} {'peak MB':>9}")
+    for r in results:
+        throughput = f"{r['throughput']:,.0f} {r['throughput_unit']}"
+        print(f"{result_key(r):<48} {r['p50_ms']:>10.2f} {r['p90_ms']:>10.2f} {r['p99_ms']:>10.2f} "
+              f"{throughput:>20} {r['peak_memory_mb']:>9.1f}")
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    print(f"{'benchmark':<48} {'metric':<15} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        print(f"{row['key']:<48} {row['metric']:<15} {row['baseline']:>10.2f} {row['current']:>10.2f} "
+              f"{row['ratio']:>6.2f}x{flag}")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the recommendation, training and dataset pipelines
+
+Suites:
+  recommendations  ScoutAIModel.get_recommendations on 50/300/1000-player pools
+  training_data    generate_training_data at several sample sizes
+  training         train_model at several sample sizes
+  dataset          build_modeling_dataset.py (full and --streaming) on 1x/2x/4x copies of data/raw
+                   (skipped if it is missing)
+  decode           /suggest request decoding: per-player JSON vs columnar JSON and msgpack
+  api              POST /api/v1/suggest and /suggest-columnar through an in-process ASGI client
+
+Each benchmark reports p50/p90/p99 latency, throughput and peak memory. The
+results are written as JSON and, with --baseline, compared against an
+earlier run; the exit status is 1 if anything regressed beyond --tolerance.
+All inputs are seeded, so runs on the same machine are comparable.
+
+Usage:
+    python benchmarks/run_benchmarks.py                                   # every suite
+    python benchmarks/run_benchmarks.py --suite recommendations --suite api --quick
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+sys.path.append(BACKEND_DIR)
+
+from harness import (
+    compare, latency_summary, load_results, make_players, measure, player_columns, print_comparison, print_results,
+    save_results
+)
+from app.models.ml_model import ScoutAIModel
+from app.models.schemas import Roster
+
+SUITES = ['recommendations', 'training_data', 'training', 'dataset', 'decode', 'api']
+
+# (full, --quick) sizes per suite
+POOL_SIZES = ([50, 300, 1000], [50, 300, 1000])
+GENERATE_SIZES = ([10_000, 100_000, 1_000_000], [10_000, 100_000])
+TRAIN_SIZES = ([5_000, 20_000, 50_000], [2_000, 5_000])
+DATASET_SCALES = ([1, 2, 4], [1])
+
+# Samples for the model used by the recommendations and api suites
+BENCHMARK_MODEL_SAMPLES = 20_000
+
+ROSTER = Roster(QB=['QB 1'], RB=['RB 1', 'RB 2'], WR=['WR 1'])
+
+# Runs build_modeling_dataset.py in a fresh interpreter and reports its peak RSS
+DATASET_PROBE = """
+import json, resource, runpy, sys, time
+sys.path.insert(0, {backend!r})
+sys.argv = [{script!r}] + {args!r}
+start = time.perf_counter()
+runpy.run_path({script!r}, run_name='__main__')
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+def train_benchmark_model(model_dir: str) -> ScoutAIModel:
+    model = ScoutAIModel(model_dir=model_dir, legacy_model_path=os.path.join(model_dir, 'none.pkl'))
+    model.train_model(model.generate_training_data(num_samples=BENCHMARK_MODEL_SAMPLES, seed=0))
+    # Load the XGBoost model up front, as the API does at startup
+    model.snapshot.get_model()
+    return model
+
+def bench_recommendations(model: ScoutAIModel, quick: bool, repeat: int):
+    results = []
+    for n in POOL_SIZES[quick]:
+        players = make_players(np.random.default_rng(n), n)
+        results.append(measure(
+            'recommendations',
+            lambda: model.get_recommendations(3, 2, ROSTER, players),
+            params={'players': n},
+            repeat=repeat,
+            items=n,
+            unit='players'
+        ))
+    return results
+
+def bench_training_data(quick: bool, repeat: int):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model = ScoutAIModel(model_dir=tmp_dir, legacy_model_path=os.path.join(tmp_dir, 'none.pkl'))
+        for n in GENERATE_SIZES[quick]:
+            results.append(measure(
+                'generate_training_data',
+                lambda: model.generate_training_data(num_samples=n, seed=0),
+                params={'samples': n},
+                repeat=max(1, repeat // 10) if n >= 100_000 else repeat,
+                items=n,
+                unit='rows'
+            ))
+    return results
+
+def bench_training(quick: bool, repeat: int):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model = ScoutAIModel(model_dir=tmp_dir, legacy_model_path=os.path.join(tmp_dir, 'none.pkl'), keep_versions=1)
+        for n in TRAIN_SIZES[quick]:
+            data = model.generate_training_data(num_samples=n, seed=0)
+            results.append(measure(
+                'train_model',
+                lambda: model.train_model(data),
+                params={'samples': n},
+                repeat=max(1, repeat // 10),
+                warmup=0,
+                items=n,
+                unit='rows'
+            ))
+    return results
+
+def _scaled_raw_copy(raw_dir: str, target_dir: str, scale: int):
+    """Write scale copies of every raw CSV, each shifted to its own seasons and game ids"""
+    import pandas as pd
+
+    os.makedirs(target_dir, exist_ok=True)
+    for name in os.listdir(raw_dir):
+        if not name.endswith('.csv'):
+            continue
+        # Text in, text out: the copies keep the source formatting
+        df = pd.read_csv(os.path.join(raw_dir, name), dtype=str, keep_default_na=False)
+        copies = []
+        for k in range(scale):
+            copy = df.copy()
+            if k:
+                if 'season' in copy.columns:
+                    copy['season'] = (pd.to_numeric(copy['season']) + 100 * k).astype(str)
+                if 'game_id' in copy.columns:
+                    copy['game_id'] = copy['game_id'] + f'_{k}'
+            copies.append(copy)
+        pd.concat(copies, ignore_index=True).to_csv(os.path.join(target_dir, name), index=False)
+
+def bench_dataset(raw_dir: str, quick: bool, repeat: int):
+    from raw_data import SCHEMAS
+
+    missing = [s.source for s in SCHEMAS.values() if not os.path.exists(os.path.join(raw_dir, s.source))]
+    if missing:
+        print(f"Skipping dataset suite: {', '.join(missing)} not found in {raw_dir}")
+        return []
+
+    script = os.path.join(BACKEND_DIR, 'build_modeling_dataset.py')
+    results = []
+    for scale in DATASET_SCALES[quick]:
+        with tempfile.TemporaryDirectory() as work_dir:
+            _scaled_raw_copy(raw_dir, os.path.join(work_dir, 'data', 'raw'), scale)
+            rows = sum(1 for _ in open(os.path.join(work_dir, 'data', 'raw', SCHEMAS['player_offense'].source))) - 1
+            for name, args in [('build_modeling_dataset', []), ('build_modeling_dataset_streaming', ['--streaming'])]:
+                results.append(_bench_dataset_build(name, script, args, work_dir, scale, rows, repeat))
+    return results
+
+def _bench_dataset_build(name: str, script: str, args, work_dir: str, scale: int, rows: int, repeat: int):
+    probe = DATASET_PROBE.format(backend=BACKEND_DIR, script=script, args=list(args))
+    runs = []
+    for _ in range(max(1, repeat // 10)):
+        # Clear the Parquet cache so every run parses the CSVs, like a fresh checkout
+        shutil.rmtree(os.path.join(work_dir, 'data', 'cache'), ignore_errors=True)
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=work_dir, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    seconds = [r['seconds'] for r in runs]
+    result = {
+        'name': name,
+        'params': {'scale': scale},
+        'runs': len(runs),
+        **latency_summary(seconds),
+        # Peak resident set of the whole build process (includes the interpreter)
+        'peak_memory_mb': max(r['max_rss_kb'] for r in runs) / 1024,
+    }
+    result['throughput'] = rows / (result['mean_ms'] / 1000)
+    result['throughput_unit'] = 'player rows/s'
+    return result
+
+def _suggest_bodies(n: int):
+    """(format, content type, body) for the same request in each /suggest wire format"""
+    import msgpack
+
+    players = make_players(np.random.default_rng(n), n)
+    request = {'current_pick': 3, 'current_round': 2, 'user_roster': ROSTER.model_dump()}
+    columnar = dict(request, available_players=player_columns(players))
+    return [
+        ('json', 'application/json', json.dumps(
+            dict(request, available_players=[p.model_dump(mode='json') for p in players])
+        ).encode()),
+        ('columnar_json', 'application/json', json.dumps(columnar).encode()),
+        ('columnar_msgpack', 'application/msgpack', msgpack.packb(columnar)),
+    ]
+
+def bench_decode(quick: bool, repeat: int):
+    from app.models.columnar import PlayerTable, decode_draft_request
+    from app.models.schemas import DraftRequest
+
+    results = []
+    for n in POOL_SIZES[quick]:
+        for wire_format, content_type, body in _suggest_bodies(n):
+            if wire_format == 'json':
+                # What FastAPI does for /suggest: json.loads, then validate a Player per row
+                decode = lambda: DraftRequest.model_validate(json.loads(body))
+            else:
+                decode = lambda: PlayerTable(decode_draft_request(body, content_type).available_players)
+            result = measure(
+                'decode',
+                decode,
+                params={'players': n, 'format': wire_format},
+                repeat=repeat * 5,
+                items=n,
+                unit='players'
+            )
+            result['body_bytes'] = len(body)
+            results.append(result)
+    return results
+
+def bench_api(model_dir: str, quick: bool, repeat: int):
+    # app.api.routes reads its settings at import time
+    os.environ['SCOUTAI_MODEL_DIR'] = model_dir
+    os.environ['SCOUTAI_NEWS_PREFETCH'] = '0'
+    # Every request repeats one draft state; time the model, not the cache
+    os.environ['SCOUTAI_RECOMMENDATION_CACHE_MAX_ENTRIES'] = '0'
+    import httpx
+    from app.main import app
+    from app.api.routes import ml_model, inference_pool
+
+    ml_model.warm_up()
+    results = []
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            for n, (wire_format, content_type, body) in (
+                (n, body) for n in POOL_SIZES[quick] for body in _suggest_bodies(n)
+            ):
+                path = '/api/v1/suggest' if wire_format == 'json' else '/api/v1/suggest-columnar'
+
+                async def post():
+                    response = await client.post(path, content=body, headers={'content-type': content_type})
+                    response.raise_for_status()
+
+                await post()  # warm up
+                seconds = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await post()
+                    seconds.append(time.perf_counter() - start)
+
+                # Throughput with several requests in flight, as from a busy draft room
+                concurrency = 8
+                start = time.perf_counter()
+                await asyncio.gather(*(post() for _ in range(concurrency * max(1, repeat // 4))))
+                concurrent_rate = concurrency * max(1, repeat // 4) / (time.perf_counter() - start)
+
+                tracemalloc.start()
+                await post()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                results.append({
+                    'name': 'api_suggest',
+                    # Per-player JSON keeps the key it had before the columnar formats were added
+                    'params': {'players': n} if wire_format == 'json' else {'players': n, 'format': wire_format},
+                    'runs': repeat,
+                    **latency_summary(seconds),
+                    'peak_memory_mb': peak / 2 ** 20,
+                    'throughput': concurrent_rate,
+                    'throughput_unit': f'requests/s @{concurrency}',
+                })
+
+    try:
+        asyncio.run(run())
+    finally:
+        inference_pool.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the ScoutAI benchmark suite')
+    parser.add_argument('--suite', action='append', choices=SUITES, help='Suite to run (repeatable; default: all)')
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes for a fast check')
+    parser.add_argument('--repeat', type=int, default=30, help='Timed runs for fast benchmarks (slow ones use fewer)')
+    parser.add_argument('--model-dir', default=None, help='Use this trained model instead of training a throwaway one')
+    parser.add_argument('--raw-dir', default=os.path.join(REPO_DIR, 'data', 'raw'))
+    parser.add_argument('--output', default=os.path.join(BACKEND_DIR, 'benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--baseline', default=None, help='Results file to compare against')
+    parser.add_argument('--save-baseline', default=None, help='Also write the results to this path')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown before a regression')
+    args = parser.parse_args()
+    suites = args.suite or SUITES
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = args.model_dir
+        model = None
+        if {'recommendations', 'api'} & set(suites):
+            if model_dir is None:
+                model_dir = os.path.join(tmp_dir, 'artifacts')
+                model = train_benchmark_model(model_dir)
+            else:
+                model = ScoutAIModel(model_dir=model_dir)
+                if not model.is_model_loaded:
+                    sys.exit(f'No trained model found in {model_dir}')
+                model.snapshot.get_model()
+
+        for suite in suites:
+            print(f'Running {suite}...', flush=True)
+            if suite == 'recommendations':
+                results += bench_recommendations(model, args.quick, args.repeat)
+            elif suite == 'training_data':
+                results += bench_training_data(args.quick, args.repeat)
+            elif suite == 'training':
+                results += bench_training(args.quick, args.repeat)
+            elif suite == 'dataset':
+                results += bench_dataset(args.raw_dir, args.quick, args.repeat)
+            elif suite == 'decode':
+                results += bench_decode(args.quick, args.repeat)
+            elif suite == 'api':
+                results += bench_api(model_dir, args.quick, args.repeat)
+
+    print()
+    print_results(results)
+    settings = {'suites': suites, 'quick': args.quick, 'repeat': args.repeat}
+    save_results(args.output, results, settings)
+    print(f'\nResults written to {args.output}')
+    if args.save_baseline:
+        save_results(args.save_baseline, results, settings)
+        print(f'Baseline written to {args.save_baseline}')
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.tolerance)
+        print()
+        print_comparison(rows)
+        regressions = [row for row in rows if row['regressed']]
+        if regressions:
+            sys.exit(f'{len(regressions)} regression(s) beyond {args.tolerance:.0%} of the baseline')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+API worker startup benchmark
+
+Measures, in fresh processes:
+  - how long ``import app.main`` takes, and whether it pulls in the training stack
+  - how long a uvicorn worker takes to answer /health (liveness) and /ready (model loaded)
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --model-dir models/artifacts --runs 10
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the serving path should not import
+HEAVY_MODULES = ['pandas', 'sklearn', 'xgboost']
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def measure_import(env) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for(url: str, deadline: float) -> float:
+    """Poll url until it returns 200; returns the time it did"""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} not ready in time")
+
+def measure_server(env, timeout: float) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f'http://127.0.0.1:{port}/health', deadline)
+        ready = wait_for(f'http://127.0.0.1:{port}/ready', deadline)
+        return {'health_seconds': live - start, 'ready_seconds': ready - start}
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API import and worker startup time')
+    parser.add_argument('--model-dir', default=None, help='SCOUTAI_MODEL_DIR for the measured workers')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.model_dir:
+        env['SCOUTAI_MODEL_DIR'] = os.path.abspath(args.model_dir)
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    servers = [measure_server(env, args.timeout) for _ in range(args.runs)]
+
+    heavy = sorted({m for run in imports for m in run['heavy']})
+    print(f"import app.main:   {np.median([r['seconds'] for r in imports]) * 1000:8.1f} ms (median of {args.runs})")
+    print(f"training stack imported at startup: {', '.join(heavy) if heavy else 'none'}")
+    print(f"worker -> /health: {np.median([r['health_seconds'] for r in servers]) * 1000:8.1f} ms")
+    print(f"worker -> /ready:  {np.median([r['ready_seconds'] for r in servers]) * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Throughput of batched recommendations: one get_batch_recommendations call
+vs. one get_recommendations call per context
+
+Reports contexts per second for each approach and checks that both return
+the same players for every context.
+
+Usage:
+    python benchmarks/suggest_batch_benchmark.py                  # uses the current model in models/artifacts
+    python benchmarks/suggest_batch_benchmark.py --train 20000    # trains a throwaway model first
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import make_players
+from app.models.ml_model import ScoutAIModel, POSITIONS
+from app.models.schemas import DraftContext, Roster
+
+def make_contexts(rng: np.random.Generator, n: int, current_round: int):
+    contexts = []
+    for team in range(n):
+        roster = Roster(**{
+            position: [f'{position} {j}' for j in range(rng.integers(0, 3))] for position in POSITIONS
+        })
+        contexts.append(DraftContext(
+            context_id=f'Team {team + 1}',
+            current_pick=(current_round - 1) * n + team + 1,
+            current_round=current_round,
+            user_roster=roster
+        ))
+    return contexts
+
+def best_seconds(fn, repeat: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched and per-context recommendation throughput')
+    parser.add_argument('--model-dir', default='models/artifacts')
+    parser.add_argument('--train', type=int, default=0, metavar='SAMPLES',
+                        help='Train a temporary model on this many samples instead of loading one')
+    parser.add_argument('--players', type=int, default=200, help='Size of the shared player pool')
+    parser.add_argument('--contexts', default='1,10,12,14,64', help='Comma-separated context counts')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.train:
+            model = ScoutAIModel(model_dir=tmp_dir, legacy_model_path=os.path.join(tmp_dir, 'none.pkl'))
+            model.train_model(model.generate_training_data(num_samples=args.train))
+        else:
+            model = ScoutAIModel(model_dir=args.model_dir)
+        if not model.is_model_loaded:
+            sys.exit('No trained model found; pass --train N to train one')
+        # Load the XGBoost model up front, as the API does at startup
+        model.snapshot.get_model()
+
+        rng = np.random.default_rng(0)
+        players = make_players(rng, args.players)
+        print(f"Player pool: {args.players}")
+        print(f"{'contexts':>8} {'per-call ctx/s':>15} {'batch ctx/s':>12} {'speedup':>8}")
+
+        for n in [int(c) for c in args.contexts.split(',')]:
+            contexts = make_contexts(rng, n, current_round=3)
+
+            def per_call():
+                return [
+                    model.get_recommendations(c.current_pick, c.current_round, c.user_roster, players)
+                    for c in contexts
+                ]
+
+            def batched():
+                return model.get_batch_recommendations(contexts, players)
+
+            expected = [[r.player.name for r in recs] for recs in per_call()]
+            actual = [[r.player.name for r in recs] for recs in batched()]
+            if expected != actual:
+                sys.exit(f"Batched recommendations differ from per-context ones for {n} contexts")
+
+            per_call_seconds = best_seconds(per_call, args.repeat)
+            batch_seconds = best_seconds(batched, args.repeat)
+            print(f"{n:>8} {n / per_call_seconds:>15.0f} {n / batch_seconds:>12.0f} "
+                  f"{per_call_seconds / batch_seconds:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
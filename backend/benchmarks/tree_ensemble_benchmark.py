@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Latency comparison: NumPy-compiled tree ensemble vs. XGBoost predict
+
+Scores the same feature matrices both ways for a range of batch sizes.
+It reports median latency and the largest score difference, and exits
+non-zero if the two paths disagree by more than --tolerance.
+
+Usage:
+    python benchmarks/tree_ensemble_benchmark.py                  # uses the current model in models/artifacts
+    python benchmarks/tree_ensemble_benchmark.py --train 20000    # trains a throwaway model first
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ml_model import ScoutAIModel
+
+def median_ms(fn, repeat: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare compiled ensemble and XGBoost scoring latency')
+    parser.add_argument('--model-dir', default='models/artifacts')
+    parser.add_argument('--train', type=int, default=0, metavar='SAMPLES',
+                        help='Train a temporary model on this many samples instead of loading one')
+    parser.add_argument('--sizes', default='1,10,50,100,150,200,500,2000', help='Comma-separated batch sizes')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--tolerance', type=float, default=1e-5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.train:
+            model = ScoutAIModel(model_dir=tmp_dir, legacy_model_path=os.path.join(tmp_dir, 'none.pkl'))
+            model.train_model(model.generate_training_data(num_samples=args.train))
+        else:
+            model = ScoutAIModel(model_dir=args.model_dir)
+        snapshot = model.snapshot
+        if snapshot is None:
+            sys.exit('No trained model found; pass --train N to train one')
+        if snapshot.compiled is None:
+            sys.exit('Model could not be compiled')
+
+        sizes = [int(s) for s in args.sizes.split(',')]
+        data = model.generate_training_data(num_samples=max(sizes), seed=7)
+        X = data[model.feature_columns].to_numpy(np.float64)
+
+        compiled = snapshot.compiled
+        print(f"Model {snapshot.version}: {compiled.num_trees} trees, depth {compiled.depth}, "
+              f"{compiled.nbytes / 1024:.0f} KiB compiled")
+        print(f"{'rows':>6} {'xgboost ms':>11} {'compiled ms':>12} {'speedup':>8} {'max |diff|':>11}")
+
+        worst = 0.0
+        for n in sizes:
+            batch = X[:n]
+            reference = snapshot.get_model().predict(snapshot.scaler.transform(batch).astype(np.float32))
+            diff = float(np.abs(compiled.predict(batch) - reference).max())
+            worst = max(worst, diff)
+            xgb_ms = median_ms(lambda: snapshot.get_model().predict(snapshot.scaler.transform(batch).astype(np.float32)),
+                               args.repeat)
+            compiled_ms = median_ms(lambda: compiled.predict(batch), args.repeat)
+            print(f"{n:>6} {xgb_ms:>11.3f} {compiled_ms:>12.3f} {xgb_ms / compiled_ms:>7.2f}x {diff:>11.2e}")
+
+    if worst > args.tolerance:
+        sys.exit(f"Compiled scores differ from XGBoost by {worst:.2e} (tolerance {args.tolerance:.0e})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Fit the per-season ADP spreads used for next-pick availability
+
+Reads past draft results, one row per drafted player with season, adp and
+overall_pick columns, and fits each season's spread (fraction * ADP +
+floor) from how far picks landed from ADP. Seasons with too few picks are
+left out and use the default spread. Writes data/processed/adp_spreads.json;
+point SCOUTAI_ADP_SPREAD_PATH at it and pass league_settings.season to use
+a season's spread.
+
+Usage:
+    python backend/build_adp_spreads.py --picks data/raw/draft_picks.csv
+    python backend/build_adp_spreads.py --picks data/raw/draft_picks.csv --output /srv/scoutai/adp_spreads.json
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from app.models.availability import MIN_SPREAD_PICKS, SPREAD_FILE, fit_adp_spreads, save_adp_spreads
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit per-season ADP spreads from past draft results')
+    parser.add_argument('--picks', required=True, help='CSV with season, adp and overall_pick columns')
+    parser.add_argument('--min-picks', type=int, default=MIN_SPREAD_PICKS, help='Fewest picks needed to fit a season')
+    parser.add_argument('--output', default=SPREAD_FILE, help='JSON file to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print('Loading draft results...')
+    picks = pd.read_csv(args.picks, usecols=['season', 'adp', 'overall_pick'])
+    spreads = fit_adp_spreads(picks, min_picks=args.min_picks)
+    save_adp_spreads(args.output, spreads)
+    for season, spread in sorted(spreads.items()):
+        print(f"  {season}: sd = {spread.fraction} * ADP + {spread.floor}")
+    print(f"Wrote {len(spreads)} season(s) to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
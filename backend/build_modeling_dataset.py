@@ -1,75 +1,328 @@
-import pandas as pd
-import numpy as np
+#!/usr/bin/env python3
+"""
+Build the modeling dataset from the weekly player and team stats
+
+A full build (the default) processes every season and writes
+data/processed/modeling_dataset.csv.
+
+A streaming build (--streaming) writes a narrower, downcast CSV with bounded
+memory, to data/processed/modeling_dataset_streaming.csv by default so it
+never replaces the full build's CSV. It processes one season at a time,
+downcasts numeric columns to the smallest dtype, joins only the team columns
+listed in TEAM_OFFENSE_COLUMNS and TEAM_DEFENSE_COLUMNS, and writes each
+chunk of teams as soon as it is joined. Chunks are sized to --max-memory-mb
+and the peak memory is reported.
+
+An incremental build (--incremental) keeps a partitioned store instead: one
+Parquet file per (season, week) under data/processed/modeling_dataset/ and
+a watermark with the last week built. Each run only builds the weeks past
+the watermark. The rolling and expanding windows are per player and season,
+and the teammate and team features only use rows from the same week, so the
+earlier weeks of the same season are all the history a new week needs.
+Partitions that are already built are never rewritten; use --rebuild after
+corrections to old weeks.
+
+Usage:
+    python backend/build_modeling_dataset.py                        # full build to CSV
+    python backend/build_modeling_dataset.py --streaming --max-memory-mb 512
+    python backend/build_modeling_dataset.py --incremental          # add new weeks to the store
+    python backend/build_modeling_dataset.py --incremental --rebuild
+"""
+
+import argparse
+import glob
+import json
 import os
+import resource
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from raw_data import load_table, table_columns
 
-# File paths
-player_file = 'data/raw/weekly_player_stats_offense.csv'
-team_off_file = 'data/raw/weekly_team_stats_offense.csv'
-team_def_file = 'data/raw/weekly_team_stats_defense.csv'
-
-# Output path
-os.makedirs('data/processed', exist_ok=True)
-output_file = 'data/processed/modeling_dataset.csv'
-
-# Load data
-print('Loading data...')
-df_player = pd.read_csv(player_file)
-df_team_off = pd.read_csv(team_off_file)
-df_team_def = pd.read_csv(team_def_file)
-
-# Basic cleaning: ensure consistent column names
-for df in [df_player, df_team_off, df_team_def]:
-    df.columns = [c.lower() for c in df.columns]
-
-# 1. Rolling averages and season-to-date stats for each player
-print('Engineering player rolling averages...')
-rolling_cols = ['passing_yards', 'rushing_yards', 'receiving_yards', 'receptions', 'targets', 'rush_attempts', 'pass_touchdown', 'rush_touchdown', 'receiving_touchdown']
-for col in rolling_cols:
-    if col in df_player.columns:
-        df_player[f'{col}_last3'] = (
-            df_player.groupby(['player_id', 'season'])[col]
-            .transform(lambda x: x.rolling(3, min_periods=1).mean())
+OUTPUT_FILE = 'data/processed/modeling_dataset.csv'
+# Streaming builds have fewer team columns and downcast values, so they get their own file
+STREAMING_OUTPUT_FILE = 'data/processed/modeling_dataset_streaming.csv'
+STORE_DIR = 'data/processed/modeling_dataset'
+WATERMARK_FILE = '_watermark.json'
+
+# Team stats joined by --streaming builds (a full build joins every column)
+TEAM_KEYS = ['team', 'season', 'week']
+TEAM_OFFENSE_COLUMNS = [
+    'pass_attempts', 'rush_attempts', 'targets', 'air_yards', 'total_off_yards', 'total_off_points',
+    'offense_snaps', 'pass_snaps', 'rush_snaps', 'pass_pct', 'rush_pct', 'win_pct'
+]
+TEAM_DEFENSE_COLUMNS = [
+    'sack', 'qb_hit', 'interception', 'fumble_forced', 'def_touchdown', 'solo_tackle',
+    'total_def_points', 'defense_snaps', 'win_pct'
+]
+
+ROLLING_COLS = [
+    'passing_yards', 'rushing_yards', 'receiving_yards', 'receptions', 'targets', 'rush_attempts',
+    'pass_touchdown', 'rush_touchdown', 'receiving_touchdown'
+]
+
+def teammate_stats(df, stat, pos):
+    """Sum of `stat` over the other `pos` players on the same team in the same week"""
+    if stat not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    # Only rows at `pos` contribute; everyone else adds zero to the group sums
+    contrib = df[stat].where(df['position'] == pos, 0).fillna(0)
+    keys = [df['team'], df['season'], df['week']]
+    group_total = contrib.groupby(keys, observed=True).transform('sum')
+    own_total = contrib.groupby(keys + [df['player_id']], observed=True).transform('sum')
+    # Rows with a missing key match no group (the total is 0). A missing
+    # player_id never matches itself, so nothing is subtracted
+    result = group_total.fillna(0) - own_total.fillna(0)
+    # Integer stats stay integer, as the old row-wise sums did
+    return result.astype(df[stat].dtype) if pd.api.types.is_integer_dtype(df[stat]) else result
+
+def add_player_features(df_player: pd.DataFrame) -> pd.DataFrame:
+    """Rolling averages, depth chart roles and teammate features (in place)"""
+    # 1. Rolling averages and season-to-date stats for each player
+    print('Engineering player rolling averages...')
+    for col in ROLLING_COLS:
+        if col in df_player.columns:
+            df_player[f'{col}_last3'] = (
+                df_player.groupby(['player_id', 'season'])[col]
+                .transform(lambda x: x.rolling(3, min_periods=1).mean())
+            )
+            df_player[f'{col}_season_avg'] = (
+                df_player.groupby(['player_id', 'season'])[col]
+                .transform(lambda x: x.expanding().mean())
+            )
+
+    # 2. Infer depth chart role (e.g., WR1/2/3, RB1/2) by team/season/week
+    print('Inferring depth chart roles...')
+    if 'position' in df_player.columns and 'targets' in df_player.columns:
+        is_wr = df_player['position'] == 'WR'
+        df_player.loc[is_wr, 'wr_rank'] = (
+            df_player[is_wr]
+            .groupby(['team', 'season', 'week'], observed=True)['targets']
+            .rank(method='first', ascending=False)
         )
-        df_player[f'{col}_season_avg'] = (
-            df_player.groupby(['player_id', 'season'])[col]
-            .transform(lambda x: x.expanding().mean())
+        df_player['wr_role'] = df_player['wr_rank'].apply(lambda x: f'WR{int(x)}' if pd.notnull(x) and x <= 3 else None)
+
+    # 3. Teammate quality features (sum/avg of other WRs' targets/yards, QB's stats)
+    print('Engineering teammate quality features...')
+    for stat in ['targets', 'receiving_yards', 'receptions']:
+        df_player[f'other_wr_{stat}'] = teammate_stats(df_player, stat, 'WR')
+    for stat in ['passing_yards', 'pass_touchdown']:
+        df_player[f'team_qb_{stat}'] = teammate_stats(df_player, stat, 'QB')
+    return df_player
+
+def join_team_stats(df_player: pd.DataFrame, df_team_off: pd.DataFrame, df_team_def: pd.DataFrame) -> pd.DataFrame:
+    """Join team offense stats, and opponent defense stats when the player data has an opponent"""
+    # 4. Join team offense stats (team, season, week)
+    df_player = df_player.merge(df_team_off, on=['team', 'season', 'week'], suffixes=('', '_teamoff'), how='left')
+
+    # 5. Join opponent defense stats (opponent, season, week)
+    # Assume 'opponent' column exists in player data; if not, skip this step
+    if 'opponent' in df_player.columns:
+        df_player = df_player.merge(df_team_def, left_on=['opponent', 'season', 'week'], right_on=['team', 'season', 'week'], suffixes=('', '_oppdef'), how='left')
+    return df_player
+
+def build_dataset(df_player: pd.DataFrame, df_team_off: pd.DataFrame, df_team_def: pd.DataFrame) -> pd.DataFrame:
+    """Modeling rows for every player week in df_player"""
+    # Basic cleaning: ensure consistent column names
+    for df in [df_player, df_team_off, df_team_def]:
+        df.columns = [c.lower() for c in df.columns]
+    df_player = add_player_features(df_player)
+    print('Joining team offense stats...')
+    return join_team_stats(df_player, df_team_off, df_team_def)
+
+def build_full(output_file: str = OUTPUT_FILE):
+    """Rebuild the whole dataset as one CSV"""
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+    # Load data (from the typed columnar cache; built from data/raw on first use)
+    print('Loading data...')
+    df = build_dataset(load_table('player_offense'), load_table('team_offense'), load_table('team_defense'))
+
+    # 6. Save processed dataset
+    print(f'Saving processed dataset to {output_file}...')
+    df.to_csv(output_file, index=False)
+    print('Done!')
+
+# Streaming build
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink numeric columns to the smallest dtype that holds them and text to categories (in place)"""
+    for column in df.columns:
+        dtype = df[column].dtype
+        if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            df[column] = df[column].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+        elif dtype == object:
+            df[column] = df[column].astype('category')
+    return df
+
+def _team_chunks(df: pd.DataFrame, max_rows: int):
+    """Row positions of df split into groups of whole teams with about max_rows rows each"""
+    codes, _ = pd.factorize(df['team'])
+    order = np.argsort(codes, kind='stable')
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    chunk, rows = [], 0
+    for team_rows in np.split(order, bounds):
+        if chunk and rows + len(team_rows) > max_rows:
+            yield np.concatenate(chunk)
+            chunk, rows = [], 0
+        chunk.append(team_rows)
+        rows += len(team_rows)
+    if chunk:
+        yield np.concatenate(chunk)
+
+def _available_columns(table: str, wanted: List[str]) -> List[str]:
+    columns = set(table_columns(table))
+    return [c for c in TEAM_KEYS + wanted if c in columns]
+
+def build_streaming(output_file: str = STREAMING_OUTPUT_FILE, max_memory_mb: float = 1024):
+    """Build the dataset season by season and append it to the CSV in chunks of teams
+
+    ``max_memory_mb`` bounds the DataFrames held at once: a season of player
+    rows with its features, that season's team stats and one joined chunk.
+    The interpreter and libraries come on top of it in the reported peak.
+    """
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    budget = max_memory_mb * 2 ** 20
+    offense_columns = _available_columns('team_offense', TEAM_OFFENSE_COLUMNS)
+    defense_columns = _available_columns('team_defense', TEAM_DEFENSE_COLUMNS)
+    # Name the defense columns as a full build does, where they clash with every team offense column
+    clashing = set(table_columns('team_offense')) | set(table_columns('player_offense'))
+    defense_names = {c: f'{c}_oppdef' for c in TEAM_DEFENSE_COLUMNS if c in clashing}
+    seasons = sorted(int(s) for s in load_table('player_offense', columns=['season'])['season'].unique())
+
+    tmp_path = output_file + '.tmp'
+    header = None
+    rows_written = 0
+    with open(tmp_path, 'w', newline='') as out:
+        for season in seasons:
+            season_filter = [('season', '==', season)]
+            df_player = load_table('player_offense', filters=season_filter)
+            df_player.columns = [c.lower() for c in df_player.columns]
+            # Windows are per player and season, so they are computed on the whole season
+            df_player = downcast(add_player_features(df_player))
+            df_team_off = downcast(load_table('team_offense', columns=offense_columns, filters=season_filter))
+            df_team_def = downcast(load_table('team_defense', columns=defense_columns, filters=season_filter))
+            df_team_def = df_team_def.rename(columns=defense_names)
+
+            held = sum(int(df.memory_usage(deep=True).sum()) for df in (df_player, df_team_off, df_team_def))
+            # The merge holds its input and output, and the output adds the team columns
+            row_bytes = 2 * (held / max(len(df_player), 1) + 4 * (len(offense_columns) + len(defense_columns)))
+            max_rows = int((budget - held) // row_bytes)
+            if max_rows < 1:
+                print(f'Warning: season {season} needs ~{held / 2 ** 20:.0f} MB, above --max-memory-mb; joining one team at a time')
+
+            for rows in _team_chunks(df_player, max_rows):
+                joined = join_team_stats(df_player.iloc[rows], df_team_off, df_team_def)
+                if header is None:
+                    header = list(joined.columns)
+                joined[header].to_csv(out, index=False, header=rows_written == 0)
+                rows_written += len(joined)
+            print(f'Season {season}: {len(df_player)} rows, {held / 2 ** 20:.0f} MB held, peak RSS {peak_rss_mb():.0f} MB')
+            del df_player, df_team_off, df_team_def
+    os.replace(tmp_path, output_file)
+    print(f'Wrote {rows_written} rows to {output_file}; peak memory {peak_rss_mb():.0f} MB (budget {max_memory_mb:.0f} MB for data)')
+
+# Partitioned store
+
+def partition_path(store_dir: str, season: int, week: int) -> str:
+    return os.path.join(store_dir, f'season={season}', f'week={week:02d}.parquet')
+
+def read_watermark(store_dir: str) -> Optional[Tuple[int, int]]:
+    """Last (season, week) in the store, or None if nothing has been built"""
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        watermark = json.load(f)
+    return watermark['season'], watermark['week']
+
+def write_watermark(store_dir: str, season: int, week: int):
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'season': season, 'week': week, 'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')}, f)
+    os.replace(tmp_path, path)
+
+def load_store(store_dir: str = STORE_DIR, seasons: Optional[List[int]] = None) -> pd.DataFrame:
+    """Read the partitioned dataset back as one DataFrame, in (season, week) order"""
+    paths = sorted(glob.glob(os.path.join(store_dir, 'season=*', 'week=*.parquet')))
+    if seasons is not None:
+        wanted = {f'season={s}' for s in seasons}
+        paths = [p for p in paths if os.path.basename(os.path.dirname(p)) in wanted]
+    if not paths:
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+
+def _clear_store(store_dir: str):
+    for path in glob.glob(os.path.join(store_dir, 'season=*', 'week=*.parquet')):
+        os.remove(path)
+    watermark = os.path.join(store_dir, WATERMARK_FILE)
+    if os.path.exists(watermark):
+        os.remove(watermark)
+
+def build_incremental(store_dir: str = STORE_DIR, rebuild: bool = False):
+    """Build the weeks after the watermark and add them to the partitioned store"""
+    os.makedirs(store_dir, exist_ok=True)
+    if rebuild:
+        _clear_store(store_dir)
+    watermark = read_watermark(store_dir)
+
+    # Which weeks exist, from the two key columns only
+    weeks = load_table('player_offense', columns=['season', 'week'])[['season', 'week']].drop_duplicates()
+    weeks = sorted((int(s), int(w)) for s, w in weeks.itertuples(index=False))
+    new_weeks = [sw for sw in weeks if watermark is None or sw > watermark]
+    if not new_weeks:
+        print(f'Up to date (watermark season {watermark[0]} week {watermark[1]})' if watermark else 'No player data')
+        return
+    print(f'Building {len(new_weeks)} new week(s) after watermark {watermark}')
+
+    for season in sorted({s for s, _ in new_weeks}):
+        start = time.perf_counter()
+        # The whole season is loaded: earlier weeks are the history for the windows
+        season_filter = [('season', '==', season)]
+        df = build_dataset(
+            load_table('player_offense', filters=season_filter),
+            load_table('team_offense', filters=season_filter),
+            load_table('team_defense', filters=season_filter)
         )
+        season_weeks = [w for s, w in new_weeks if s == season]
+        for week in season_weeks:
+            path = partition_path(store_dir, season, week)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            df[df['week'] == week].to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+            os.replace(tmp_path, path)
+        # Advance the watermark only once the season's partitions are on disk
+        write_watermark(store_dir, season, season_weeks[-1])
+        print(f'Season {season}: wrote weeks {season_weeks[0]}-{season_weeks[-1]} in {time.perf_counter() - start:.1f}s')
+    print('Done!')
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the modeling dataset')
+    parser.add_argument('--streaming', action='store_true', help='Build season by season with bounded memory')
+    parser.add_argument('--max-memory-mb', type=float, default=1024, help='Memory for data frames in --streaming builds')
+    parser.add_argument('--incremental', action='store_true', help='Add weeks past the watermark to the partitioned store')
+    parser.add_argument('--rebuild', action='store_true', help='With --incremental, clear the store and rebuild every week')
+    parser.add_argument('--output', help=f'CSV written by a full build (default {OUTPUT_FILE}) '
+                                         f'or a --streaming build (default {STREAMING_OUTPUT_FILE})')
+    parser.add_argument('--store-dir', default=STORE_DIR, help='Partitioned store used by --incremental')
+    args = parser.parse_args()
+
+    if args.incremental:
+        build_incremental(args.store_dir, rebuild=args.rebuild)
+    elif args.streaming:
+        build_streaming(args.output or STREAMING_OUTPUT_FILE, max_memory_mb=args.max_memory_mb)
+    else:
+        build_full(args.output or OUTPUT_FILE)
 
-# 2. Infer depth chart role (e.g., WR1/2/3, RB1/2) by team/season/week
-print('Inferring depth chart roles...')
-if 'position' in df_player.columns and 'targets' in df_player.columns:
-    is_wr = df_player['position'] == 'WR'
-    df_player.loc[is_wr, 'wr_rank'] = (
-        df_player[is_wr]
-        .groupby(['team', 'season', 'week'])['targets']
-        .rank(method='first', ascending=False)
-    )
-    df_player['wr_role'] = df_player['wr_rank'].apply(lambda x: f'WR{int(x)}' if pd.notnull(x) and x <= 3 else None)
-
-# 3. Teammate quality features (sum/avg of other WRs' targets/yards, QB's stats)
-print('Engineering teammate quality features...')
-def teammate_stats(row, stat, pos):
-    team = row['team']
-    season = row['season']
-    week = row['week']
-    player = row['player_id']
-    mask = (df_player['team']==team) & (df_player['season']==season) & (df_player['week']==week) & (df_player['position']==pos) & (df_player['player_id']!=player)
-    return df_player.loc[mask, stat].sum() if stat in df_player.columns else np.nan
-for stat in ['targets', 'receiving_yards', 'receptions']:
-    df_player[f'other_wr_{stat}'] = df_player.apply(lambda row: teammate_stats(row, stat, 'WR'), axis=1)
-for stat in ['passing_yards', 'pass_touchdown']:
-    df_player[f'team_qb_{stat}'] = df_player.apply(lambda row: teammate_stats(row, stat, 'QB'), axis=1)
-
-# 4. Join team offense stats (team, season, week)
-print('Joining team offense stats...')
-df_player = df_player.merge(df_team_off, on=['team', 'season', 'week'], suffixes=('', '_teamoff'), how='left')
-
-# 5. Join opponent defense stats (opponent, season, week)
-# Assume 'opponent' column exists in player data; if not, skip this step
-if 'opponent' in df_player.columns:
-    df_player = df_player.merge(df_team_def, left_on=['opponent', 'season', 'week'], right_on=['team', 'season', 'week'], suffixes=('', '_oppdef'), how='left')
-
-# 6. Save processed dataset
-print(f'Saving processed dataset to {output_file}...')
-df_player.to_csv(output_file, index=False)
-print('Done!') 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Build the strength-of-schedule and bye-week tables
+
+Every past season's schedule comes from the weekly team defense stats;
+an upcoming season can be added with --schedule, a CSV with a game_id
+column ("2025_01_DAL_PHI", away team first) or season, week, away_team
+and home_team columns. Writes data/processed/schedule/. Point
+SCOUTAI_SCHEDULE_DIR at the directory to serve the features; models must
+then be retrained, because the feature set grows.
+
+Usage:
+    python backend/build_schedule_tables.py
+    python backend/build_schedule_tables.py --schedule data/raw/schedule_2025.csv
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from app.models.schedule import STORE_DIR, build_schedule_tables, save_schedule_tables
+from raw_data import load_table
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the strength-of-schedule and bye-week tables')
+    parser.add_argument('--schedule', help='CSV with an upcoming season schedule')
+    parser.add_argument('--output', default=STORE_DIR, help='Store directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print('Loading team defense stats...')
+    defense = load_table('team_defense', columns=['game_id', 'season', 'week', 'team', 'season_type', 'total_off_points'])
+    schedule = pd.read_csv(args.schedule) if args.schedule else None
+    print('Building matchup, strength-of-schedule and bye tables...')
+    arrays, index = build_schedule_tables(defense, schedule)
+    save_schedule_tables(args.output, arrays, index)
+    print(f"Wrote {len(index['seasons'])} seasons ({index['seasons'][0]}-{index['seasons'][-1]}) x "
+          f"{len(index['teams'])} teams to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
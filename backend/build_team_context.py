@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Build the team-context feature store from the weekly team stats
+
+Writes data/processed/team_context/team_context.npy (season-to-date team
+offense and defense averages per season, week and team) and its JSON
+index. Point SCOUTAI_TEAM_CONTEXT_DIR at the directory to serve the
+features; models must then be retrained, because the feature set grows.
+
+Usage:
+    python backend/build_team_context.py
+    python backend/build_team_context.py --output /srv/scoutai/team_context
+"""
+
+import argparse
+import time
+
+from app.models.team_context import (
+    STORE_DIR, TEAM_DEFENSE_STATS, TEAM_KEYS, TEAM_OFFENSE_STATS, build_team_context, save_team_context
+)
+from raw_data import load_table
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the team-context feature store')
+    parser.add_argument('--output', default=STORE_DIR, help='Store directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print('Loading team stats...')
+    offense = load_table('team_offense', columns=TEAM_KEYS + ['season_type'] + TEAM_OFFENSE_STATS)
+    defense = load_table('team_defense', columns=TEAM_KEYS + ['season_type'] + TEAM_DEFENSE_STATS)
+    print('Building season-to-date team context...')
+    values, index = build_team_context(offense, defense)
+    save_team_context(args.output, values, index)
+    first, last = index['slots'][0], index['slots'][-1]
+    print(f"Wrote {values.shape[0]} weeks x {len(index['teams'])} teams x {values.shape[2]} features "
+          f"({values.nbytes / 2 ** 20:.1f} MB, {first[0]} week {first[1]} to {last[0]} week {last[1]}) "
+          f"to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,10 @@
-import pandas as pd
+from raw_data import table_columns, head_table
 
-# Path to your data file
-file_path = 'data/raw/weekly_player_stats_offense.csv'
+# Cached table built from data/raw/weekly_player_stats_offense.csv
+table = 'player_offense'
 
-# Load the data
-df = pd.read_csv(file_path)
-
-# Show all column names
-print('Columns:', df.columns.tolist())
+# Show all column names (read from the cache schema only)
+print('Columns:', table_columns(table))
 
 # Show the first 5 rows
-print(df.head()) 
\ No newline at end of file
+print(head_table(table))
@@ -1,9 +1,7 @@
-import pandas as pd
+from raw_data import table_columns, head_table
 
-# Path to your data file
-file_path = 'data/raw/weekly_team_stats_defense.csv'
+# Cached table built from data/raw/weekly_team_stats_defense.csv
+table = 'team_defense'
 
-df = pd.read_csv(file_path)
-
-print('Columns:', df.columns.tolist())
-print(df.head()) 
\ No newline at end of file
+print('Columns:', table_columns(table))
+print(head_table(table))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Typed, columnar cache for the raw weekly stat CSVs in data/raw
+
+Each raw CSV is parsed once against an explicit schema and written to
+data/cache/<table>.parquet. Loaders read the Parquet file, and only the
+columns they ask for. The cache is rebuilt when the source file's mtime or
+size changes and its SHA-256 hash no longer matches.
+
+Usage:
+    python backend/raw_data.py            # build any missing or stale caches
+    python backend/raw_data.py --force    # rebuild every cache
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+RAW_DIR = 'data/raw'
+CACHE_DIR = 'data/cache'
+
+# Bump when parsing rules change so existing caches get rebuilt
+SCHEMA_VERSION = 1
+
+@dataclass(frozen=True)
+class TableSchema:
+    """Explicit parse schema for one raw CSV"""
+    source: str
+    # Columns with a fixed dtype; every other column must be numeric and is stored as default_dtype
+    columns: Dict[str, str]
+    default_dtype: str = 'float32'
+    # Text columns whose values carry a leading apostrophe from the export (e.g. "'1-0-0")
+    quoted: Tuple[str, ...] = ()
+    # Allow undeclared text columns (stored as category) instead of failing the build
+    allow_extra_text: bool = False
+
+_TEAM_KEYS = {
+    'game_id': 'string',
+    'season': 'int16',
+    'week': 'int8',
+    'team': 'category',
+    'season_type': 'category',
+    'record': 'string',
+}
+
+SCHEMAS: Dict[str, TableSchema] = {
+    'team_offense': TableSchema(
+        source='weekly_team_stats_offense.csv',
+        columns=_TEAM_KEYS,
+        quoted=('record',),
+    ),
+    'team_defense': TableSchema(
+        source='weekly_team_stats_defense.csv',
+        columns=_TEAM_KEYS,
+        quoted=('record',),
+    ),
+    'player_offense': TableSchema(
+        source='weekly_player_stats_offense.csv',
+        columns={
+            'game_id': 'string',
+            'player_id': 'string',
+            'player_name': 'string',
+            'position': 'category',
+            'team': 'category',
+            'opponent': 'category',
+            'season': 'int16',
+            'week': 'int8',
+            'season_type': 'category',
+        },
+        allow_extra_text=True,
+    ),
+}
+
+def _paths(table: str, raw_dir: str, cache_dir: str) -> Tuple[str, str, str]:
+    """Source CSV, cached Parquet and metadata paths for a table"""
+    schema = SCHEMAS[table]
+    source = os.path.join(raw_dir, schema.source)
+    return source, os.path.join(cache_dir, f'{table}.parquet'), os.path.join(cache_dir, f'{table}.meta.json')
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _source_fingerprint(source: str, with_hash: bool) -> Dict:
+    stat = os.stat(source)
+    fingerprint = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'schema_version': SCHEMA_VERSION}
+    if with_hash:
+        fingerprint['sha256'] = _file_sha256(source)
+    return fingerprint
+
+def _parse_csv(source: str, schema: TableSchema) -> pd.DataFrame:
+    """Parse a raw CSV with explicit dtypes"""
+    header = [c.lower() for c in pd.read_csv(source, nrows=0).columns]
+    declared = {c: t for c, t in schema.columns.items() if c in header}
+    # Read everything else as text first so a bad value fails loudly instead of being inferred
+    text_dtypes = {c: ('string' if t in ('string', 'category') else t) for c, t in declared.items()}
+    df = pd.read_csv(source, header=0, names=header, dtype={c: text_dtypes.get(c, 'string') for c in header})
+
+    for column in header:
+        if column in declared:
+            if column in schema.quoted:
+                df[column] = df[column].str.lstrip("'")
+            if declared[column] == 'category':
+                df[column] = df[column].astype('category')
+            continue
+        try:
+            df[column] = pd.to_numeric(df[column], errors='raise').astype(schema.default_dtype)
+        except (ValueError, TypeError):
+            if not schema.allow_extra_text:
+                raise ValueError(f"{source}: column '{column}' is not numeric and not declared in the schema")
+            logger.warning(f"{source}: storing undeclared text column '{column}' as category")
+            df[column] = df[column].astype('category')
+    return df
+
+def build_cache(table: str, raw_dir: str = RAW_DIR, cache_dir: str = CACHE_DIR) -> str:
+    """Convert one raw CSV into its Parquet cache and return the cache path"""
+    source, cache_path, meta_path = _paths(table, raw_dir, cache_dir)
+    logger.info(f"Building cache for {table} from {source}")
+    df = _parse_csv(source, SCHEMAS[table])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp_path, cache_path)
+    with open(meta_path, 'w') as f:
+        json.dump(_source_fingerprint(source, with_hash=True), f)
+    return cache_path
+
+def ensure_cache(table: str, raw_dir: str = RAW_DIR, cache_dir: str = CACHE_DIR, force: bool = False) -> str:
+    """Return the cache path for a table, rebuilding it if the source changed"""
+    source, cache_path, meta_path = _paths(table, raw_dir, cache_dir)
+    if force or not (os.path.exists(cache_path) and os.path.exists(meta_path)):
+        return build_cache(table, raw_dir, cache_dir)
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    current = _source_fingerprint(source, with_hash=False)
+    if all(meta.get(k) == v for k, v in current.items()):
+        return cache_path
+
+    # mtime/size changed: only rebuild if the content actually changed
+    current['sha256'] = _file_sha256(source)
+    if meta.get('sha256') == current['sha256'] and meta.get('schema_version') == SCHEMA_VERSION:
+        with open(meta_path, 'w') as f:
+            json.dump(current, f)
+        return cache_path
+    return build_cache(table, raw_dir, cache_dir)
+
+def load_table(
+    table: str,
+    columns: Optional[List[str]] = None,
+    raw_dir: str = RAW_DIR,
+    cache_dir: str = CACHE_DIR,
+    filters: Optional[List[Tuple]] = None
+) -> pd.DataFrame:
+    """Load a raw table from its columnar cache, reading only the requested columns
+
+    ``filters`` are pyarrow row filters such as ``[('season', '==', 2024)]``.
+    """
+    return pd.read_parquet(ensure_cache(table, raw_dir, cache_dir), columns=columns, filters=filters)
+
+def table_columns(table: str, raw_dir: str = RAW_DIR, cache_dir: str = CACHE_DIR) -> List[str]:
+    """Column names of a cached table, read from the Parquet schema only"""
+    return pq.read_schema(ensure_cache(table, raw_dir, cache_dir)).names
+
+def head_table(table: str, n: int = 5, raw_dir: str = RAW_DIR, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """First n rows of a cached table without reading the whole file"""
+    parquet_file = pq.ParquetFile(ensure_cache(table, raw_dir, cache_dir))
+    for batch in parquet_file.iter_batches(batch_size=n):
+        return batch.to_pandas()
+    return parquet_file.schema_arrow.empty_table().to_pandas()
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the columnar cache for data/raw')
+    parser.add_argument('--force', action='store_true', help='Rebuild caches even if sources are unchanged')
+    parser.add_argument('--raw-dir', default=RAW_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('tables', nargs='*', default=list(SCHEMAS), help='Tables to build (default: all)')
+    args = parser.parse_args()
+
+    for table in args.tables:
+        source = _paths(table, args.raw_dir, args.cache_dir)[0]
+        if not os.path.exists(source):
+            print(f'Skipping {table}: {source} not found')
+            continue
+        path = ensure_cache(table, args.raw_dir, args.cache_dir, force=args.force)
+        print(f'{table}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)')
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the app and the build scripts the same way the server and CLI do, from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
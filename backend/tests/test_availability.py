@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.availability import (
+    DEFAULT_ADP_SPREAD, adp_spread, availability_at_next_pick, fit_adp_spreads, save_adp_spreads
+)
+
+def _sf(z):
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def _expected(adp, sd, pick, round_, num_teams):
+    """The snake formula, one player at a time"""
+    overall = (round_ - 1) * num_teams + pick
+    next_overall = overall + 2 * (num_teams - pick) + 1
+    return np.array([_sf((next_overall - 0.5 - a) / s) / _sf((overall - 0.5 - a) / s) for a, s in zip(adp, sd)])
+
+@pytest.mark.parametrize('pick, round_, num_teams', [(1, 1, 12), (5, 3, 12), (12, 2, 12), (4, 7, 10)])
+def test_next_pick_follows_the_snake(pick, round_, num_teams):
+    adp = np.array([5.0, 20.0, 40.0, 80.0])
+    sd = np.array([3.0, 6.0, 10.0, 15.0])
+    result = availability_at_next_pick(adp, sd, pick, round_, num_teams)
+    np.testing.assert_allclose(result, _expected(adp, sd, pick, round_, num_teams), rtol=1e-5, atol=1e-12)
+
+def test_context_rows_and_invalid_inputs():
+    adp = np.array([10.0, np.nan, 1.0])
+    sd = np.array([4.0, 4.0, 0.1])
+    result = availability_at_next_pick(adp, sd, np.array([[3], [13]]), np.array([[2], [2]]), 12)
+    assert result.shape == (2, 3)
+    # Players without an ADP, and picks beyond num_teams, are NaN
+    assert np.isnan(result[0, 1]) and np.isnan(result[1]).all()
+    # A player long gone is 0 rather than NaN or an overflow
+    assert result[0, 2] == 0.0
+    assert 0.0 <= result[0, 0] <= 1.0
+
+def test_fitted_spreads_recover_the_generating_parameters(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = []
+    for season, (fraction, floor) in {2022: (0.12, 3.0), 2023: (0.2, 1.0)}.items():
+        adp = rng.uniform(1, 200, size=5000)
+        pick = adp + rng.standard_normal(5000) * (fraction * adp + floor)
+        frames.append(pd.DataFrame({'season': season, 'adp': adp, 'overall_pick': pick}))
+    # Too few picks to fit: keeps the default
+    frames.append(pd.DataFrame({'season': [2024, 2024], 'adp': [1.0, 2.0], 'overall_pick': [2, 1]}))
+    spreads = fit_adp_spreads(pd.concat(frames))
+
+    assert sorted(spreads) == [2022, 2023]
+    assert spreads[2022].fraction == pytest.approx(0.12, abs=0.015)
+    assert spreads[2022].floor == pytest.approx(3.0, abs=0.6)
+    assert spreads[2023].fraction == pytest.approx(0.2, abs=0.015)
+
+    path = str(tmp_path / 'adp_spreads.json')
+    save_adp_spreads(path, spreads)
+    assert adp_spread(2022, path) == spreads[2022]
+    assert adp_spread(2024, path) == DEFAULT_ADP_SPREAD
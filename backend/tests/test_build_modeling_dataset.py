@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_modeling_dataset import teammate_stats
+
+def _row_wise(df, stat, pos):
+    """The original per-row implementation"""
+    def stats(row):
+        mask = (
+            (df['team'] == row['team']) & (df['season'] == row['season']) & (df['week'] == row['week'])
+            & (df['position'] == pos) & (df['player_id'] != row['player_id'])
+        )
+        return df.loc[mask, stat].sum()
+    return df.apply(stats, axis=1)
+
+@pytest.fixture
+def players():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        'player_id': rng.choice([f'p{i}' for i in range(40)], size=n),
+        'team': rng.choice(['BUF', 'KC', 'DET', None], size=n, p=[0.3, 0.3, 0.3, 0.1]),
+        'season': rng.choice([2023, 2024], size=n),
+        'week': rng.integers(1, 4, size=n),
+        'position': rng.choice(['QB', 'WR', 'RB'], size=n),
+        'targets': rng.integers(0, 12, size=n),
+        'receiving_yards': rng.normal(50, 30, size=n),
+    })
+    df.loc[rng.random(n) < 0.1, 'receiving_yards'] = np.nan
+    df.loc[rng.random(n) < 0.05, 'player_id'] = None
+    return df
+
+@pytest.mark.parametrize('stat, pos', [('targets', 'WR'), ('receiving_yards', 'WR'), ('receiving_yards', 'QB')])
+def test_grouped_sums_match_row_wise_apply(players, stat, pos):
+    result = teammate_stats(players, stat, pos)
+    expected = _row_wise(players, stat, pos)
+    np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-12, atol=1e-9)
+    if stat == 'targets':
+        assert pd.api.types.is_integer_dtype(result)
+
+def test_missing_stat_is_nan(players):
+    assert teammate_stats(players, 'passing_yards', 'QB').isna().all()
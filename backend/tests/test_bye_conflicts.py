@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.models.ml_model import ScoutAIModel
+from app.models.schedule import MAX_WEEK, save_schedule_tables
+from app.models.schemas import Player, Recommendation, Roster
+
+@pytest.fixture
+def model(tmp_path):
+    # One stored season: BUF has its bye in week 7, KC's bye is unknown
+    teams, seasons = ['BUF', 'KC'], [2024]
+    arrays = {
+        'matchup': np.zeros((1, len(teams) + 1, MAX_WEEK + 1, 2), dtype=np.float32),
+        'sos': np.full((1, len(teams) + 1, 2, 2), 0.5, dtype=np.float32),
+        'bye_week': np.array([[7, 0, 0]], dtype=np.int8),
+    }
+    index = {'version': 1, 'teams': teams, 'seasons': seasons, 'rating_seasons': [2023], 'playoff_weeks': []}
+    save_schedule_tables(str(tmp_path / 'schedule'), arrays, index)
+    return ScoutAIModel(
+        model_dir=str(tmp_path / 'models'),
+        legacy_model_path=str(tmp_path / 'none.pkl'),
+        schedule_dir=str(tmp_path / 'schedule')
+    )
+
+PLAYERS = [
+    Player(name='given', position='WR', team='KC', bye_week=8),
+    Player(name='from_schedule', position='WR', team='BUF'),
+    Player(name='unknown', position='WR', team='FA'),
+    Player(name='other_position', position='RB', team='BUF'),
+]
+ROSTER = Roster(WR=['w7', 'w8'], RB=['r9'], bye_weeks={'w7': 7, 'w8': 8, 'r9': 9})
+
+def _conflicts(model, league_settings):
+    features = model._prepare_features_batch(PLAYERS, ROSTER, 3, 4, league_settings)
+    return features[:, model._bye_conflicts_column], features[:, 8]
+
+def test_conflicts_use_the_resolved_bye_week(model):
+    conflicts, bye_week = _conflicts(model, {'season': 2024})
+    np.testing.assert_array_equal(conflicts, [1, 1, 0, 0])
+    # The unknown bye keeps the week-8 default as a feature, without conflicting with w8
+    np.testing.assert_array_equal(bye_week, [8, 7, 8, 7])
+
+def test_unstored_season_leaves_byes_unknown(model):
+    conflicts, bye_week = _conflicts(model, {'season': 2025})
+    np.testing.assert_array_equal(conflicts, [1, 0, 0, 0])
+    features = model._prepare_player_features(PLAYERS, {'season': 2025})
+    assert not features[:, model._schedule_column:model._schedule_column + 2].any()
+
+def test_batch_contexts_agree_with_single_context(model):
+    league_settings = {'season': 2024}
+    single, _ = _conflicts(model, league_settings)
+    features, bye_weeks = model._player_features_and_byes(PLAYERS, league_settings)
+    batch = np.repeat(features[np.newaxis], 2, axis=0)
+    model._apply_bye_conflicts(batch, [ROSTER, Roster()], bye_weeks)
+    np.testing.assert_array_equal(batch[0, :, model._bye_conflicts_column], single)
+    assert not batch[1, :, model._bye_conflicts_column].any()
+
+@pytest.mark.parametrize('season, schedule_season', [(2024, 2024), (2025, None)])
+def test_roster_analysis_agrees_with_the_feature(model, season, schedule_season):
+    league_settings = {'season': season}
+    conflicts, _ = _conflicts(model, league_settings)
+    recommendations = [
+        Recommendation(
+            player=player, confidence_score=0.5, predicted_points=100.0, boom_probability=0.1,
+            value_over_replacement=0.0, explanation='', risk_level='low'
+        )
+        for player in PLAYERS
+    ]
+    analysis = model.analyze_roster(ROSTER, recommendations, league_settings)
+    assert [c['bye_conflicts'] for c in analysis['candidates']] == conflicts.tolist()
+    assert analysis['schedule_season'] == schedule_season
@@ -0,0 +1,20 @@
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from app.models.out_of_core import RunningScaler
+
+def test_running_scaler_matches_standard_scaler():
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=1e4, scale=3.0, size=(10_000, 5))
+    X[:, 3] = 7.0  # constant column: scale 1, as StandardScaler does
+
+    running = RunningScaler(X.shape[1])
+    # Uneven batches, including an empty one
+    for batch in np.split(X, [1, 1, 500, 4321, 9999]):
+        running.update(batch)
+    scaler = running.to_scaler()
+    expected = StandardScaler().fit(X)
+
+    np.testing.assert_allclose(scaler.mean_, expected.mean_, rtol=1e-12)
+    np.testing.assert_allclose(scaler.scale_, expected.scale_, rtol=1e-9)
+    np.testing.assert_allclose(scaler.transform(X[:100]), expected.transform(X[:100]), rtol=0, atol=1e-8)
@@ -0,0 +1,33 @@
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from app.models.tree_ensemble import CompiledEnsemble, compile_booster
+
+def _fit(rng, n=2000, num_features=8):
+    X = rng.normal(loc=50, scale=20, size=(n, num_features))
+    y = np.sin(X[:, 0] / 10) + 0.01 * X[:, 1] * (X[:, 2] > 50) + rng.normal(scale=0.1, size=n)
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBRegressor(n_estimators=60, max_depth=5, learning_rate=0.1)
+    model.fit(scaler.transform(X), y)
+    return model.get_booster(), scaler
+
+def test_compiled_ensemble_matches_booster_predict():
+    rng = np.random.default_rng(0)
+    booster, scaler = _fit(rng)
+    compiled = compile_booster(booster, scaler.mean_, scaler.scale_)
+
+    X = rng.normal(loc=50, scale=25, size=(500, 8))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    expected = booster.predict(xgb.DMatrix(scaler.transform(X)))
+    np.testing.assert_allclose(compiled.predict(X), expected, rtol=0, atol=1e-5)
+
+def test_compiled_ensemble_round_trips(tmp_path):
+    rng = np.random.default_rng(1)
+    booster, scaler = _fit(rng, n=500)
+    compiled = compile_booster(booster, scaler.mean_, scaler.scale_)
+    path = str(tmp_path / 'ensemble.npz')
+    compiled.save(path)
+
+    X = rng.normal(loc=50, scale=20, size=(100, 8))
+    np.testing.assert_array_equal(CompiledEnsemble.load(path).predict(X), compiled.predict(X))
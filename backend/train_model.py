@@ -1,8 +1,16 @@
 #!/usr/bin/env python3
 """
 Training script for ScoutAI ML model
+
+Usage:
+    python train_model.py                              # train with the default parameters
+    python train_model.py --tune --trials 30 --folds 5 # cross-validated search, then train
+    python train_model.py --scaling 1 2 4 8            # tuning wall time per core count
+    python train_model.py --streaming --data-dir data/training  # out-of-core training from Parquet
+    python train_model.py --team-context data/processed/team_context  # with team-context features
 """
 
+import argparse
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -14,22 +22,81 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def print_scaling(model: ScoutAIModel, training_data, core_counts, num_trials: int, folds: int):
+    """Time the same hyperparameter search on each number of cores"""
+    from app.models.tuning import scaling_curve
+    
+    rows = scaling_curve(
+        training_data[model.feature_columns].to_numpy(),
+        training_data['target_score'].to_numpy(),
+        core_counts,
+        num_trials=num_trials,
+        folds=folds
+    )
+    print(f"\n⏱️  Tuning scaling ({num_trials} trials, {folds} folds, {os.cpu_count()} cores on this machine):")
+    print(f"  {'cores':>5} {'workers':>7} {'threads':>7} {'seconds':>8} {'speedup':>7} {'efficiency':>10}")
+    for row in rows:
+        print(f"  {row['cores']:>5} {row['workers']:>7} {row['threads_per_worker']:>7} {row['wall_seconds']:>8.1f} "
+              f"{row['speedup']:>6.2f}x {row['efficiency']:>10.0%}")
+
 def main():
     """Train the ScoutAI model"""
+    parser = argparse.ArgumentParser(description='Train the ScoutAI model')
+    parser.add_argument('--samples', type=int, default=20000, help='Synthetic training samples')
+    parser.add_argument('--tune', action='store_true', help='Choose hyperparameters by cross-validated search first')
+    parser.add_argument('--trials', type=int, default=20, help='Search trials for --tune/--scaling')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds for --tune/--scaling')
+    parser.add_argument('--workers', type=int, default=None, help='Tuning worker processes (default: one per core)')
+    parser.add_argument('--scaling', type=int, nargs='+', metavar='CORES', help='Only report tuning wall time for these core counts')
+    parser.add_argument('--streaming', action='store_true', help='Train out of core, streaming batches instead of loading all rows')
+    parser.add_argument('--data-dir', help='Parquet file or directory with feature columns and target_score (--streaming)')
+    parser.add_argument('--external-memory', metavar='DIR', help='Keep XGBoost pages on disk in DIR (--streaming)')
+    parser.add_argument('--team-context', metavar='DIR', help='Add team-context features from this store (as SCOUTAI_TEAM_CONTEXT_DIR)')
+    parser.add_argument('--schedule', metavar='DIR', help='Add schedule and bye-conflict features from these tables (as SCOUTAI_SCHEDULE_DIR)')
+    args = parser.parse_args()
+    if (args.data_dir or args.external_memory) and not args.streaming:
+        parser.error('--data-dir and --external-memory need --streaming')
+    if args.streaming and (args.tune or args.scaling):
+        parser.error('--streaming cannot be combined with --tune or --scaling')
+    
     print("🏈 Training ScoutAI Fantasy Football Model")
     print("=" * 50)
     
     # Initialize model
-    model = ScoutAIModel()
+    model = ScoutAIModel(team_context_dir=args.team_context, schedule_dir=args.schedule)
     
-    # Generate training data
-    print("📊 Generating training data...")
-    training_data = model.generate_training_data(num_samples=20000)
-    print(f"Generated {len(training_data)} training samples")
-    
-    # Train model
-    print("🤖 Training XGBoost model...")
-    results = model.train_model(data=training_data, test_size=0.2)
+    if args.streaming:
+        from app.models.out_of_core import parquet_batches
+        
+        if args.data_dir:
+            print(f"📊 Streaming training data from {args.data_dir}...")
+            source = parquet_batches(args.data_dir, model.feature_columns + ['target_score'])
+        else:
+            print(f"📊 Streaming {args.samples} synthetic training samples...")
+            source = model.training_batches(args.samples)
+        print("🤖 Training XGBoost model out of core...")
+        results = model.train_model_streaming(source, test_size=0.2, external_memory_dir=args.external_memory)
+    else:
+        # Generate training data
+        print("📊 Generating training data...")
+        training_data = model.generate_training_data(num_samples=args.samples)
+        print(f"Generated {len(training_data)} training samples")
+        
+        if args.scaling:
+            print_scaling(model, training_data, args.scaling, args.trials, args.folds)
+            return
+        
+        # Train model
+        if args.tune:
+            print(f"🔎 Tuning hyperparameters ({args.trials} trials, {args.folds}-fold CV)...")
+            results = model.tune_model(
+                data=training_data, test_size=0.2, num_trials=args.trials, folds=args.folds, workers=args.workers
+            )
+            print(f"  Best parameters: {results['params']}")
+            print(f"  CV RMSE: {results['cv_rmse']:.4f} ({results['tuning_seconds']:.1f}s)")
+        else:
+            print("🤖 Training XGBoost model...")
+            results = model.train_model(data=training_data, test_size=0.2)
     
     # Print results
     print("\n📈 Training Results:")
@@ -38,6 +105,8 @@ def main():
     print(f"  R²: {results['r2']:.4f}")
     print(f"  Training samples: {results['training_samples']}")
     print(f"  Test samples: {results['test_samples']}")
+    if 'peak_rss_mb' in results:
+        print(f"  Peak memory: {results['peak_rss_mb']:.0f} MB")
     
     # Model info
     model_info = model.get_model_info()
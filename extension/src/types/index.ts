@@ -25,6 +25,8 @@ export interface Recommendation {
   value_over_replacement: number;
   explanation: string;
   risk_level: 'low' | 'medium' | 'high';
+  availability_next_pick?: number | null;
+  can_wait?: boolean | null;
 }
 
 export interface DraftRequest {